@@ -1,5 +1,6 @@
 # config/settings.py
 import os, sys
+import tempfile
 from pathlib import Path
 import dj_database_url
 from django.utils.module_loading import import_string
@@ -74,6 +75,7 @@ INSTALLED_APPS = [
 # Middleware
 # -------------------------------------------------------------------
 MIDDLEWARE = [
+    "sitecontent.metrics.MetricsMiddleware",  # en premier : mesure tout le reste
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # doit être haut dans la pile
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -91,7 +93,8 @@ ROOT_URLCONF = "config.urls"
 # -------------------------------------------------------------------
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates + mesure du rendu et des context processors
+        "BACKEND": "sitecontent.metrics.InstrumentedTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -107,6 +110,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Profil ASGI (docker/gunicorn-asgi.conf.py) : vues publiques async
+# (sitecontent/async_views.py)
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "0") in ("1", "true", "True")
+
 # -------------------------------------------------------------------
 # Base de données : Postgres en prod (via variables), sinon SQLite
 # -------------------------------------------------------------------
@@ -142,6 +149,44 @@ else:
         }
     }
 
+# Pool de connexions psycopg (Postgres) : les threads d'un worker gunicorn
+# partagent un pool au lieu de garder chacun sa connexion (CONN_MAX_AGE).
+# Connexions ouvertes côté Postgres : au plus GUNICORN_WORKERS × DB_POOL_MAX_SIZE
+# (+ worker d'envoi), à garder sous max_connections du fournisseur.
+DB_POOL = os.environ.get("DB_POOL", "1") in ("1", "true", "True")
+GUNICORN_THREADS = int(
+    os.environ.get("GUNICORN_THREADS", "2")
+)  # cf. docker/gunicorn.conf.py
+DB_POOL_OPTIONS = {
+    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "1")),
+    # Une connexion par requête en cours (thread WSGI, ou thread synchrone
+    # d'une requête ASGI) ; au-delà, attente d'une connexion libre
+    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", GUNICORN_THREADS)),
+    # Attente max d'une connexion libre avant erreur (s)
+    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+    # Fermeture des connexions inutilisées / recyclage (s)
+    "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+    "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),
+    "name": "annoor",
+}
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))
+# 0 = pas de limite ; sinon durée max d'une requête SQL (ms)
+DB_STATEMENT_TIMEOUT = int(os.environ.get("DB_STATEMENT_TIMEOUT", "0"))
+
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    _db = DATABASES["default"]
+    _db.setdefault("OPTIONS", {})["connect_timeout"] = DB_CONNECT_TIMEOUT
+    if DB_STATEMENT_TIMEOUT:
+        _db["OPTIONS"]["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"
+    # Pré-ping avant usage : connexion coupée (idle timeout du fournisseur,
+    # redémarrage) remplacée au lieu d'une erreur 500 ; avec le pool, fait
+    # par psycopg_pool à chaque emprunt (ConnectionPool.check_connection)
+    _db["CONN_HEALTH_CHECKS"] = True
+    if DB_POOL:
+        # Le pool remplace les connexions persistantes (incompatibles)
+        _db["CONN_MAX_AGE"] = 0
+        _db["OPTIONS"]["pool"] = dict(DB_POOL_OPTIONS)
+
 # -------------------------------------------------------------------
 # i18n / TZ
 # -------------------------------------------------------------------
@@ -213,11 +258,95 @@ if USE_R2_MEDIA:
     STORAGES["default"] = {"BACKEND": "storages.backends.s3boto3.S3Boto3Storage"}
 
 
+# Déclinaisons responsive des images uploadées (sitecontent/images.py)
+IMAGE_RENDITION_WIDTHS = (320, 640, 960, 1280, 1920)
+
+# Service des médias locaux sans serveur frontal (sitecontent/media.py) :
+# "" = sendfile par gunicorn ; "x-accel-redirect" (nginx : location interne
+# MEDIA_ACCEL_PREFIX) ou "x-sendfile" (Apache) = envoi délégué au proxy
+MEDIA_ACCEL = os.environ.get("MEDIA_ACCEL", "")
+MEDIA_ACCEL_PREFIX = os.environ.get("MEDIA_ACCEL_PREFIX", "/_protected_media/")
+# Cache navigateur des originaux (les renditions/ sont immuables : 1 an)
+MEDIA_MAX_AGE = int(os.environ.get("MEDIA_MAX_AGE", str(24 * 60 * 60)))
+
 STATICFILES_FINDERS = [
     "django.contrib.staticfiles.finders.FileSystemFinder",
     "django.contrib.staticfiles.finders.AppDirectoriesFinder",
 ]
 
+# -------------------------------------------------------------------
+# Cache à deux niveaux (sitecontent/cache_backends.py) : LRU en mémoire du
+# worker devant un cache partagé par tous les workers gunicorn — Redis en prod
+# (versions, pages), fichiers locaux sinon. Le rate limit (ratelimit.py)
+# exige Redis : sans REDIS_URL, aucune limite n'est appliquée
+# -------------------------------------------------------------------
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "annoor",
+    }
+else:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "CACHE_DIR", os.path.join(tempfile.gettempdir(), "annoor-cache")
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+
+CACHES = {
+    "default": {
+        "BACKEND": "sitecontent.cache_backends.TwoTierCache",
+        "LOCATION": "shared",
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("LOCAL_CACHE_MAX_ENTRIES", "300")),
+            "LOCAL_TIMEOUT": int(os.environ.get("LOCAL_CACHE_TIMEOUT", "5")),
+        },
+    },
+    "shared": SHARED_CACHE,
+}
+
+# -------------------------------------------------------------------
+# Cache de pages (visiteurs anonymes) — 0 pour désactiver
+# -------------------------------------------------------------------
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", "600"))
+
+# Fragments ({% fragment %} : header, footer, sections de l'accueil), invalidés
+# par les versions de modèles ; le délai ne libère que les anciennes versions
+FRAGMENT_CACHE_TIMEOUT = int(
+    os.environ.get("FRAGMENT_CACHE_TIMEOUT", str(7 * 24 * 60 * 60))
+)
+
+# Identifiant du déploiement (ex. SHA git) : entre dans les ETag des pages
+# (sitecontent/conditional.py), qui changent ainsi avec les templates
+RELEASE = os.environ.get("RELEASE", "")
+
+# -------------------------------------------------------------------
+# Métriques (sitecontent/metrics.py) : Server-Timing pour le staff,
+# /metrics au format Prometheus (staff, local ou jeton)
+# -------------------------------------------------------------------
+# Répertoire commun aux workers gunicorn (un fichier JSON par processus)
+METRICS_DIR = os.environ.get(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), "annoor-metrics")
+)
+METRICS_FLUSH_INTERVAL = int(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+# Authorization: Bearer <jeton> pour un Prometheus hors de la machine
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+# Journalise les requêtes plus lentes (ms) ; 0 = jamais
+METRICS_SLOW_REQUEST_MS = int(os.environ.get("METRICS_SLOW_REQUEST_MS", "1000"))
+
+# URL publique (ex. https://annoor.tech) : sitemaps pré-générées à la
+# publication ; vide = générées à la première requête d'un robot
+SITE_URL = os.environ.get("SITE_URL", "").rstrip("/")
+SITEMAP_PAGE_SIZE = int(os.environ.get("SITEMAP_PAGE_SIZE", "5000"))
+
+# Export statique (sitecontent/prerender.py) : pages publiques pré-rendues,
+# servies par Caddy ; régénérées par le worker après chaque sauvegarde
+# (build_renditions --watch). Vide = désactivé
+STATIC_EXPORT_ROOT = os.environ.get("STATIC_EXPORT_ROOT", "")
+
 # -------------------------------------------------------------------
 # Email
 # -------------------------------------------------------------------
@@ -287,7 +416,10 @@ EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "0") in ("1", "true", "True")
 
 # Fallback backend: si pas d'identifiants → console en dev/runserver
 if EMAIL_HOST_USER and EMAIL_HOST_PASSWORD:
-    EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    # Sessions SMTP réutilisées (sitecontent/mail.py) au lieu d'une
+    # connexion TLS + authentification par message
+    EMAIL_BACKEND = "sitecontent.mail.PooledEmailBackend"
+    EMAIL_POOL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 else:
     # En dev sans secrets => pas d'erreur, on loggue dans la console
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
@@ -295,3 +427,16 @@ else:
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", EMAIL_HOST_USER)
 SERVER_EMAIL = os.environ.get("SERVER_EMAIL", EMAIL_HOST_USER)
 CONTACT_INBOX = os.environ.get("CONTACT_INBOX", EMAIL_HOST_USER)
+
+# Pool SMTP (sitecontent/mail.py) — durées en secondes
+EMAIL_POOL_SIZE = int(os.environ.get("EMAIL_POOL_SIZE", "2"))
+EMAIL_POOL_MAX_IDLE = int(os.environ.get("EMAIL_POOL_MAX_IDLE", "120"))
+EMAIL_POOL_MAX_LIFETIME = int(os.environ.get("EMAIL_POOL_MAX_LIFETIME", "900"))
+EMAIL_POOL_CHECK_AFTER = int(os.environ.get("EMAIL_POOL_CHECK_AFTER", "10"))
+
+# File d'envoi (outbox.py) : worker `manage.py send_outbox`
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_RETRY_BASE = int(
+    os.environ.get("OUTBOX_RETRY_BASE", "60")
+)  # s, doublé à chaque échec
+OUTBOX_RETRY_MAX = int(os.environ.get("OUTBOX_RETRY_MAX", str(6 * 60 * 60)))
@@ -1,46 +1,29 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include, re_path
-from django.contrib.sitemaps.views import sitemap
-from sitecontent.sitemaps import (
-    ServiceSitemap,
-    ProjectSitemap,
-    PostSitemap,
-    StaticSitemap,
-)
-from django.views.static import serve as static_serve
-
-
-sitemaps = {
-    "services": ServiceSitemap,
-    "projects": ProjectSitemap,
-    "posts": PostSitemap,
-    "static": StaticSitemap,
-}
+from sitecontent import media, metrics
+from sitecontent.views import sitemap_index, sitemap_section
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("sitecontent.urls")),
-    path(
-        "sitemap.xml",
-        sitemap,
-        {"sitemaps": sitemaps},
-        name="django.contrib.sitemaps.views.sitemap",
-    ),
+    # Sitemaps pré-générées et gzippées (sitecontent/sitemaps.py)
+    path("sitemap.xml", sitemap_index, name="sitemap_index"),
+    path("sitemap-<slug:section>.xml", sitemap_section, name="sitemap_section"),
     path("ckeditor/", include("ckeditor_uploader.urls")),
+    # Format Prometheus, toutes les métriques des workers (sitecontent/metrics.py)
+    path("metrics", metrics.metrics_view, name="metrics"),
 ]
 
 
+# Médias locaux : ETag, Range, cache long, sendfile ou délégation au proxy
+# (sitecontent/media.py). Inutile quand les médias sont sur R2.
 urlpatterns += [
     re_path(
         r"^media/(?P<path>.*)$",
-        static_serve,
-        {"document_root": settings.MEDIA_ROOT, "show_indexes": False},
+        media.serve,
+        {"document_root": settings.MEDIA_ROOT},
         name="media",
     ),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
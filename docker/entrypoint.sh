@@ -6,9 +6,23 @@ export DJANGO_SETTINGS_MODULE=${DJANGO_SETTINGS_MODULE:-config.settings}
 echo "Apply migrations…"
 python manage.py migrate --noinput
 
+echo "Build CSS…"
+python manage.py build_css
+
 echo "Collect static…"
 python manage.py collectstatic --noinput
 
+echo "Render pending post bodies…"
+python manage.py rebuild_post_bodies --pending
+
+echo "Publish sitemaps…"
+python manage.py publish_sitemaps || echo "Sitemaps: génération différée."
+
+if [ -n "$STATIC_EXPORT_ROOT" ] && [ -n "$SITE_URL" ]; then
+  echo "Render static pages…"
+  python manage.py render_static || echo "Export statique incomplet : Django sert les pages manquantes."
+fi
+
 # Création auto du superuser si variables fournies
 if [ -n "$DJANGO_SUPERUSER_EMAIL" ] && [ -n "$DJANGO_SUPERUSER_PASSWORD" ]; then
   echo "Ensure Django superuser exists…"
@@ -27,5 +41,10 @@ else:
 PY
 fi
 
+if [ "${ASYNC_VIEWS:-0}" = "1" ]; then
+  echo "Starting Gunicorn (ASGI, uvicorn workers)…"
+  exec gunicorn config.asgi:application --config docker/gunicorn-asgi.conf.py
+fi
+
 echo "Starting Gunicorn…"
 exec gunicorn config.wsgi:application --config docker/gunicorn.conf.py
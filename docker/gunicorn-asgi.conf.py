@@ -0,0 +1,27 @@
+# docker/gunicorn-asgi.conf.py
+# Profil ASGI : gunicorn config.asgi:application --config docker/gunicorn-asgi.conf.py
+# (lancé par entrypoint.sh quand ASYNC_VIEWS=1).
+#
+# Un worker uvicorn sert de nombreuses connexions sur sa boucle d'événements ;
+# les accès bloquants (SQL, cache) passent par un pool de threads. Il faut
+# donc moins de workers qu'en WSGI, et DB_CONN_MAX_AGE=0 : sous ASGI, chaque
+# requête a son propre thread de code synchrone ; une connexion persistante
+# qui y est ouverte n'est jamais réutilisée et reste ouverte jusqu'à épuiser
+# max_connections de Postgres. Avec le pool psycopg (DB_POOL, par défaut),
+# les connexions sont rendues au pool en fin de requête et réutilisées ; le
+# pool a la même taille qu'en WSGI (DB_POOL_MAX_SIZE = GUNICORN_THREADS) : les
+# requêtes au-delà attendent une connexion libre (DB_POOL_TIMEOUT).
+import multiprocessing
+import os
+
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() + 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOGLEVEL", "info")
+
+raw_env = ["ASYNC_VIEWS=1", "DB_CONN_MAX_AGE=0"]
@@ -4,6 +4,7 @@ import os
 
 bind = "0.0.0.0:8000"
 workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# Dimensionne aussi le pool de connexions Postgres (DB_POOL_MAX_SIZE, settings)
 threads = int(os.environ.get("GUNICORN_THREADS", 2))
 timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
 graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL", 30))
@@ -1,6 +1,9 @@
 from django.contrib import admin
+
+from . import outbox
 from .models import (
     HomeSettings,
+    OutboxMessage,
     Partner,
     Service,
     Project,
@@ -44,6 +47,12 @@ class HomeSettingsAdmin(admin.ModelAdmin):
         ),
     )
 
+    # Singleton : une seule ligne, lue via singletons.home_settings
+    def has_add_permission(self, request):
+        if HomeSettings.objects.exists():
+            return False
+        return super().has_add_permission(request)
+
 
 @admin.register(Partner)
 class PartnerAdmin(admin.ModelAdmin):
@@ -68,7 +77,11 @@ class ProjectImageInline(admin.TabularInline):
 class ProjectAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("title",)}
     inlines = [ProjectImageInline]
-    list_display = ("title", "client", "year", "updated")
+    list_display = ("title", "client", "year_display", "updated")
+
+    @admin.display(description="Année", ordering="year_start")
+    def year_display(self, obj):
+        return obj.year
 
 
 @admin.register(Post)
@@ -97,3 +110,21 @@ class SiteContactAdmin(admin.ModelAdmin):
         if SiteContact.objects.exists():
             return False
         return super().has_add_permission(request)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "created")
+    list_filter = ("status",)
+    search_fields = ("subject", "to")
+    readonly_fields = [f.name for f in OutboxMessage._meta.fields]
+    actions = ["requeue"]
+
+    # Alimentée uniquement par le formulaire de contact
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Remettre en file d'envoi")
+    def requeue(self, request, queryset):
+        count = outbox.requeue(queryset)
+        self.message_user(request, f"{count} message(s) remis en file.")
@@ -0,0 +1,134 @@
+# sitecontent/async_views.py
+"""
+Vues publiques asynchrones, servies par le profil ASGI (ASYNC_VIEWS=1,
+docker/gunicorn-asgi.conf.py). Mêmes URLs, templates et décorateurs que
+views.py, qui reste le chemin WSGI.
+
+Chaque page ne fait plus qu'une lecture principale : header, footer et
+sections de l'accueil sont des {% fragment %} en cache, dont les données,
+paresseuses, ne sont lues qu'au rendu lorsque le fragment est à régénérer.
+Rien n'est donc lu en parallèle : lecture et rendu passent par le thread
+synchrone de la requête (sync_to_async), sur une seule connexion, et la
+boucle d'événements reste libre pour les autres connexions.
+"""
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import render
+
+from . import views
+from .caching import anonymous_page_cache
+from .conditional import conditional_page
+from .models import Partner, Post, Project, Service
+from .ratelimit import ratelimit, search_key
+
+# --- Accès bloquants ---
+
+
+async def _read(func):
+    """Résultat d'une lecture bloquante (SQL, cache), hors de la boucle."""
+    return await sync_to_async(func)()
+
+
+async def _render(request, template, context):
+    return await sync_to_async(render)(request, template, context)
+
+
+def _first(queryset):
+    obj = queryset.first()
+    if obj is None:
+        raise Http404("Page introuvable")
+    return obj
+
+
+def _evaluated(context, key):
+    # La page est lue ici, hors de la boucle ; le queryset garde le résultat
+    len(context[key])
+    return context
+
+
+# --- Vues ---
+
+
+@conditional_page()
+@anonymous_page_cache()
+async def about(request):
+    return await _render(request, "about.html", {})
+
+
+@conditional_page("homesettings", "project", "partner", "post")
+@anonymous_page_cache("homesettings", "project", "partner", "post")
+async def home(request):
+    # Sections en fragments : rien n'est lu avant le rendu (voir views.home)
+    return await _render(request, "home.html", views._home_context())
+
+
+@conditional_page()
+@anonymous_page_cache()
+@ratelimit("search", views.SEARCH_LIMIT, key=search_key)
+async def services_list(request):
+    services = await _read(lambda: list(views._services(request)))
+    return await _render(request, "services_list.html", {"services": services})
+
+
+@conditional_page(exists=lambda request, slug: Service.objects.filter(slug=slug))
+@anonymous_page_cache()
+async def service_detail(request, slug):
+    service = await _read(partial(_first, Service.objects.filter(slug=slug)))
+    return await _render(request, "service_detail.html", {"service": service})
+
+
+@conditional_page("project")
+@anonymous_page_cache("project")
+@ratelimit("search", views.SEARCH_LIMIT, key=search_key)
+async def projects_list(request):
+    context = await _read(
+        lambda: _evaluated(views._projects_context(request), "projects")
+    )
+    return await _render(request, "projects_list.html", context)
+
+
+@conditional_page(
+    "project", exists=lambda request, slug: Project.objects.filter(slug=slug)
+)
+@anonymous_page_cache("project")
+async def project_detail(request, slug):
+    project = await _read(partial(_first, Project.objects.filter(slug=slug)))
+    return await _render(request, "project_detail.html", {"project": project})
+
+
+@conditional_page("partner")
+@anonymous_page_cache("partner")
+async def partners_view(request):
+    partners = await _read(lambda: list(Partner.objects.all()))
+    return await _render(request, "partners.html", {"partners": partners})
+
+
+@conditional_page("post")
+@anonymous_page_cache("post")
+@ratelimit("search", views.SEARCH_LIMIT, key=search_key)
+async def blog_list(request):
+    context = await _read(lambda: _evaluated(views._blog_context(request), "posts"))
+    return await _render(request, "blog_list.html", context)
+
+
+@conditional_page(
+    "post",
+    exists=lambda request, slug: Post.objects.filter(slug=slug, published=True),
+)
+@anonymous_page_cache("post")
+async def blog_detail(request, slug):
+    post, prev_post, next_post, recent_posts = await _read(
+        partial(views._post_with_neighbours, slug)
+    )
+    return await _render(
+        request,
+        "blog_detail.html",
+        {
+            "post": post,
+            "prev_post": prev_post,
+            "next_post": next_post,
+            "recent_posts": recent_posts,
+        },
+    )
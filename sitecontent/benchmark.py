@@ -0,0 +1,440 @@
+# sitecontent/benchmark.py
+"""
+Mesures de latence dans le processus (sans réseau) pour les commandes
+bench_* : les URLs sont rejouées par N clients concurrents, via le handler
+WSGI (threads) ou ASGI (tâches asyncio sur une boucle, un thread de code
+synchrone par requête comme sous uvicorn).
+
+db_latency() ajoute un délai fixe à chaque requête SQL pour simuler une base
+distante : en local, SQLite répond en quelques µs et masque l'effet des
+requêtes parallèles.
+
+seed() génère un jeu de données déterministe et compare() confronte deux
+rapports : deux exécutions de bench_site avec les mêmes options mesurent
+exactement les mêmes pages.
+"""
+import asyncio
+import math
+import random
+import shutil
+import tempfile
+import threading
+import time
+import types
+from contextlib import contextmanager
+from datetime import date, timedelta
+from io import BytesIO
+from itertools import count
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, connections, transaction
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from . import images
+from .models import Partner, Post, Project, ProjectImage, Service
+
+
+def percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)) - 1, 0)
+    return sorted_samples[rank]
+
+
+def summarize(samples) -> dict:
+    """Latences (secondes) -> statistiques en millisecondes."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(1000 * percentile(ordered, 50), 2),
+        "p95_ms": round(1000 * percentile(ordered, 95), 2),
+        "p99_ms": round(1000 * percentile(ordered, 99), 2),
+        "max_ms": round(1000 * ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+def _queries(counts) -> dict:
+    return {
+        "mean": round(sum(counts) / len(counts), 2) if counts else 0.0,
+        "max": max(counts, default=0),
+    }
+
+
+def _report(timings, statuses, elapsed, queries=None) -> dict:
+    total = sum(len(samples) for samples in timings.values())
+    report = {
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "overall": summarize([t for samples in timings.values() for t in samples]),
+        "urls": {url: summarize(samples) for url, samples in timings.items()},
+    }
+    if queries is not None:
+        report["overall"]["queries"] = _queries(
+            [n for counts in queries.values() for n in counts]
+        )
+        for url, counts in queries.items():
+            report["urls"][url]["queries"] = _queries(counts)
+    return report
+
+
+def urlconf(public):
+    """URLconf racine servant les vues publiques de `public` (pour ROOT_URLCONF)."""
+    from config import urls as root
+
+    from . import urls as site
+
+    module = types.ModuleType(f"bench_urls_{public.__name__.rsplit('.', 1)[-1]}")
+    module.urlpatterns = site.public_urlpatterns(public) + root.urlpatterns
+    return module
+
+
+@contextmanager
+def db_latency(ms: float):
+    """Ajoute `ms` millisecondes à chaque requête SQL, tous threads confondus."""
+    if not ms:
+        yield
+        return
+    delay = ms / 1000
+    active = True
+
+    def slow_execute(execute, sql, params, many, context):
+        if active:
+            time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if slow_execute not in connection.execute_wrappers:
+            connection.execute_wrappers.append(slow_execute)
+
+    connection_created.connect(install, weak=False)
+    for connection in connections.all(initialized_only=True):
+        install(None, connection)
+    try:
+        yield
+    finally:
+        active = False
+        connection_created.disconnect(install)
+
+
+def run_wsgi(urls, requests: int, concurrency: int, **headers) -> dict:
+    """
+    `requests` GET répartis sur `concurrency` threads (un Client chacun),
+    avec le nombre de requêtes SQL de chacun (la requête est traitée dans le
+    thread du client).
+    """
+    timings = {url: [] for url in urls}
+    queries = {url: [] for url in urls}
+    statuses = {}
+    counter = count()
+    lock = threading.Lock()
+
+    def worker():
+        # Une erreur de vue devient une réponse 500, comptée dans `statuses`
+        client = Client(raise_request_exception=False, **headers)
+        executed = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal executed
+            executed += 1
+            return execute(sql, params, many, context)
+
+        with connections["default"].execute_wrapper(count_query):
+            while (i := next(counter)) < requests:
+                url = urls[i % len(urls)]
+                executed = 0
+                start = time.perf_counter()
+                response = client.get(url, secure=True)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    timings[url].append(elapsed)
+                    queries[url].append(executed)
+                    statuses[response.status_code] = (
+                        statuses.get(response.status_code, 0) + 1
+                    )
+        connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return _report(timings, statuses, time.perf_counter() - start, queries)
+
+
+def run_asgi(urls, requests: int, concurrency: int, **headers) -> dict:
+    """Idem via le handler ASGI : `concurrency` tâches sur une seule boucle."""
+    timings = {url: [] for url in urls}
+    statuses = {}
+    counter = count()
+
+    async def worker():
+        client = AsyncClient(**headers)
+        while (i := next(counter)) < requests:
+            url = urls[i % len(urls)]
+            start = time.perf_counter()
+            # Comme ASGIHandler : un thread dédié au code synchrone de la requête
+            async with ThreadSensitiveContext():
+                response = await client.get(url, secure=True)
+            elapsed = time.perf_counter() - start
+            timings[url].append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    connections.close_all()
+    return _report(timings, statuses, elapsed)
+
+
+# --- Jeu de données reproductible (bench_site) ---
+
+WORDS = (
+    "projet énergie solaire réseau installation maintenance audit étude "
+    "client chantier équipe qualité sécurité performance formation conseil "
+    "ingénierie électrique hydraulique bâtiment infrastructure données "
+    "numérique déploiement suivi rapport analyse innovation durable local "
+    "partenaire région village école centre santé eau pompage stockage "
+    "batterie onduleur câblage raccordement mesure contrôle norme gestion"
+).split()
+
+VOLUMES = {"services": 12, "projects": 40, "images": 4, "posts": 120, "partners": 10}
+SOURCE_IMAGES = 6
+
+
+def _words(rng, n) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _sentence(rng) -> str:
+    return _words(rng, rng.randint(8, 18)).capitalize() + "."
+
+
+def _paragraph(rng) -> str:
+    return " ".join(_sentence(rng) for _ in range(rng.randint(3, 6)))
+
+
+def rich_body(rng, sources=(), sections=4) -> str:
+    """HTML du type produit par CKEditor : titres, listes, liens, images."""
+    parts = []
+    for i in range(sections):
+        parts.append(f"<h2>{_words(rng, 4).capitalize()}</h2>")
+        parts.append(
+            f"<p>{_paragraph(rng)} <strong>{_words(rng, 3)}</strong> "
+            f'<a href="https://example.org/{rng.choice(WORDS)}">{_words(rng, 2)}</a>. '
+            f"{_paragraph(rng)}</p>"
+        )
+        if i % 2 == 0:
+            items = "".join(f"<li>{_sentence(rng)}</li>" for _ in range(4))
+            parts.append(f"<ul>{items}</ul>")
+        if sources and i == 1:
+            src = default_storage.url(rng.choice(sources))
+            parts.append(
+                f'<p><img alt="{_words(rng, 3)}" src="{src}" '
+                'style="height:400px; width:640px" /></p>'
+            )
+        if i == sections - 1:
+            parts.append(f"<blockquote><p>{_sentence(rng)}</p></blockquote>")
+    return "\n".join(parts)
+
+
+def _seed_images(rng) -> list:
+    sources = []
+    for i in range(SOURCE_IMAGES):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        img = Image.merge(
+            "RGB",
+            [
+                Image.linear_gradient("L")
+                .resize((1600, 1000))
+                .point(lambda v, c=c: (v + c) % 256)
+                for c in color
+            ],
+        )
+        buffer = BytesIO()
+        img.save(buffer, "JPEG", quality=85)
+        name = default_storage.save(
+            f"bench/photo-{i}.jpg", ContentFile(buffer.getvalue())
+        )
+        images.build_renditions(name)
+        sources.append(name)
+    return sources
+
+
+def seed(seed=42, **volumes) -> dict:
+    """
+    Remplace services, projets (avec galerie), articles et partenaires par
+    un jeu généré à partir de `seed` : deux exécutions produisent les mêmes
+    contenus, slugs et dates. Renvoie les volumes utilisés.
+    """
+    volumes = {**VOLUMES, **{k: v for k, v in volumes.items() if v is not None}}
+    rng = random.Random(seed)
+    with transaction.atomic():
+        for model in (ProjectImage, Project, Service, Post, Partner):
+            model.objects.all().delete()
+        sources = _seed_images(rng)
+
+        for i in range(volumes["partners"]):
+            Partner.objects.create(
+                name=_words(rng, 2).title(),
+                website=f"https://partenaire-{i}.example.org",
+                logo=sources[i % len(sources)],
+            )
+        for i in range(volumes["services"]):
+            Service.objects.create(
+                title=_words(rng, 3).capitalize(),
+                slug=f"service-{i}",
+                excerpt=_sentence(rng),
+                body=rich_body(rng, sources, sections=3),
+                cover=sources[i % len(sources)],
+            )
+        for i in range(volumes["projects"]):
+            project = Project.objects.create(
+                title=_words(rng, 4).capitalize(),
+                slug=f"projet-{i}",
+                client=_words(rng, 2).title(),
+                location=rng.choice(WORDS).capitalize(),
+                year=str(2015 + i % 10),
+                context=rich_body(rng, sections=1),
+                solution=rich_body(rng, sources, sections=2),
+                results=rich_body(rng, sections=1),
+                cover=sources[i % len(sources)],
+            )
+            for j in range(volumes["images"]):
+                ProjectImage.objects.create(
+                    project=project,
+                    image=sources[(i + j) % len(sources)],
+                    caption=_words(rng, 4),
+                )
+        first_day = date(2020, 1, 1)
+        for i in range(volumes["posts"]):
+            post = Post.objects.create(
+                title=_words(rng, 6).capitalize(),
+                slug=f"article-{i}",
+                body=rich_body(rng, sources, sections=rng.randint(3, 6)),
+                published=i % 10 != 9,
+                cover=sources[i % len(sources)],
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=first_day + timedelta(days=3 * i)
+            )
+    return volumes
+
+
+# --- Base de test (bench_site, explain_queries) ---
+
+# Cache et médias propres aux mesures : rien n'est écrit dans ceux du site
+BENCH_CACHES = {
+    "default": {
+        "BACKEND": "sitecontent.cache_backends.TwoTierCache",
+        "LOCATION": "shared",
+        "OPTIONS": settings.CACHES["default"].get("OPTIONS", {}),
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bench-site",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+
+@contextmanager
+def test_site(keepdb=False, page_cache=False):
+    """
+    Base de test créée (puis détruite sauf `keepdb`), cache locmem et MEDIA_ROOT
+    temporaire : seed() et les requêtes rejouées ne touchent pas au site.
+    """
+    media_root = tempfile.mkdtemp(prefix="bench-site-")
+    overrides = override_settings(
+        CACHES=BENCH_CACHES,
+        MEDIA_ROOT=media_root,
+        STORAGES={
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            # Pas de manifeste requis (collectstatic) pour lancer les mesures
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+            },
+        },
+        STATIC_EXPORT_ROOT="",  # l'export statique du site reste intact
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        PAGE_CACHE_TIMEOUT=settings.PAGE_CACHE_TIMEOUT if page_cache else 0,
+        METRICS_DIR=media_root,
+    )
+    with overrides:
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=keepdb, serialize=False
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+            shutil.rmtree(media_root, ignore_errors=True)
+
+
+def site_urls() -> dict:
+    """Nom -> chemin de chaque URL de sitecontent/urls.py, plus sitemap.xml."""
+    from . import urls as site
+
+    detail = {
+        "service_detail": Service.objects.order_by("slug"),
+        "project_detail": Project.objects.order_by("slug"),
+        "blog_detail": Post.objects.published().order_by("-pub_date", "-pk"),
+    }
+    urls = {}
+    for pattern in site.urlpatterns:
+        if not pattern.pattern.converters:
+            urls[pattern.name] = reverse(pattern.name)
+            continue
+        queryset = detail.get(pattern.name)
+        slug = queryset.values_list("slug", flat=True).first() if queryset else None
+        if slug:
+            urls[pattern.name] = reverse(pattern.name, kwargs={"slug": slug})
+    urls["sitemap_index"] = reverse("sitemap_index")
+    return urls
+
+
+# --- Comparaison de deux exécutions ---
+
+
+def compare(previous: dict, current: dict, threshold: float, floor_ms=2.0) -> list:
+    """
+    Écarts par URL entre deux rapports bench_site. Régressions : latence
+    p50 / p95 en hausse de plus de `threshold` % (et d'au moins `floor_ms`),
+    requêtes SQL en hausse, débit en baisse. Liste de
+    (url, mesure, avant, après, écart %, régression).
+    """
+    rows = []
+
+    def add(url, metric, before, after, worse):
+        change = 100 * (after - before) / before if before else 0.0
+        rows.append((url, metric, before, after, round(change, 1), worse))
+
+    for url, stats in current["urls"].items():
+        old = previous["urls"].get(url)
+        if old is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            before, after = old[metric], stats[metric]
+            # p99 : quelques échantillons seulement, indicatif
+            worse = metric != "p99_ms" and (
+                after - before > max(floor_ms, before * threshold / 100)
+            )
+            add(url, metric, before, after, worse)
+        before, after = old["queries"]["mean"], stats["queries"]["mean"]
+        add(url, "queries", before, after, after > before)
+    before, after = previous["throughput_rps"], current["throughput_rps"]
+    add("*", "throughput_rps", before, after, after < before * (1 - threshold / 100))
+    return rows
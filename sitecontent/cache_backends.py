@@ -0,0 +1,246 @@
+# sitecontent/cache_backends.py
+"""
+Cache à deux niveaux : LRU en mémoire du processus devant un cache partagé.
+
+* lecture : mémoire locale, sinon cache partagé (puis copie locale) ;
+* écriture : les deux niveaux ; add/incr/decr ne touchent que le partagé
+  (opérations atomiques : compteurs de version, rate limit) ;
+* une copie locale vit au plus LOCAL_TIMEOUT secondes : une suppression faite
+  par un autre worker est donc vue avec ce délai maximum. Les clés versionnées
+  (caching.py) ne sont pas concernées : leur version est lue dans le partagé.
+
+get_or_compute() protège les recalculs coûteux contre l'effet « troupeau » :
+rafraîchissement anticipé probabiliste (XFetch) avant expiration, et verrou
+dans le cache partagé quand la valeur manque.
+
+Configuration :
+    CACHES = {
+        "default": {
+            "BACKEND": "sitecontent.cache_backends.TwoTierCache",
+            "LOCATION": "shared",  # alias du cache partagé
+            "OPTIONS": {"MAX_ENTRIES": 300, "LOCAL_TIMEOUT": 5},
+        },
+        "shared": {...},  # Redis, fichiers…
+    }
+"""
+import math
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+LOCK_TIMEOUT = 30  # durée max d'un recalcul (verrou orphelin)
+LOCK_WAIT = 5  # attente max d'une valeur calculée par un autre processus
+
+COUNTERS = (
+    "local_hits",
+    "shared_hits",
+    "misses",
+    "sets",
+    "early_refreshes",
+    "lock_waits",
+    "recomputes",
+)
+
+_locals = {}
+_locks = {}
+_counters = {}
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.shared_alias = location or "shared"
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        # Les gros objets (pages complètes) restent dans le seul cache partagé
+        self.max_item_size = options.get("MAX_ITEM_SIZE", 256 * 1024)
+        # Django crée une instance par thread : l'état local est partagé
+        # au niveau du processus, comme pour LocMemCache.
+        self._local = _locals.setdefault(self.shared_alias, OrderedDict())
+        self._lock = _locks.setdefault(self.shared_alias, threading.Lock())
+        self._counters = _counters.setdefault(
+            self.shared_alias, dict.fromkeys(COUNTERS, 0)
+        )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"local_entries": len(self._local), **self._counters}
+
+    # --- Niveau local ---
+
+    def _local_get(self, key, version):
+        local_key = self.make_key(key, version)
+        with self._lock:
+            item = self._local.get(local_key)
+            if item is None:
+                return None
+            expires, data = item
+            if expires <= time.monotonic():
+                del self._local[local_key]
+                return None
+            self._local.move_to_end(local_key)
+        return pickle.loads(data)
+
+    def _local_set(self, key, value, version, timeout=DEFAULT_TIMEOUT):
+        ttl = self.local_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        local_key = self.make_key(key, version)
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if ttl <= 0 or len(data) > self.max_item_size:
+                self._local.pop(local_key, None)
+                return
+            self._local[local_key] = (time.monotonic() + ttl, data)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key, version):
+        with self._lock:
+            self._local.pop(self.make_key(key, version), None)
+
+    # --- API Django ---
+
+    def get(self, key, default=None, version=None):
+        value = self._local_get(key, version)
+        if value is not None:
+            self._count("local_hits")
+            return value
+        value = self.shared.get(key, version=version)
+        if value is None:
+            self._count("misses")
+            return default
+        self._count("shared_hits")
+        self._local_set(key, value, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            value = self._local_get(key, version)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        self._count("local_hits", len(found))
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            for key, value in shared.items():
+                self._local_set(key, value, version)
+            found.update(shared)
+            self._count("shared_hits", len(shared))
+            self._count("misses", len(missing) - len(shared))
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._local_set(key, value, version, timeout)
+        self._count("sets")
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._local_set(key, value, version, timeout)
+        self._count("sets", len(data))
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local_delete(key, version)
+        return self.shared.add(key, value, timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local_delete(key, version)
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self._local_delete(key, version)
+        return self.shared.decr(key, delta, version=version)
+
+    def has_key(self, key, version=None):
+        if self._local_get(key, version) is not None:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(key, version)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._local_delete(key, version)
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    # --- Anti-stampede ---
+
+    def get_or_compute(
+        self, key, compute, timeout=DEFAULT_TIMEOUT, version=None, beta=1.0
+    ):
+        """
+        Retourne la valeur de `key`, calculée par `compute()` si besoin.
+        Stocke (valeur, durée du calcul, échéance) : plus le calcul est long et
+        l'échéance proche, plus un rafraîchissement anticipé est probable.
+        """
+        envelope = self.get(key, version=version)
+        lock_key = f"{key}:lock"
+        if envelope is not None:
+            value, delta, expires = envelope
+            gap = -delta * beta * math.log(1.0 - random.random())
+            if expires is None or time.time() + gap < expires:
+                return value
+            # Un seul processus rafraîchit, les autres servent l'ancienne valeur
+            if not self.shared.add(lock_key, 1, LOCK_TIMEOUT, version=version):
+                return value
+            self._count("early_refreshes")
+            return self._compute(key, lock_key, compute, timeout, version)
+
+        if self.shared.add(lock_key, 1, LOCK_TIMEOUT, version=version):
+            return self._compute(key, lock_key, compute, timeout, version)
+
+        # Calcul en cours ailleurs : on attend son résultat
+        self._count("lock_waits")
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            envelope = self.shared.get(key, version=version)
+            if envelope is not None:
+                self._local_set(key, envelope, version, timeout)
+                return envelope[0]
+        return self._compute(key, lock_key, compute, timeout, version)
+
+    def _compute(self, key, lock_key, compute, timeout, version):
+        try:
+            started = time.time()
+            value = compute()
+            delta = time.time() - started
+            expires = self.get_backend_timeout(timeout)
+            self.set(key, (value, delta, expires), timeout, version=version)
+            self._count("recomputes")
+            return value
+        finally:
+            self.shared.delete(lock_key, version=version)
@@ -0,0 +1,253 @@
+# sitecontent/caching.py
+"""
+Cache de pages pour les visiteurs anonymes, fragments de templates et
+compteurs de version par modèle.
+
+Chaque vue publique déclare les « tags » (modèles) dont elle dépend. La clé de
+cache embarque la version courante de ces tags : un post_save / post_delete
+incrémente, une fois la transaction validée, la version du tag concerné (voir
+signals.py), ce qui rend introuvables les pages obsolètes sans avoir à
+parcourir les clés. La date de cet incrément est gardée à côté de la version
+(Last-Modified des pages).
+
+Les versions sont lues et écrites dans le cache partagé (jamais dans la copie
+locale du TwoTierCache, voir cache_backends.py) : une sauvegarde est vue
+immédiatement par tous les workers.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.http import HttpResponse
+from django.utils import translation
+
+# Toutes les pages affichent le header (mega-menu services) et le footer
+# (coordonnées) via le context processor : elles dépendent donc de ces tags.
+GLOBAL_TAGS = ("sitecontact", "service")
+
+# Modèles dont les changements invalident un autre tag
+MODEL_TAGS = {"projectimage": "project"}
+
+
+def tag_for_model(model) -> str:
+    name = model._meta.model_name
+    return MODEL_TAGS.get(name, name)
+
+
+# --- Compteurs de version ---
+
+
+def shared_cache():
+    """Niveau partagé du cache par défaut (le cache lui-même s'il n'en a pas)."""
+    return getattr(cache, "shared", cache)
+
+
+def _version_key(tag: str) -> str:
+    return f"ver:{tag}"
+
+
+def _fresh_version() -> int:
+    # Si la clé a été évincée, on repart d'une valeur jamais utilisée
+    # (horodatage ms) plutôt que de 0 : pas de collision avec d'anciennes pages.
+    return int(time.time() * 1000)
+
+
+def get_versions(tags) -> list:
+    shared = shared_cache()
+    keys = [_version_key(t) for t in tags]
+    found = shared.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            shared.add(key, _fresh_version(), None)
+            found[key] = shared.get(key, 0)
+        versions.append(found[key])
+    return versions
+
+
+def _modified_key(tag: str) -> str:
+    return f"mod:{tag}"
+
+
+def bump(*tags) -> None:
+    shared = shared_cache()
+    now = time.time()
+    for tag in tags:
+        key = _version_key(tag)
+        try:
+            shared.incr(key)
+        except ValueError:
+            shared.set(key, _fresh_version(), None)
+        # Date du changement (Last-Modified, voir conditional.py) : couvre
+        # aussi suppressions, dépublications et images de projet
+        shared.set(_modified_key(tag), now, None)
+
+
+def last_modified(tags):
+    """Horodatage (epoch) du dernier bump de `tags`."""
+    shared = shared_cache()
+    keys = [_modified_key(t) for t in tags]
+    found = shared.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Inconnu (cache vidé) : maintenant, jamais une date trop ancienne
+            shared.add(key, time.time(), None)
+            found[key] = shared.get(key, time.time())
+    return max(found[key] for key in keys)
+
+
+def remember(key: str, compute, tags=(), timeout=DEFAULT_TIMEOUT):
+    """
+    Valeur de `compute()` mise en cache sous `key`, invalidée par les versions
+    de `tags`. Avec TwoTierCache, le recalcul est protégé contre les stampedes.
+    """
+    if tags:
+        key = f"{key}:{'.'.join(str(v) for v in get_versions(tags))}"
+    if hasattr(cache, "get_or_compute"):
+        return cache.get_or_compute(key, compute, timeout)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+# --- Fragments de templates ---
+
+
+def fragment(name: str, render, tags=(), vary_on=(), fingerprint: str = ""):
+    """
+    Rendu d'un {% fragment %} (templatetags/fragment_cache.py). Aucune
+    expiration à deviner : la clé porte les versions de `tags`, une sauvegarde
+    la rend introuvable. FRAGMENT_CACHE_TIMEOUT ne fait que libérer les
+    anciennes versions ; `fingerprint` change avec le source du template.
+    """
+    timeout = getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 0)
+    if not timeout:
+        return render()
+    raw = "|".join(
+        [
+            translation.get_language() or "",
+            getattr(settings, "RELEASE", ""),
+            fingerprint,
+            *(str(value) for value in vary_on),
+        ]
+    )
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return remember(f"fragment:{name}:{digest}", render, tuple(tags), timeout)
+
+
+# --- Cache de pages ---
+
+
+def is_cacheable_request(request) -> bool:
+    if request.method not in ("GET", "HEAD"):
+        return False
+    # Session (utilisateur connecté, messages en session) ou messages en cookie :
+    # la page est personnalisée, on ne la sert ni ne la stocke.
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    if CookieStorage.cookie_name in request.COOKIES:
+        return False
+    return True
+
+
+def can_store(request, response) -> bool:
+    """Réponse identique pour tous les visiteurs anonymes (cache, export)."""
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies:
+        return False
+    # Un {% csrf_token %} a été rendu (formulaire) : contenu propre au visiteur
+    if request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+        return False
+    return True
+
+
+def page_cache_key(request, tags) -> str:
+    raw = "|".join(
+        [
+            translation.get_language() or "",
+            request.scheme,
+            request.get_host(),
+            request.path,
+            request.META.get("QUERY_STRING", ""),
+        ]
+    )
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    versions = ".".join(str(v) for v in get_versions(tags))
+    return f"page:{digest}:{versions}"
+
+
+def _cached_page(key):
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    response = HttpResponse(cached["content"])
+    for name, value in cached["headers"]:
+        response[name] = value
+    response["X-Page-Cache"] = "HIT"
+    return response
+
+
+def _store_page(request, response, key, timeout) -> None:
+    if can_store(request, response):
+        cache.set(
+            key,
+            {
+                "content": response.content,
+                "headers": list(response.headers.items()),
+            },
+            timeout,
+        )
+        response["X-Page-Cache"] = "MISS"
+
+
+def anonymous_page_cache(*tags):
+    """
+    Décorateur de vue : met en cache la réponse complète des requêtes
+    GET/HEAD anonymes, invalidée dès qu'un modèle de `tags` change.
+    Accepte aussi les vues async (accès au cache hors de la boucle).
+    """
+    all_tags = tuple(dict.fromkeys(GLOBAL_TAGS + tags))
+
+    def lookup(request):
+        timeout = getattr(settings, "PAGE_CACHE_TIMEOUT", 600)
+        if not timeout or not is_cacheable_request(request):
+            return None, None, timeout
+        key = page_cache_key(request, all_tags)
+        return key, _cached_page(key), timeout
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                key, cached, timeout = await sync_to_async(lookup)(request)
+                if cached is not None:
+                    return cached
+                response = await view(request, *args, **kwargs)
+                if key is not None:
+                    await sync_to_async(_store_page)(request, response, key, timeout)
+                return response
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key, cached, timeout = lookup(request)
+            if cached is not None:
+                return cached
+            response = view(request, *args, **kwargs)
+            if key is not None:
+                _store_page(request, response, key, timeout)
+            return response
+
+        return wrapper
+
+    return decorator
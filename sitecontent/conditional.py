@@ -0,0 +1,85 @@
+# sitecontent/conditional.py
+"""
+Requêtes conditionnelles (ETag / Last-Modified → 304) pour les pages publiques.
+
+* ETag : empreinte des versions des tags de la page (caching.py), de la
+  langue et de RELEASE — aucune requête SQL, et change aussi sur suppression ;
+* Last-Modified : date du dernier incrément de ces mêmes versions, gardée à
+  côté d'elles (caching.last_modified). Elle bouge donc avec tout ce qui
+  invalide la page : suppression, dépublication, images de projet…
+
+Le 304 est renvoyé avant toute requête principale ou rendu de template.
+Seuls les visiteurs anonymes sans messages en attente sont concernés
+(mêmes règles que le cache de pages).
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from . import caching
+
+EXISTS_TIMEOUT = 24 * 60 * 60
+
+
+def conditional_page(*tags, exists=None):
+    """
+    Décorateur de vue (sync ou async). `exists(request, *args, **kwargs)`
+    renvoie le queryset de l'objet affiché (pages de détail) : absent, la
+    page n'a pas de validateurs (404).
+    """
+    all_tags = tuple(dict.fromkeys(caching.GLOBAL_TAGS + tags))
+
+    def etag(request, *args, **kwargs):
+        if not caching.is_cacheable_request(request):
+            return None
+        versions = caching.get_versions(all_tags)
+        raw = "|".join(
+            [getattr(settings, "RELEASE", ""), get_language() or ""]
+            + [str(v) for v in versions]
+        )
+        return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        if not caching.is_cacheable_request(request):
+            return None
+        if exists is not None:
+            digest = hashlib.md5(request.path.encode("utf-8")).hexdigest()
+            found = caching.remember(
+                f"exists:{digest}",
+                lambda: exists(request, *args, **kwargs).exists(),
+                all_tags,
+                EXISTS_TIMEOUT,
+            )
+            if not found:
+                return None
+        return datetime.fromtimestamp(caching.last_modified(all_tags), tz=timezone.utc)
+
+    def validators(request, *args, **kwargs):
+        return etag(request, *args, **kwargs), last_modified(request, *args, **kwargs)
+
+    def decorator(view):
+        if not iscoroutinefunction(view):
+            return condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        # Vue async : condition() appellerait etag / last_modified (cache, SQL)
+        # dans la boucle d'événements ; on les calcule avant, dans un thread.
+        conditional_view = condition(
+            etag_func=lambda request, *a, **kw: request.page_validators[0],
+            last_modified_func=lambda request, *a, **kw: request.page_validators[1],
+        )(view)
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            request.page_validators = await sync_to_async(validators)(
+                request, *args, **kwargs
+            )
+            return await conditional_view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,12 +1,29 @@
 # sitecontent/context_processors.py
-from .models import SiteContact, Service
+from django.utils.functional import SimpleLazyObject
 
+from .models import Service
+from . import caching, singletons
 
-def site_contact(request):
-    contact = SiteContact.objects.first()
+NAV_TIMEOUT = 24 * 60 * 60
+
+
+def nav_services() -> list:
     # On expose quelques services pour le mega-menu (ne casse rien si vide)
-    nav_services = Service.objects.order_by("title")[:6]
+    return caching.remember(
+        "nav_services",
+        lambda: list(Service.objects.for_list().order_by("title")[:6]),
+        ("service",),
+        NAV_TIMEOUT,
+    )
+
+
+def site_contact(request):
+    """
+    Header / footer : coordonnées et services du mega-menu. Valeurs
+    paresseuses : lues seulement si le {% fragment %} qui les affiche n'est
+    pas en cache (sinon ni cache ni SQL).
+    """
     return {
-        "site_contact": contact,
-        "nav_services": nav_services,
+        "site_contact": SimpleLazyObject(singletons.site_contact.get),
+        "nav_services": SimpleLazyObject(nav_services),
     }
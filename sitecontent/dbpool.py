@@ -0,0 +1,104 @@
+# sitecontent/dbpool.py
+"""
+Pools de connexions Postgres (psycopg_pool, OPTIONS["pool"] dans settings) :
+statistiques pour la supervision et mesure de la réutilisation.
+
+Un pool existe par worker gunicorn et par alias de base ; pool_stats() lit
+celui du processus courant.
+"""
+import threading
+import time
+from itertools import count
+
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+
+# Compteurs de psycopg_pool retenus (cf. ConnectionPool.get_stats())
+STATS_KEYS = (
+    "pool_min",
+    "pool_max",
+    "pool_size",
+    "pool_available",
+    "requests_waiting",
+    "requests_num",
+    "requests_queued",
+    "requests_wait_ms",
+    "requests_errors",
+    "usage_ms",
+    "returns_bad",
+    "connections_num",
+    "connections_ms",
+    "connections_errors",
+    "connections_lost",
+)
+
+
+def get_pool(alias="default"):
+    """Pool psycopg de `alias`, None si la base n'en utilise pas."""
+    return getattr(connections[alias], "pool", None)
+
+
+def pool_stats() -> list:
+    """Compteurs des pools de ce processus, un dict par alias."""
+    stats = []
+    for alias in connections:
+        pool = get_pool(alias)
+        if pool is None:
+            continue
+        values = pool.get_stats()
+        stats.append(
+            {"alias": alias, **{key: values.get(key, 0) for key in STATS_KEYS}}
+        )
+    return stats
+
+
+def exercise(alias, requests: int, concurrency: int, sql="SELECT 1") -> dict:
+    """
+    `requests` « requêtes HTTP » simulées sur `concurrency` threads : une
+    requête SQL encadrée par close_old_connections(), comme le fait Django en
+    début / fin de requête. Renvoie les latences et le nombre de connexions
+    physiques ouvertes (comptées par psycopg_pool ou par connection_created).
+    """
+    pool = get_pool(alias)
+    opened_before = pool.get_stats().get("connections_num", 0) if pool else 0
+    opened = 0
+    lock = threading.Lock()
+    timings = []
+    counter = count()
+
+    def count_connection(sender, connection, **kwargs):
+        nonlocal opened
+        if connection.alias == alias:
+            with lock:
+                opened += 1
+
+    def worker():
+        samples = []
+        while next(counter) < requests:
+            start = time.perf_counter()
+            close_old_connections()
+            with connections[alias].cursor() as cursor:
+                cursor.execute(sql)
+                cursor.fetchall()
+            close_old_connections()
+            samples.append(time.perf_counter() - start)
+        connections[alias].close()
+        with lock:
+            timings.extend(samples)
+
+    if pool is None:
+        connection_created.connect(count_connection, weak=False)
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        connection_created.disconnect(count_connection)
+    elapsed = time.perf_counter() - start
+
+    if pool is not None:
+        opened = pool.get_stats().get("connections_num", 0) - opened_before
+    return {"elapsed": elapsed, "timings": timings, "connections_opened": opened}
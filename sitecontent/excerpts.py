@@ -0,0 +1,39 @@
+# sitecontent/excerpts.py
+"""
+Résumés en texte brut (champ `summary`) de Service, Project et Post.
+
+Calculés à la sauvegarde depuis le premier champ source non vide, une fois
+pour toutes : les cartes et balises meta n'ont plus à charger ni à nettoyer
+(striptags) les corps HTML complets à chaque rendu.
+"""
+from .search import to_plain_text
+
+SUMMARY_LENGTH = 300
+
+# Champs sources par ordre de préférence, par nom de modèle (utilisable
+# aussi avec les modèles « historiques » des migrations)
+SUMMARY_SOURCES = {
+    "service": ("excerpt", "body"),
+    "project": ("context", "solution", "results"),
+    "post": ("body",),
+}
+
+
+def truncate(text: str, length: int = SUMMARY_LENGTH) -> str:
+    if len(text) <= length:
+        return text
+    cut = text[: length - 1].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:.") + "…"
+
+
+def build_summary(instance) -> str:
+    for field in SUMMARY_SOURCES[instance._meta.model_name]:
+        text = to_plain_text(getattr(instance, field, ""))
+        if text:
+            return truncate(text)
+    return ""
+
+
+def update_summary(sender, instance, **kwargs):
+    """pre_save : recalcule le résumé avant écriture."""
+    instance.summary = build_summary(instance)
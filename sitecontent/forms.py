@@ -2,9 +2,12 @@
 from django import forms
 from django.conf import settings
 from django.core.mail import EmailMessage
+from django.db import transaction
 import csv, io
 import logging
 
+from . import outbox
+
 logger = logging.getLogger(__name__)
 # 👇 Ajout des classes manquantes pour bordures visibles + confort + focus net
 BASE_INPUT_CLASS = (
@@ -99,13 +102,12 @@ class ContactForm(forms.Form):
         lines.append(cd["message"])
         return "\n".join(lines)
 
-    # --- Envoi principal + (option) copie à l’expéditeur ---
+    # --- Message interne + (option) copie à l’expéditeur ---
 
-    def send_email(self, *, requester_ip: str = "", user_agent: str = "") -> bool:
+    def build_messages(self, *, requester_ip: str = "", user_agent: str = "") -> list:
         """
-        Envoie 1) un mail interne à contact@annoor.tech
-               2) si send_copy_csv=True : une copie à l’expéditeur, CSV en pièce jointe
-        Retourne True si l’envoi interne a été tenté (pas forcément délivré).
+        Construit 1) le mail interne à contact@annoor.tech
+                  2) si send_copy_csv=True : la copie à l’expéditeur, CSV en pièce jointe
         """
         cd = self.cleaned_data
         subject = cd["subject"].strip() or "Contact site"
@@ -117,20 +119,15 @@ class ContactForm(forms.Form):
         from_email = settings.EMAIL_HOST_USER
         to_list = [getattr(settings, "CONTACT_INBOX", settings.EMAIL_HOST_USER)]
 
-        msg_internal = EmailMessage(
-            subject=subject,
-            body=body_internal,
-            from_email=from_email,
-            to=to_list,
-            reply_to=[f"{cd['name']} <{cd['email']}>"],
-        )
-
-        try:
-            msg_internal.send(fail_silently=False)
-        except Exception as e:
-            # On laisse la vue gérer l’erreur via messages.error
-            logger.exception("SMTP internal send failed: %s", getattr(e, "args", e))
-            return False
+        msgs = [
+            EmailMessage(
+                subject=subject,
+                body=body_internal,
+                from_email=from_email,
+                to=to_list,
+                reply_to=[f"{cd['name']} <{cd['email']}>"],
+            )
+        ]
 
         # 2) Copie à l’expéditeur (optionnelle)
         if cd.get("send_copy_csv"):
@@ -157,9 +154,17 @@ class ContactForm(forms.Form):
                 content=self._csv_bytes(),
                 mimetype="text/csv",
             )
-            try:
-                msg_copy.send(fail_silently=True)
-            except Exception:
-                pass
+            msgs.append(msg_copy)
+
+        return msgs
 
-        return True
+    def queue_email(self, *, requester_ip: str = "", user_agent: str = "") -> None:
+        """
+        Met les messages en file d'envoi (outbox.py) : aucun appel SMTP ici,
+        la livraison est faite par le worker `send_outbox`.
+        """
+        with transaction.atomic():
+            for msg in self.build_messages(
+                requester_ip=requester_ip, user_agent=user_agent
+            ):
+                outbox.enqueue(msg)
@@ -0,0 +1,209 @@
+# sitecontent/images.py
+"""
+Déclinaisons responsive des images uploadées (AVIF / WebP / JPEG).
+
+Chaque image uploadée est redimensionnée aux largeurs IMAGE_RENDITION_WIDTHS
+et enregistrée via le stockage par défaut (disque local ou R2), hors des
+requêtes de l'admin : le worker `build_renditions --watch` (service `images`
+en docker-compose) traite les nouveaux uploads. Les noms générés contiennent
+l'empreinte du fichier source : ils sont immuables.
+Le modèle ImageRendition garde la liste des variantes, lue par le tag
+{% responsive_image %} (templatetags/responsive_images.py).
+"""
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+from PIL import Image, ImageOps, features
+
+from . import caching
+from .models import (
+    HomeSettings,
+    ImageRendition,
+    Partner,
+    Post,
+    Project,
+    ProjectImage,
+    Service,
+)
+
+# Champs image à décliner, par modèle
+IMAGE_FIELDS = {
+    Service: ("cover",),
+    Project: ("cover",),
+    ProjectImage: ("image",),
+    Post: ("cover",),
+    Partner: ("logo",),
+    HomeSettings: ("hero_bg",),
+}
+
+RENDITION_WIDTHS = tuple(
+    getattr(settings, "IMAGE_RENDITION_WIDTHS", (320, 640, 960, 1280, 1920))
+)
+QUALITY = {"avif": 50, "webp": 75, "jpeg": 80}
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg"}
+
+# Ordre de préférence dans <picture> ; AVIF seulement si Pillow le supporte
+FORMATS = tuple(
+    fmt for fmt in ("avif", "webp", "jpeg") if fmt == "jpeg" or features.check(fmt)
+)
+
+LOOKUP_TIMEOUT = 60 * 60
+
+
+def rendition_name(source: str, digest: str, width: int, fmt: str) -> str:
+    stem = os.path.splitext(source)[0]
+    return f"renditions/{stem}.{digest}/w{width}.{EXTENSIONS[fmt]}"
+
+
+def _encode(img, fmt: str) -> bytes:
+    if fmt == "jpeg" and img.mode != "RGB":
+        # JPEG sans transparence : on aplatit sur fond blanc
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        rgba = img.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        img = background
+    elif img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+    buf = BytesIO()
+    options = {"quality": QUALITY[fmt]}
+    if fmt == "jpeg":
+        options.update(optimize=True, progressive=True)
+    img.save(buf, format=fmt.upper(), **options)
+    return buf.getvalue()
+
+
+def build_renditions(source: str, storage=default_storage, force: bool = False):
+    """
+    Génère (ou complète) les variantes de `source`. Les fichiers déjà présents
+    sont conservés : une exécution interrompue reprend là où elle s'était arrêtée.
+    """
+    with storage.open(source, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()[:12]
+
+    with Image.open(BytesIO(data)) as original:
+        original = ImageOps.exif_transpose(original)
+        width, height = original.size
+        widths = sorted({min(w, width) for w in RENDITION_WIDTHS})
+
+        variants = {}
+        for fmt in FORMATS:
+            variants[fmt] = []
+            for w in widths:
+                name = rendition_name(source, digest, w, fmt)
+                if force or not storage.exists(name):
+                    h = max(1, round(height * w / width))
+                    resized = original.resize((w, h), Image.Resampling.LANCZOS)
+                    if storage.exists(name):
+                        storage.delete(name)
+                    # Nom réellement attribué par le stockage (il peut le changer)
+                    name = storage.save(name, ContentFile(_encode(resized, fmt)))
+                variants[fmt].append([w, name])
+
+    rendition, _ = ImageRendition.objects.update_or_create(
+        source=source,
+        defaults={"width": width, "height": height, "variants": variants},
+    )
+    cache.delete(_lookup_key(source))
+    return rendition
+
+
+# --- Lecture (templates) ---
+
+
+def _lookup_key(source: str) -> str:
+    return "rendition:" + hashlib.md5(source.encode("utf-8")).hexdigest()
+
+
+def get_rendition(source: str):
+    """Retourne {"width", "height", "variants"} ou None si pas encore généré."""
+    if not source:
+        return None
+    key = _lookup_key(source)
+    data = cache.get(key)
+    if data is None:
+        rendition = (
+            ImageRendition.objects.filter(source=source)
+            .values("width", "height", "variants")
+            .first()
+        )
+        data = rendition or False
+        # Cache négatif plus court : l'image peut être en cours de génération
+        cache.set(key, data, LOOKUP_TIMEOUT if rendition else 60)
+    return data or None
+
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def srcset(variants) -> str:
+    return ", ".join(f"{default_storage.url(name)} {w}w" for w, name in variants)
+
+
+def picture_html(
+    rendition, sizes, alt="", css_class="", loading="lazy", extra="", dimensions=None
+):
+    """
+    <picture> avec sources AVIF/WebP et <img> JPEG en srcset, depuis les
+    variantes de get_rendition() ; `dimensions` : (largeur, hauteur) ou None.
+    """
+    variants = rendition["variants"]
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (MIME_TYPES[fmt], srcset(variants[fmt]), sizes)
+            for fmt in ("avif", "webp")
+            if variants.get(fmt)
+        ),
+    )
+    fallback = variants.get("jpeg") or next(iter(variants.values()))
+    # src = variante intermédiaire (navigateurs sans srcset)
+    default_src = default_storage.url(fallback[len(fallback) // 2][1])
+    size_attrs = (
+        format_html(' width="{}" height="{}"', *dimensions) if dimensions else ""
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{} '
+        'alt="{}"{} loading="{}" decoding="async"{}></picture>',
+        sources,
+        default_src,
+        srcset(fallback),
+        sizes,
+        size_attrs,
+        alt,
+        format_html(' class="{}"', css_class) if css_class else "",
+        loading,
+        extra,
+    )
+
+
+def pending_sources(force: bool = False) -> dict:
+    """
+    Images à décliner (toutes si `force`) : {nom: {tags des pages qui
+    l'affichent}}, triées par nom.
+    """
+    tags = {}
+    for model, fields in IMAGE_FIELDS.items():
+        for field in fields:
+            names = (
+                model.objects.exclude(**{field: ""})
+                .values_list(field, flat=True)
+                .distinct()
+            )
+            for name in names:
+                if name:
+                    tags.setdefault(name, set()).add(caching.tag_for_model(model))
+    if not force:
+        done = ImageRendition.objects.filter(source__in=tags).values_list(
+            "source", flat=True
+        )
+        for name in done:
+            del tags[name]
+    return dict(sorted(tags.items()))
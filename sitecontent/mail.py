@@ -0,0 +1,252 @@
+# sitecontent/mail.py
+"""
+Pool de connexions SMTP réutilisables.
+
+Chaque envoi via le backend SMTP de Django ouvre une connexion TCP + TLS
+(et s'authentifie) puis la ferme. PooledEmailBackend garde au contraire
+quelques sessions ouvertes par processus et les prête aux envois suivants :
+
+* une session inactive depuis plus de EMAIL_POOL_CHECK_AFTER secondes est
+  vérifiée par un NOOP avant réutilisation ; au-delà de EMAIL_POOL_MAX_IDLE
+  (ou EMAIL_POOL_MAX_LIFETIME depuis l'ouverture) elle est fermée ;
+* une session qui a levé une erreur n'est jamais rendue au pool ;
+* pool_stats() expose les compteurs (création, réutilisation, échecs…).
+
+Activation : EMAIL_BACKEND = "sitecontent.mail.PooledEmailBackend", le
+backend réel étant EMAIL_POOL_BACKEND (SMTP par défaut, locmem en test).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+DEFAULT_POOL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+
+class _Slot:
+    __slots__ = ("backend", "opened_at", "released_at")
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.opened_at = self.released_at = time.monotonic()
+
+
+def _is_alive(backend) -> bool:
+    smtp = getattr(backend, "connection", None)
+    if smtp is None:
+        return True  # backend sans socket (locmem, fichier, console…)
+    try:
+        return smtp.noop()[0] == 250
+    except Exception:
+        return False
+
+
+def _close(backend) -> None:
+    try:
+        backend.close()
+    except Exception:
+        pass
+
+
+class SMTPConnectionPool:
+    """Sessions ouvertes prêtes à l'emploi, au plus `size` en même temps."""
+
+    def __init__(
+        self, backend_path, options, size, max_idle, max_lifetime, check_after
+    ):
+        self.backend_path = backend_path
+        self.options = options
+        self.size = size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._in_use = 0
+        self._counters = {
+            "created": 0,
+            "reused": 0,
+            "health_check_failures": 0,
+            "expired": 0,
+            "discarded": 0,
+            "wait_timeouts": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def acquire(self, timeout=None) -> _Slot:
+        if not self._slots.acquire(timeout=timeout):
+            self._count("wait_timeouts")
+            raise TimeoutError("SMTP connection pool exhausted")
+        try:
+            slot = self._take_idle() or self._open()
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+        return slot
+
+    def _take_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                slot = self._idle.pop()  # la plus récente : la plus sûre
+            now = time.monotonic()
+            idle_for = now - slot.released_at
+            if idle_for > self.max_idle or now - slot.opened_at > self.max_lifetime:
+                self._count("expired")
+                _close(slot.backend)
+                continue
+            if idle_for > self.check_after and not _is_alive(slot.backend):
+                self._count("health_check_failures")
+                _close(slot.backend)
+                continue
+            self._count("reused")
+            return slot
+
+    def _open(self) -> _Slot:
+        backend = get_connection(self.backend_path, fail_silently=False, **self.options)
+        backend.open()
+        self._count("created")
+        return _Slot(backend)
+
+    def release(self, slot: _Slot, broken: bool = False) -> None:
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if broken:
+                self._count("discarded")
+                _close(slot.backend)
+            else:
+                slot.released_at = time.monotonic()
+                with self._lock:
+                    self._idle.append(slot)
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for slot in idle:
+            _close(slot.backend)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                **self._counters,
+            }
+
+
+# --- Pools du processus (un par configuration de backend) ---
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(backend_path=None, **options) -> SMTPConnectionPool:
+    backend_path = backend_path or getattr(
+        settings, "EMAIL_POOL_BACKEND", DEFAULT_POOL_BACKEND
+    )
+    # send_mail() passe username/password=None : même pool que get_connection()
+    options = {k: v for k, v in options.items() if v is not None}
+    key = (backend_path, tuple(sorted(options.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SMTPConnectionPool(
+                backend_path,
+                options,
+                size=getattr(settings, "EMAIL_POOL_SIZE", 2),
+                max_idle=getattr(settings, "EMAIL_POOL_MAX_IDLE", 120),
+                max_lifetime=getattr(settings, "EMAIL_POOL_MAX_LIFETIME", 900),
+                check_after=getattr(settings, "EMAIL_POOL_CHECK_AFTER", 10),
+            )
+        return pool
+
+
+def pool_stats() -> list:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [{"backend": p.backend_path, **p.stats()} for p in pools]
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+# --- Backend ---
+
+
+class PooledEmailBackend(BaseEmailBackend):
+    """
+    Backend Django qui emprunte une session au pool. Entre open() et close(),
+    la même session sert à tous les envois (ex. mail interne + copie CSV).
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.pool = get_pool(**kwargs)
+        self._slot = None
+        self._held = False
+
+    def __deepcopy__(self, memo):
+        # Le backend locmem copie les messages (et donc leur .connection) :
+        # le pool et ses verrous sont partagés, jamais dupliqués.
+        return self
+
+    def open(self):
+        opened = self._acquire()
+        self._held = True
+        return opened
+
+    def close(self):
+        self._held = False
+        self._release()
+
+    def _acquire(self):
+        if self._slot is not None:
+            return False
+        self._slot = self.pool.acquire(
+            timeout=getattr(settings, "EMAIL_POOL_TIMEOUT", 30)
+        )
+        return True
+
+    def _release(self, broken=False):
+        if self._slot is not None:
+            slot, self._slot = self._slot, None
+            self.pool.release(slot, broken=broken)
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        try:
+            new_session = self._acquire()
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        try:
+            sent = self._slot.backend.send_messages(email_messages)
+        except Exception:
+            # Session dans un état inconnu : jamais rendue au pool, la
+            # prochaine tentative en ouvrira une neuve.
+            self._release(broken=True)
+            if not self.fail_silently:
+                raise
+            return 0
+        if new_session and not self._held:
+            self._release()
+        return sent
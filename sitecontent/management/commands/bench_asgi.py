@@ -0,0 +1,97 @@
+# sitecontent/management/commands/bench_asgi.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from sitecontent import async_views, benchmark, views
+from sitecontent.models import Post, Project, Service
+
+
+def default_urls():
+    """Accueil, listes et une page de détail par type de contenu."""
+    urls = ["/", "/services/", "/projects/", "/blog/", "/partners/"]
+    service = Service.objects.values_list("slug", flat=True).first()
+    project = Project.objects.values_list("slug", flat=True).first()
+    post = Post.objects.published().values_list("slug", flat=True).first()
+    if service:
+        urls.append(f"/services/{service}/")
+    if project:
+        urls.append(f"/projects/{project}/")
+    if post:
+        urls.append(f"/blog/{post}/")
+    return urls
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare les vues synchrones (WSGI) et async (ASGI) sur les pages "
+        "publiques d'une base de test générée : débit et latences p50 / p95 / "
+        "p99 par URL."
+    )
+
+    def add_arguments(self, parser):
+        volumes = parser.add_argument_group("jeu de données")
+        for name, default in benchmark.VOLUMES.items():
+            volumes.add_argument(f"--{name}", type=int, default=default)
+        volumes.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=0,
+            help="Délai ajouté à chaque requête SQL, en ms (base distante).",
+        )
+        parser.add_argument(
+            "--page-cache",
+            action="store_true",
+            help="Garde le cache de pages (sinon chaque requête rend la page).",
+        )
+        parser.add_argument(
+            "--url", action="append", dest="urls", help="URL à mesurer (répétable)."
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Conserve la base de test entre deux exécutions.",
+        )
+        parser.add_argument("--json", action="store_true", help="Sortie JSON.")
+
+    def handle(self, *args, **opts):
+        if opts["requests"] < 1 or opts["concurrency"] < 1:
+            raise CommandError("--requests et --concurrency doivent être positifs.")
+
+        profiles = (
+            ("wsgi", views, benchmark.run_wsgi),
+            ("asgi", async_views, benchmark.run_asgi),
+        )
+        volumes = {name: opts[name] for name in benchmark.VOLUMES}
+        results = {}
+        with benchmark.test_site(opts["keepdb"], opts["page_cache"]):
+            benchmark.seed(opts["seed"], **volumes)
+            urls = opts["urls"] or default_urls()
+            for name, public, run in profiles:
+                with override_settings(
+                    ROOT_URLCONF=benchmark.urlconf(public)
+                ), benchmark.db_latency(opts["db_latency"]):
+                    run(urls[:1], 1, 1)  # chauffe : templates, connexions
+                    results[name] = run(urls, opts["requests"], opts["concurrency"])
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, report in results.items():
+            overall = report["overall"]
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"{name.upper()} : {report['throughput_rps']} req/s, "
+                    f"p50 {overall['p50_ms']} ms, p95 {overall['p95_ms']} ms, "
+                    f"p99 {overall['p99_ms']} ms, statuts {report['statuses']}"
+                )
+            )
+            for url, stats in report["urls"].items():
+                self.stdout.write(
+                    f"  {url:<40} p50 {stats['p50_ms']:>8} ms   "
+                    f"p95 {stats['p95_ms']:>8} ms   p99 {stats['p99_ms']:>8} ms"
+                )
@@ -0,0 +1,87 @@
+# sitecontent/management/commands/bench_db_pool.py
+import copy
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from sitecontent import benchmark, dbpool
+
+# Configurations comparées : (alias temporaire, CONN_MAX_AGE, pool)
+PROFILES = (
+    ("direct", 0, False),  # une connexion par requête
+    ("persistent", 60, False),  # une connexion gardée par thread
+    ("pool", 0, True),  # pool psycopg partagé (DB_POOL)
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la réutilisation des connexions Postgres sous charge "
+        "concurrente : connexion par requête, persistante par thread, pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--sql", default="SELECT 1", help="Requête exécutée par requête simulée."
+        )
+        parser.add_argument("--json", action="store_true", help="Sortie JSON.")
+
+    def handle(self, *args, **opts):
+        base = connections.settings["default"]
+        if base["ENGINE"] != "django.db.backends.postgresql":
+            raise CommandError("Base Postgres requise (DB_ENGINE / DATABASE_URL).")
+
+        results = {}
+        for name, max_age, pooled in PROFILES:
+            alias = f"bench_{name}"
+            config = copy.deepcopy(base)
+            config["CONN_MAX_AGE"] = max_age
+            config["OPTIONS"].pop("pool", None)
+            if pooled:
+                config["OPTIONS"]["pool"] = dict(settings.DB_POOL_OPTIONS)
+            connections.settings[alias] = config
+            try:
+                run = dbpool.exercise(
+                    alias, opts["requests"], opts["concurrency"], opts["sql"]
+                )
+                report = {
+                    "connections_opened": run["connections_opened"],
+                    "throughput_rps": round(opts["requests"] / run["elapsed"], 1),
+                    **benchmark.summarize(run["timings"]),
+                }
+                if pooled:
+                    (report["pool"],) = [
+                        stats
+                        for stats in dbpool.pool_stats()
+                        if stats["alias"] == alias
+                    ]
+                results[name] = report
+            finally:
+                if pooled:
+                    connections[alias].close_pool()
+                del connections[alias]
+                del connections.settings[alias]
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{opts['requests']} requêtes, {opts['concurrency']} threads, "
+            f"pool max_size={settings.DB_POOL_OPTIONS['max_size']}"
+        )
+        for name, report in results.items():
+            self.stdout.write(
+                f"  {name:<11} connexions ouvertes {report['connections_opened']:>5}"
+                f"   {report['throughput_rps']:>8} req/s   p50 {report['p50_ms']} ms"
+                f"   p95 {report['p95_ms']} ms   p99 {report['p99_ms']} ms"
+            )
+        pool = results["pool"]["pool"]
+        self.stdout.write(
+            f"  pool : {pool['requests_num']} emprunts, "
+            f"{pool['requests_queued']} en attente ({pool['requests_wait_ms']} ms), "
+            f"{pool['returns_bad']} connexions rendues invalides"
+        )
@@ -0,0 +1,138 @@
+# sitecontent/management/commands/bench_site.py
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from sitecontent import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Banc d'essai du site public sur une base de test générée (graine "
+        "fixe) : débit, latences p50 / p95 / p99 et requêtes SQL par URL, en "
+        "JSON ; --compare signale les régressions par rapport à un rapport "
+        "précédent."
+    )
+
+    def add_arguments(self, parser):
+        volumes = parser.add_argument_group("jeu de données")
+        for name, default in benchmark.VOLUMES.items():
+            volumes.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=(
+                    "Images de galerie par projet."
+                    if name == "images"
+                    else f"Nombre de {name} (défaut : {default})."
+                ),
+            )
+        volumes.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--requests", type=int, default=100, help="Requêtes par URL."
+        )
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--warmup", type=int, default=2, help="Requêtes de chauffe par URL."
+        )
+        parser.add_argument(
+            "--page-cache",
+            action="store_true",
+            help="Garde le cache de pages (sinon chaque requête rend la page).",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Conserve la base de test entre deux exécutions.",
+        )
+        parser.add_argument("--output", help="Fichier JSON du rapport (sinon stdout).")
+        parser.add_argument("--compare", help="Rapport JSON de référence.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20.0,
+            help="Hausse de latence tolérée, en %% (défaut : 20).",
+        )
+
+    def handle(self, *args, **opts):
+        if opts["requests"] < 1 or opts["concurrency"] < 1:
+            raise CommandError("--requests et --concurrency doivent être positifs.")
+        previous = None
+        if opts["compare"]:
+            previous = json.loads(Path(opts["compare"]).read_text(encoding="utf-8"))
+
+        volumes = {name: opts[name] for name in benchmark.VOLUMES}
+        with benchmark.test_site(opts["keepdb"], opts["page_cache"]):
+            benchmark.seed(opts["seed"], **volumes)
+            urls = benchmark.site_urls()
+            paths = list(urls.values())
+            benchmark.run_wsgi(paths, opts["warmup"] * len(paths), 1)
+            run = benchmark.run_wsgi(
+                paths, opts["requests"] * len(paths), opts["concurrency"]
+            )
+
+        report = {
+            "meta": {
+                "date": timezone.now().isoformat(timespec="seconds"),
+                "release": settings.RELEASE,
+                "seed": opts["seed"],
+                "volumes": volumes,
+                "requests_per_url": opts["requests"],
+                "concurrency": opts["concurrency"],
+                "page_cache": opts["page_cache"],
+                "debug": settings.DEBUG,
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+            },
+            "requests": run["requests"],
+            "elapsed_s": run["elapsed_s"],
+            "throughput_rps": run["throughput_rps"],
+            "statuses": run["statuses"],
+            "overall": run["overall"],
+            # Par nom d'URL : stable d'une exécution à l'autre
+            "urls": {
+                name: {"path": path, **run["urls"][path]} for name, path in urls.items()
+            },
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if opts["output"]:
+            Path(opts["output"]).write_text(output + "\n", encoding="utf-8")
+            self.stderr.write(
+                f"{report['requests']} requêtes, {report['throughput_rps']} req/s "
+                f"-> {opts['output']}"
+            )
+        else:
+            self.stdout.write(output)
+
+        errors = {code: n for code, n in report["statuses"].items() if code >= "400"}
+        if errors:
+            self.stderr.write(self.style.WARNING(f"Réponses en erreur : {errors}"))
+        if previous is not None:
+            self._compare(previous, report, opts["threshold"])
+
+    def _compare(self, previous, report, threshold):
+        for key in ("seed", "volumes", "requests_per_url", "concurrency", "page_cache"):
+            if previous["meta"].get(key) != report["meta"][key]:
+                self.stderr.write(
+                    self.style.WARNING(
+                        f"Options différentes de la référence ({key}) : "
+                        "comparaison peu fiable."
+                    )
+                )
+        rows = benchmark.compare(previous, report, threshold)
+        regressions = [row for row in rows if row[-1]]
+        for url, metric, before, after, change, worse in rows:
+            line = f"{url:<16} {metric:<15} {before:>10} -> {after:<10} {change:+.1f} %"
+            self.stderr.write(self.style.ERROR(line) if worse else line)
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} régression(s) au-delà de {threshold:g} %."
+            )
+        self.stderr.write(self.style.SUCCESS("Aucune régression."))
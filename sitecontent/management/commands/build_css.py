@@ -0,0 +1,48 @@
+# sitecontent/management/commands/build_css.py
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sitecontent import stylesheet
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère static/css/site.css à partir des classes utilitaires "
+        "employées dans les templates (à lancer avant collectstatic)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=str(Path(settings.BASE_DIR) / stylesheet.OUTPUT),
+            help="Fichier CSS produit.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="N'écrit rien ; échoue si le fichier n'est pas à jour (CI).",
+        )
+
+    def handle(self, *args, **opts):
+        css, count = stylesheet.build()
+        output = Path(opts["output"])
+        current = output.read_text(encoding="utf-8") if output.exists() else None
+
+        if opts["check"]:
+            if current != css:
+                raise CommandError(
+                    f"{output} n'est pas à jour : lancez `manage.py build_css`."
+                )
+            self.stdout.write(self.style.SUCCESS(f"{output} à jour."))
+            return
+
+        if current == css:
+            self.stdout.write(f"{output} inchangé ({count} classes).")
+            return
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(css, encoding="utf-8")
+        self.stdout.write(
+            self.style.SUCCESS(f"{output} : {count} classes, {len(css)} octets.")
+        )
@@ -0,0 +1,170 @@
+# sitecontent/management/commands/build_renditions.py
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from sitecontent import caching, images, prerender, richtext
+
+# Articles relus à chaque scrutation : `updated` est fixé avant le commit, un
+# article validé juste après une scrutation doit encore être vu à la suivante
+RECENT_POSTS = timedelta(minutes=1)
+
+
+def _build(source, force):
+    try:
+        images.build_renditions(source, force=force)
+    finally:
+        # Chaque thread a sa propre connexion DB
+        connection.close()
+
+
+def _optimize(pk):
+    try:
+        return richtext.optimize_post(pk)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère les déclinaisons responsive (AVIF/WebP/JPEG) des images. "
+        "Reprenable : les images déjà traitées sont ignorées. --watch : worker "
+        "qui traite les nouveaux uploads et régénère l'export statique."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Nombre de threads (défaut : 4)."
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Régénère toutes les variantes, même existantes.",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help=(
+                "Worker : scrute les nouveaux uploads et les pages de l'export "
+                "statique à régénérer jusqu'à SIGTERM."
+            ),
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Pause (s) entre deux scrutations (--watch).",
+        )
+
+    def handle(self, *args, **opts):
+        if not opts["watch"]:
+            sources = images.pending_sources(force=opts["force"])
+            if not sources:
+                self.stdout.write("Aucune image à traiter.")
+                return
+            done, failed = self.build(sources, opts["workers"], opts["force"])
+            style = self.style.SUCCESS if not failed else self.style.WARNING
+            self.stdout.write(
+                style(f"Terminé : {len(done)} ok, {len(failed)} en échec.")
+            )
+            return
+
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        # Sources / articles en échec : plus retentés avant le redémarrage
+        skipped, skipped_posts = set(), set()
+        since = None  # premier passage : tous les articles
+        while not self._stop:
+            close_old_connections()
+            sources = {
+                source: tags
+                for source, tags in images.pending_sources().items()
+                if source not in skipped
+            }
+            if sources:
+                _, failed = self.build(sources, opts["workers"], force=False)
+                skipped.update(failed)
+
+            # Images insérées dans le corps des articles (CKEditor)
+            started = timezone.now()
+            posts = [
+                pk for pk in richtext.recent_posts(since) if pk not in skipped_posts
+            ]
+            skipped_posts.update(self.build_bodies(posts, opts["workers"]))
+            since = started - RECENT_POSTS
+
+            # Pages de l'export statique retirées par les sauvegardes
+            if prerender.enabled():
+                self.export_pending()
+
+            if not sources:
+                time.sleep(opts["interval"])
+
+    def build(self, sources: dict, workers: int, force: bool):
+        total = len(sources)
+        self.stdout.write(f"{total} image(s) à traiter avec {workers} thread(s)…")
+
+        done, failed = [], []
+        # Pillow libère le GIL pendant le redimensionnement et l'encodage
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(_build, source, force): source for source in sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    future.result()
+                    done.append(source)
+                    self.stdout.write(f"[{len(done) + len(failed)}/{total}] {source}")
+                except Exception as e:
+                    failed.append(source)
+                    self.stderr.write(
+                        f"[{len(done) + len(failed)}/{total}] {source} : {e}"
+                    )
+        close_old_connections()
+
+        # Les pages déjà en cache (et l'export statique) affichent l'original
+        tags = {tag for source in done for tag in sources[source]}
+        if tags:
+            caching.bump(*tags)
+            prerender.queue({tag: {None} for tag in tags})
+        return done, failed
+
+    def build_bodies(self, pks, workers: int) -> list:
+        """Images manquantes du corps de `pks` ; retourne les articles en échec."""
+        changed, failed = set(), []
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(_optimize, pk): pk for pk in pks}
+            for future in as_completed(futures):
+                try:
+                    slug = future.result()
+                except Exception as e:
+                    failed.append(futures[future])
+                    self.stderr.write(f"article {futures[future]} : {e}")
+                    continue
+                if slug:
+                    changed.add(slug)
+                    self.stdout.write(f"corps : {slug}")
+        close_old_connections()
+
+        if changed:
+            caching.bump("post")
+            prerender.queue({"post": changed})
+        return failed
+
+    def export_pending(self):
+        try:
+            done = prerender.process_queue()
+        except Exception as e:
+            # Lignes conservées : nouvel essai au passage suivant
+            self.stderr.write(f"export statique : {e}")
+            return
+        if done:
+            self.stdout.write(f"export statique : {done} modification(s)")
+
+    def _request_stop(self, signum, frame):
+        self._stop = True
@@ -7,7 +7,18 @@ import socket, ssl
 class Command(BaseCommand):
     help = "Teste la connectivité SMTP (socket + éventuellement STARTTLS)."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pool",
+            action="store_true",
+            help="Teste aussi le pool de sessions (ouverture, réutilisation, NOOP).",
+        )
+
     def handle(self, *args, **opts):
+        if opts["pool"]:
+            self._check_pool()
+            return
+
         host = settings.EMAIL_HOST
         port = settings.EMAIL_PORT
         use_ssl = settings.EMAIL_USE_SSL
@@ -52,3 +63,17 @@ class Command(BaseCommand):
                         f"TLS handshake after STARTTLS: OK (protocol={ssock.version()})"
                     )
                     self.stdout.write("Done.")
+
+    def _check_pool(self):
+        from sitecontent import mail
+
+        pool = mail.get_pool()
+        for _ in range(2):
+            slot = pool.acquire(timeout=getattr(settings, "EMAIL_TIMEOUT", 20))
+            alive = mail._is_alive(slot.backend)
+            pool.release(slot, broken=not alive)
+            self.stdout.write(f"Session {'OK' if alive else 'KO'}")
+        for key, value in pool.stats().items():
+            self.stdout.write(f"  {key}: {value}")
+        mail.close_pools()
+        self.stdout.write("Done.")
@@ -0,0 +1,160 @@
+# sitecontent/management/commands/explain_queries.py
+import json
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from sitecontent import benchmark, queryplans
+
+# Listes paginées par curseur : la page suivante est aussi analysée
+CURSOR_PAGES = ("projects_list", "blog_list")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rejoue les pages publiques (variantes q / sort / year / page), les "
+        "sitemaps et les listes de l'admin sur une base de test générée, passe "
+        "chaque requête SQL à EXPLAIN et classe parcours séquentiels, tris sans "
+        "index et requêtes répétées (N+1), avec des index suggérés."
+    )
+
+    def add_arguments(self, parser):
+        volumes = parser.add_argument_group("jeu de données")
+        for name, default in benchmark.VOLUMES.items():
+            volumes.add_argument(f"--{name}", type=int, default=default)
+        volumes.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10,
+            help="Ignore les tables plus petites (singletons ; défaut : 10).",
+        )
+        parser.add_argument(
+            "--no-admin", action="store_true", help="Sans les listes de l'admin."
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Conserve la base de test entre deux exécutions.",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Constats affichés (texte)."
+        )
+        parser.add_argument("--output", help="Rapport JSON complet (fichier).")
+        parser.add_argument(
+            "--baseline",
+            help="Rapport JSON de référence : échoue sur tout nouveau constat.",
+        )
+
+    def handle(self, *args, **opts):
+        baseline = None
+        if opts["baseline"]:
+            baseline = json.loads(Path(opts["baseline"]).read_text(encoding="utf-8"))
+
+        volumes = {name: opts[name] for name in benchmark.VOLUMES}
+        with benchmark.test_site(opts["keepdb"]):
+            benchmark.seed(opts["seed"], **volumes)
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")  # statistiques à jour pour le planificateur
+            pages, errors = self._capture(staff=not opts["no_admin"])
+            report = queryplans.analyse(pages, opts["min_rows"])
+
+        report = {
+            "meta": {
+                "date": timezone.now().isoformat(timespec="seconds"),
+                "database": connection.vendor,
+                "seed": opts["seed"],
+                "volumes": volumes,
+                "min_rows": opts["min_rows"],
+            },
+            **report,
+        }
+        if opts["output"]:
+            Path(opts["output"]).write_text(
+                json.dumps(report, indent=2, ensure_ascii=False) + "\n",
+                encoding="utf-8",
+            )
+        self._print(report, opts["limit"])
+        if errors:
+            self.stderr.write(self.style.WARNING(f"Réponses en erreur : {errors}"))
+        if baseline is not None:
+            self._compare(baseline, report)
+
+    def _capture(self, staff):
+        public = Client(raise_request_exception=False)
+        admin = Client(raise_request_exception=False)
+        if staff:
+            user = get_user_model().objects.create_superuser(
+                "explain-queries", "explain-queries@example.org", None
+            )
+            admin.force_login(user)
+
+        pages, errors = {}, {}
+        for name, path in queryplans.page_variants(staff).items():
+            client = admin if name.startswith("admin:") else public
+            response, statements = queryplans.capture(client, path)
+            pages[name] = statements
+            if response.status_code >= 400:
+                errors[name] = response.status_code
+            if name in CURSOR_PAGES:
+                next_url = queryplans.next_cursor_url(path, response.content)
+                if next_url:
+                    _, pages[f"{name}?cursor"] = queryplans.capture(client, next_url)
+        return pages, errors
+
+    def _print(self, report, limit):
+        out = self.stdout
+        out.write(
+            f"{report['pages']} pages, {report['queries']} requêtes SQL, "
+            f"{report['explained']} plans distincts ({report['meta']['database']})"
+        )
+        findings = report["findings"]
+        if not findings:
+            out.write(self.style.SUCCESS("Aucun constat."))
+            return
+        counts = ", ".join(f"{kind} {n}" for kind, n in report["by_kind"].items())
+        out.write(f"{len(findings)} constats : {counts}\n")
+        for finding in findings[:limit]:
+            urls = ", ".join(finding["urls"][:4])
+            if len(finding["urls"]) > 4:
+                urls += f" (+{len(finding['urls']) - 4})"
+            timing = f", {finding['time_ms']} ms" if finding["time_ms"] else ""
+            out.write(
+                f"#{finding['rank']:<3} {finding['kind']:<8} {finding['table']} "
+                f"({finding['rows']} lignes{timing})  score {finding['score']}  "
+                f"x{finding['occurrences']}"
+            )
+            out.write(f"     pages : {urls}")
+            out.write(f"     plan  : {finding['detail']}")
+            out.write(f"     SQL   : {finding['sql'][:160]}")
+            suggestion = finding["suggestion"]
+            if suggestion and suggestion["index"] and not suggestion["existing"]:
+                out.write(self.style.WARNING(f"     index : {suggestion['index']}"))
+            if suggestion and suggestion["note"]:
+                out.write(f"     note  : {suggestion['note']}")
+        if len(findings) > limit:
+            out.write(f"… {len(findings) - limit} autres (--limit, --output).")
+
+    def _compare(self, baseline, report):
+        known = {finding["key"] for finding in baseline.get("findings", ())}
+        new = [f for f in report["findings"] if f["key"] not in known]
+        if baseline.get("meta", {}).get("database") != report["meta"]["database"]:
+            self.stderr.write(
+                self.style.WARNING(
+                    "Référence produite sur une autre base : comparaison peu fiable."
+                )
+            )
+        if new:
+            for finding in new:
+                self.stderr.write(
+                    self.style.ERROR(
+                        f"nouveau : {finding['kind']} {finding['table']} "
+                        f"({', '.join(finding['urls'][:3])})"
+                    )
+                )
+            raise CommandError(f"{len(new)} nouveau(x) constat(s) de plan.")
+        self.stderr.write(self.style.SUCCESS("Aucun nouveau constat."))
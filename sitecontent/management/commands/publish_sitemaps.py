@@ -0,0 +1,24 @@
+# sitecontent/management/commands/publish_sitemaps.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sitecontent import sitemaps
+
+
+class Command(BaseCommand):
+    help = "Pré-génère l'index et les sections de sitemap (gzip) pour SITE_URL."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sections",
+            nargs="*",
+            choices=list(sitemaps.SITEMAPS),
+            help="Sections à régénérer (toutes par défaut).",
+        )
+
+    def handle(self, *args, **opts):
+        if not getattr(settings, "SITE_URL", ""):
+            self.stdout.write("SITE_URL non défini : génération à la demande.")
+            return
+        sitemaps.publish(*opts["sections"])
+        self.stdout.write(self.style.SUCCESS("Sitemaps publiées."))
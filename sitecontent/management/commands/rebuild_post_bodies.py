@@ -0,0 +1,78 @@
+# sitecontent/management/commands/rebuild_post_bodies.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from sitecontent import caching, prerender, richtext
+from sitecontent.models import Post
+
+
+def _optimize(pk, force):
+    try:
+        return richtext.optimize_post(pk, force=force)
+    finally:
+        # Chaque thread a sa propre connexion DB
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule le corps prêt à afficher des articles (HTML nettoyé, images "
+        "du corps déclinées, srcset, width / height, lazy). Reprenable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Nombre de threads (défaut : 4)."
+        )
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="Seulement les articles jamais traités (déploiement).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Régénère aussi les déclinaisons déjà présentes.",
+        )
+
+    def handle(self, *args, **opts):
+        posts = Post.objects.order_by("pk")
+        if opts["pending"]:
+            posts = posts.filter(body_html__isnull=True)
+        pks = list(posts.values_list("pk", flat=True))
+        total = len(pks)
+        if not total:
+            self.stdout.write("Aucun article.")
+            return
+        self.stdout.write(
+            f"{total} article(s) à traiter avec {opts['workers']} thread(s)…"
+        )
+
+        changed, failed = set(), 0
+        # Pillow libère le GIL pendant le redimensionnement et l'encodage
+        with ThreadPoolExecutor(max_workers=max(1, opts["workers"])) as pool:
+            futures = {pool.submit(_optimize, pk, opts["force"]): pk for pk in pks}
+            for future in as_completed(futures):
+                try:
+                    slug = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"article {futures[future]} : {e}")
+                    continue
+                if slug:
+                    changed.add(slug)
+                    self.stdout.write(f"[{len(changed)}] {slug}")
+        close_old_connections()
+
+        if changed:
+            caching.bump("post")
+            prerender.queue({"post": changed})
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"Terminé : {len(changed)} corps mis à jour, "
+                f"{total - len(changed) - failed} inchangés, {failed} en échec."
+            )
+        )
@@ -0,0 +1,30 @@
+# sitecontent/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from sitecontent import caching, search
+from sitecontent.models import Post, Project, Service
+
+
+class Command(BaseCommand):
+    help = "Recalcule les documents de recherche et reconstruit l'index plein texte."
+
+    def handle(self, *args, **opts):
+        changed = set()
+        for model in (Service, Project, Post):
+            count = 0
+            for obj in model.objects.all().iterator():
+                doc = search.build_document(obj)
+                if doc != obj.search_document:
+                    # update() : pas de signaux, pas de modification de `updated`
+                    model.objects.filter(pk=obj.pk).update(search_document=doc)
+                    count += 1
+                    changed.add(caching.tag_for_model(model))
+            search.rebuild_fts(model)
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {count} document(s) mis à jour"
+            )
+        # update() : aucun signal ; résultats de recherche en cache à invalider
+        # (pas d'export statique : les recherches sont servies par Django)
+        if changed:
+            caching.bump(*changed)
+        self.stdout.write(self.style.SUCCESS("Index de recherche reconstruit."))
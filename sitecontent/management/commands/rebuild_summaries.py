@@ -0,0 +1,30 @@
+# sitecontent/management/commands/rebuild_summaries.py
+from django.core.management.base import BaseCommand
+
+from sitecontent import caching, excerpts, prerender
+from sitecontent.models import Post, Project, Service
+
+
+class Command(BaseCommand):
+    help = "Recalcule les résumés en texte brut (cartes, balises meta)."
+
+    def handle(self, *args, **opts):
+        changed = set()
+        for model in (Service, Project, Post):
+            fields = excerpts.SUMMARY_SOURCES[model._meta.model_name]
+            count = 0
+            for obj in model.objects.only("pk", "summary", *fields).iterator():
+                summary = excerpts.build_summary(obj)
+                if summary != obj.summary:
+                    # update() : pas de signaux, pas de modification de `updated`
+                    model.objects.filter(pk=obj.pk).update(summary=summary)
+                    count += 1
+                    changed.add(caching.tag_for_model(model))
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {count} résumé(s) mis à jour"
+            )
+        # update() : aucun signal, pages / fragments en cache à invalider ici
+        if changed:
+            caching.bump(*changed)
+            prerender.queue({tag: {None} for tag in changed})
+        self.stdout.write(self.style.SUCCESS("Résumés recalculés."))
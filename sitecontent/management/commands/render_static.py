@@ -0,0 +1,49 @@
+# sitecontent/management/commands/render_static.py
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from sitecontent import prerender
+
+
+class Command(BaseCommand):
+    help = (
+        "Pré-rend toutes les pages publiques (accueil, listes et leurs pages, "
+        "détails, sitemaps) en fichiers HTML + .gz / .zst servis par Caddy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Dossier de sortie (défaut : STATIC_EXPORT_ROOT).",
+        )
+        parser.add_argument(
+            "--site-url",
+            default="",
+            help="URL publique des pages rendues (défaut : SITE_URL).",
+        )
+
+    def handle(self, *args, **opts):
+        root = opts["output"] or prerender.export_root()
+        if not root:
+            raise CommandError("Indiquez --output ou définissez STATIC_EXPORT_ROOT.")
+        try:
+            exporter = prerender.Exporter(root, opts["site_url"])
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+
+        exporter.render_all()
+
+        stats = exporter.stats
+        summary = ", ".join(
+            f"{label} {stats[key]}"
+            for key, label in (
+                ("written", "écrites"),
+                ("unchanged", "inchangées"),
+                ("removed", "retirées"),
+                ("skipped", "laissées à Django"),
+            )
+        )
+        self.stdout.write(f"{exporter.root} : {summary}")
+        if stats["errors"]:
+            raise CommandError(f"{stats['errors']} page(s) en erreur (voir les logs).")
+        self.stdout.write(self.style.SUCCESS("Export statique terminé."))
@@ -0,0 +1,75 @@
+# sitecontent/management/commands/send_outbox.py
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sitecontent import mail, outbox
+
+PURGE_EVERY = 60 * 60
+
+
+class Command(BaseCommand):
+    help = "Worker : envoie les emails en file d'attente (retries + abandon)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Traite les messages échus puis s'arrête (cron, tests).",
+        )
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Pause (s) entre deux scrutations quand la file est vide.",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=30,
+            help="Conservation des messages envoyés (0 = jamais purgés).",
+        )
+
+    def handle(self, *args, **opts):
+        self._stop = False
+        if not opts["once"]:
+            signal.signal(signal.SIGTERM, self._request_stop)
+            signal.signal(signal.SIGINT, self._request_stop)
+
+        last_purge = 0.0
+        while not self._stop:
+            close_old_connections()
+
+            if opts["keep_days"] and time.monotonic() - last_purge > PURGE_EVERY:
+                purged = outbox.purge_sent(opts["keep_days"])
+                if purged:
+                    self.stdout.write(f"{purged} message(s) envoyé(s) purgé(s)")
+                last_purge = time.monotonic()
+
+            stats = outbox.deliver_due(opts["batch_size"])
+            processed = sum(stats.values())
+            if processed:
+                self.stdout.write(
+                    "envoyés: {sent}, à réessayer: {retry}, abandonnés: {dead}".format(
+                        **stats
+                    )
+                )
+
+            if opts["once"]:
+                if processed < opts["batch_size"]:
+                    break
+                continue
+            # Lot complet : on enchaîne sans attendre
+            if processed < opts["batch_size"]:
+                time.sleep(opts["interval"])
+
+        mail.close_pools()
+        if opts["verbosity"] >= 2:
+            for stats in mail.pool_stats():
+                self.stdout.write(f"pool SMTP: {stats}")
+
+    def _request_stop(self, signum, frame):
+        self._stop = True
@@ -0,0 +1,176 @@
+# sitecontent/media.py
+"""
+Service des médias uploadés (MEDIA_ROOT) quand aucun serveur frontal ne
+les sert lui-même (conteneur seul, type Render).
+
+* MEDIA_ACCEL = "x-accel-redirect" (nginx, Caddy `handle_response`) ou
+  "x-sendfile" (Apache, lighttpd) : Django ne fait que valider le chemin et
+  les en-têtes, le proxy envoie le fichier ;
+* sinon FileResponse : gunicorn transmet le fichier par os.sendfile()
+  (wsgi.file_wrapper), sans copie dans le processus Python.
+
+Dans les deux cas : ETag / Last-Modified (réponses 304), requêtes Range
+(lecture vidéo, reprise de téléchargement) et cache long `immutable` pour
+les noms dérivés du contenu (renditions/, cf. images.py).
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Noms dérivés du contenu : jamais réécrits, cacheables « pour toujours »
+IMMUTABLE_PREFIXES = ("renditions/",)
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _cache_control(path: str) -> str:
+    if path.startswith(IMMUTABLE_PREFIXES):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={getattr(settings, 'MEDIA_MAX_AGE', 24 * 60 * 60)}"
+
+
+def _etag(st) -> str:
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def parse_range(header: str, size: int):
+    """
+    (début, fin incluse) demandés par `Range`, None pour envoyer tout le
+    fichier (absent, invalide ou multi-plages), False si hors limites.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # bytes=-N : les N derniers octets
+        if int(last) == 0:
+            return False
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        return False if start >= size else None
+    return start, end
+
+
+def _if_range_matches(request, etag: str, mtime: int) -> bool:
+    value = request.headers.get("If-Range")
+    if not value:
+        return True
+    if value.startswith(('"', "W/")):
+        return value == etag
+    return parse_http_date_safe(value) == mtime
+
+
+class _FileRange:
+    """Fichier limité à une plage : lecture bornée, fileno() pour sendfile."""
+
+    def __init__(self, file, start: int, length: int):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _accel_response(full_path: str, path: str, content_type: str) -> HttpResponse:
+    response = HttpResponse(content_type=content_type)
+    mode = settings.MEDIA_ACCEL.lower()
+    if mode == "x-accel-redirect":
+        prefix = getattr(settings, "MEDIA_ACCEL_PREFIX", "/_protected_media/")
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(path)
+    elif mode == "x-sendfile":
+        response["X-Sendfile"] = full_path
+    else:
+        raise ValueError(f"MEDIA_ACCEL inconnu : {settings.MEDIA_ACCEL!r}")
+    # Longueur et plages (Range) sont gérées par le proxy
+    return response
+
+
+@require_safe
+def serve(request, path, document_root=None):
+    document_root = document_root or settings.MEDIA_ROOT
+    try:
+        full_path = safe_join(document_root, path)
+        st = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("Fichier introuvable.")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("Fichier introuvable.")
+
+    etag, mtime = _etag(st), int(st.st_mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(mtime),
+        "Cache-Control": _cache_control(path),
+        "X-Content-Type-Options": "nosniff",
+    }
+    not_modified = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+    if getattr(settings, "MEDIA_ACCEL", ""):
+        response = _accel_response(full_path, path, content_type)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    size = st.st_size
+    byte_range = None
+    if "Range" in request.headers and _if_range_matches(request, etag, mtime):
+        byte_range = parse_range(request.headers["Range"], size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+    else:
+        file = open(full_path, "rb")
+        if byte_range:
+            file = _FileRange(file, start, length)
+        response = FileResponse(file, content_type=content_type)
+    if byte_range:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = str(length)
+    response["Accept-Ranges"] = "bytes"
+    if encoding:
+        response["Content-Encoding"] = encoding
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -0,0 +1,604 @@
+# sitecontent/metrics.py
+"""
+Instrumentation des requêtes : latence par vue (nom d'URL), requêtes SQL
+(nombre et durée), rendu des templates, context processors, cache de pages.
+
+* MetricsMiddleware (en tête de MIDDLEWARE) mesure chaque requête ; les
+  membres du staff reçoivent un en-tête Server-Timing, lisible dans l'onglet
+  Réseau du navigateur ;
+* les histogrammes sont agrégés en mémoire dans chaque worker, puis écrits
+  au plus toutes les METRICS_FLUSH_INTERVAL secondes dans METRICS_DIR (un
+  fichier JSON par processus, remplacé atomiquement) ;
+* /metrics fusionne ces fichiers au format texte Prometheus : accès staff,
+  local (sans proxy) ou par jeton (METRICS_TOKEN). Les fichiers des
+  processus terminés sont regroupés dans un seul (dead.json).
+
+Les templates sont mesurés par le backend InstrumentedTemplates
+(TEMPLATES["BACKEND"]), le SQL par un execute_wrapper posé sur chaque
+connexion.
+"""
+import fcntl
+import hmac
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.views.decorators.cache import never_cache
+
+from . import dbpool, mail
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+METHODS = ("GET", "HEAD", "POST")
+
+# nom : (type, aide, étiquettes[, seuils des histogrammes])
+METRICS = {
+    "annoor_http_requests_total": (
+        "counter",
+        "Requêtes HTTP par vue, méthode et classe de statut.",
+        ("view", "method", "status"),
+    ),
+    "annoor_http_request_duration_seconds": (
+        "histogram",
+        "Durée des requêtes HTTP (middlewares compris).",
+        ("view",),
+        LATENCY_BUCKETS,
+    ),
+    "annoor_db_queries_per_request": (
+        "histogram",
+        "Requêtes SQL par requête HTTP.",
+        ("view",),
+        QUERY_BUCKETS,
+    ),
+    "annoor_db_query_seconds_total": (
+        "counter",
+        "Temps passé dans les requêtes SQL.",
+        ("view",),
+    ),
+    "annoor_template_render_seconds_total": (
+        "counter",
+        "Rendu des templates, hors context processors.",
+        ("view",),
+    ),
+    "annoor_context_processor_seconds_total": (
+        "counter",
+        "Temps passé dans les context processors.",
+        ("view",),
+    ),
+    "annoor_page_cache_requests_total": (
+        "counter",
+        "Réponses du cache de pages (hit / miss).",
+        ("view", "result"),
+    ),
+    # État des processus, relevé à chaque écriture
+    "annoor_cache_events_total": (
+        "counter",
+        "Compteurs du cache à deux niveaux (TwoTierCache).",
+        ("cache", "event"),
+    ),
+    "annoor_cache_local_entries": (
+        "gauge",
+        "Entrées du cache local des workers.",
+        ("cache",),
+    ),
+    "annoor_db_pool_connections": (
+        "gauge",
+        "Connexions des pools Postgres (ouvertes / libres).",
+        ("alias", "state"),
+    ),
+    "annoor_db_pool_requests_waiting": (
+        "gauge",
+        "Demandes de connexion en attente.",
+        ("alias",),
+    ),
+    "annoor_db_pool_events_total": (
+        "counter",
+        "Compteurs des pools Postgres (psycopg_pool).",
+        ("alias", "event"),
+    ),
+    "annoor_db_pool_wait_seconds_total": (
+        "counter",
+        "Attente cumulée d'une connexion libre.",
+        ("alias",),
+    ),
+    "annoor_smtp_pool_connections": (
+        "gauge",
+        "Sessions SMTP du pool (utilisées / libres).",
+        ("backend", "state"),
+    ),
+    "annoor_smtp_pool_events_total": (
+        "counter",
+        "Compteurs du pool SMTP.",
+        ("backend", "event"),
+    ),
+}
+
+DB_POOL_EVENTS = {
+    "requests_num": "requests",
+    "requests_queued": "queued",
+    "requests_errors": "request_errors",
+    "connections_num": "connections",
+    "connections_errors": "connection_errors",
+    "connections_lost": "lost",
+    "returns_bad": "bad_returns",
+}
+SMTP_POOL_EVENTS = (
+    "created",
+    "reused",
+    "health_check_failures",
+    "expired",
+    "discarded",
+    "wait_timeouts",
+)
+
+
+# --- Mesures de la requête en cours ---
+
+
+class RequestTimings:
+    __slots__ = ("queries", "db", "render", "context", "_lock")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = self.render = self.context = 0.0
+        # Les vues async exécutent du SQL dans plusieurs threads à la fois
+        self._lock = threading.Lock()
+
+    def add(self, field: str, seconds: float) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + seconds)
+            if field == "db":
+                self.queries += 1
+
+
+_current = ContextVar("request_timings", default=None)
+
+
+def _measure(field, func, *args):
+    timings = _current.get()
+    if timings is None:
+        return func(*args)
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        timings.add(field, time.perf_counter() - start)
+
+
+def _timed_execute(execute, sql, params, many, context):
+    return _measure("db", execute, sql, params, many, context)
+
+
+def _install_sql_timer(sender, connection, **kwargs):
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_execute)
+
+
+# Nouvelles connexions (threads du pool des vues async compris)…
+connection_created.connect(_install_sql_timer)
+
+
+def _install_sql_timers():
+    # … et connexions du thread déjà ouvertes avant l'import du module
+    for connection in connections.all(initialized_only=True):
+        _install_sql_timer(None, connection)
+
+
+# --- Templates ---
+
+
+class _TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        return _measure("render", super().render, context, request)
+
+
+def _timed_processor(processor):
+    @wraps(processor)
+    def wrapper(request):
+        return _measure("context", processor, request)
+
+    return wrapper
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    """DjangoTemplates mesurant le rendu et les context processors."""
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.engine.template_context_processors = tuple(
+            _timed_processor(processor)
+            for processor in self.engine.template_context_processors
+        )
+
+    def from_string(self, template_code):
+        return _TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return _TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# --- Agrégats du processus ---
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {name: {} for name in METRICS}
+        self._flushed_at = 0.0
+        self.path = None
+
+    def _inc(self, name, labels, value=1):
+        series = self._values[name]
+        series[labels] = series.get(labels, 0) + value
+
+    def _observe(self, name, labels, value):
+        buckets = METRICS[name][3]
+        # Comptes par intervalle (cumulés au rendu), puis somme et total
+        series = self._values[name].setdefault(labels, [0] * (len(buckets) + 3))
+        index = next((i for i, b in enumerate(buckets) if value <= b), len(buckets))
+        series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def record(self, view, method, status, timings, duration, page_cache):
+        key = (view,)
+        with self._lock:
+            self._inc("annoor_http_requests_total", (view, method, status))
+            self._observe("annoor_http_request_duration_seconds", key, duration)
+            self._observe("annoor_db_queries_per_request", key, timings.queries)
+            self._inc("annoor_db_query_seconds_total", key, timings.db)
+            self._inc(
+                "annoor_template_render_seconds_total",
+                key,
+                max(timings.render - timings.context, 0.0),
+            )
+            self._inc("annoor_context_processor_seconds_total", key, timings.context)
+            if page_cache in ("HIT", "MISS"):
+                self._inc(
+                    "annoor_page_cache_requests_total", (view, page_cache.lower())
+                )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = {
+                name: [[*labels, value] for labels, value in series.items()]
+                for name, series in self._values.items()
+                if series
+            }
+        for name, series in _process_state().items():
+            values[name] = [[*labels, value] for labels, value in series.items()]
+        return {"pid": os.getpid(), "time": time.time(), "values": values}
+
+    def flush(self, force=False) -> None:
+        """Écrit le fichier du processus (au plus toutes les N secondes)."""
+        now = time.monotonic()
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+        if not force and now - self._flushed_at < interval:
+            return
+        self._flushed_at = now
+        directory = _metrics_dir()
+        os.makedirs(directory, exist_ok=True)
+        if self.path is None:
+            # pid + date de démarrage : un pid réutilisé n'écrase pas l'ancien
+            self.path = os.path.join(
+                directory, f"{os.getpid()}-{time.time_ns():x}.json"
+            )
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump(self.snapshot(), fh)
+            os.replace(tmp, self.path)
+        except OSError:
+            logger.exception("Écriture des métriques impossible (%s)", directory)
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+registry = Registry()
+
+
+def _metrics_dir() -> str:
+    return getattr(settings, "METRICS_DIR", "") or os.path.join(
+        tempfile.gettempdir(), "annoor-metrics"
+    )
+
+
+def _process_state() -> dict:
+    state = {name: {} for name in METRICS if METRICS[name][0] != "histogram"}
+    for alias in settings.CACHES:
+        stats = getattr(caches[alias], "stats", None)
+        if stats is None:
+            continue
+        for event, value in stats().items():
+            if event == "local_entries":
+                state["annoor_cache_local_entries"][(alias,)] = value
+            else:
+                state["annoor_cache_events_total"][(alias, event)] = value
+    for pool in dbpool.pool_stats():
+        alias = pool["alias"]
+        opened = state["annoor_db_pool_connections"]
+        opened[(alias, "open")] = pool["pool_size"]
+        opened[(alias, "available")] = pool["pool_available"]
+        state["annoor_db_pool_requests_waiting"][(alias,)] = pool["requests_waiting"]
+        for key, event in DB_POOL_EVENTS.items():
+            state["annoor_db_pool_events_total"][(alias, event)] = pool[key]
+        state["annoor_db_pool_wait_seconds_total"][(alias,)] = (
+            pool["requests_wait_ms"] / 1000
+        )
+    for pool in mail.pool_stats():
+        backend = pool["backend"]
+        sessions = state["annoor_smtp_pool_connections"]
+        sessions[(backend, "in_use")] = pool["in_use"]
+        sessions[(backend, "idle")] = pool["idle"]
+        for event in SMTP_POOL_EVENTS:
+            state["annoor_smtp_pool_events_total"][(backend, event)] = pool[event]
+    return {name: series for name, series in state.items() if series}
+
+
+# --- Fusion des workers et format Prometheus ---
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# Compteurs et histogrammes des processus terminés, fusionnés par collect()
+ARCHIVE = "dead.json"
+
+
+def _merge(merged: dict, values: dict, gauges: bool) -> None:
+    for metric, rows in values.items():
+        spec = METRICS.get(metric)
+        if spec is None or (spec[0] == "gauge" and not gauges):
+            continue
+        series = merged.setdefault(metric, {})
+        width = len(spec[2])
+        for row in rows:
+            labels, value = tuple(row[:width]), row[width]
+            if spec[0] == "histogram":
+                total = series.setdefault(labels, [0] * len(value))
+                series[labels] = [a + b for a, b in zip(total, value)]
+            else:
+                series[labels] = series.get(labels, 0) + value
+
+
+def _read(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _prune(directory: str) -> None:
+    """
+    Fichiers des processus terminés (workers recyclés, redémarrages) : leurs
+    compteurs passent dans ARCHIVE (les totaux ne reculent pas), puis ils
+    sont supprimés. Verrou : un seul worker fusionne à la fois.
+    """
+    with open(os.path.join(directory, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = os.path.join(directory, ARCHIVE)
+        merged, dead = {}, []
+        for name in os.listdir(directory):
+            if not name.endswith(".json") or name == ARCHIVE:
+                continue
+            snapshot = _read(os.path.join(directory, name))
+            if snapshot is None or _alive(snapshot["pid"]):
+                continue
+            _merge(merged, snapshot["values"], gauges=False)
+            dead.append(name)
+        if not dead:
+            return
+        _merge(merged, (_read(archive) or {}).get("values", {}), gauges=False)
+        values = {
+            metric: [[*labels, value] for labels, value in series.items()]
+            for metric, series in merged.items()
+        }
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as fh:
+            json.dump({"pid": None, "time": time.time(), "values": values}, fh)
+        os.replace(tmp, archive)
+        for name in dead:
+            os.unlink(os.path.join(directory, name))
+
+
+def collect() -> dict:
+    """Séries de tous les processus : sommes des compteurs et histogrammes,
+    jauges des seuls processus encore en vie."""
+    merged = {name: {} for name in METRICS}
+    directory = _metrics_dir()
+    try:
+        _prune(directory)
+        names = [name for name in os.listdir(directory) if name.endswith(".json")]
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        snapshot = _read(os.path.join(directory, name))
+        if snapshot is None:
+            continue
+        alive = snapshot["pid"] is not None and _alive(snapshot["pid"])
+        _merge(merged, snapshot["values"], gauges=alive)
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(merged) -> str:
+    lines = []
+    for name, (kind, help_text, label_names, *extra) in METRICS.items():
+        series = merged.get(name)
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(series.items()):
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(label_names, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*extra[0], "+Inf"), value):
+                cumulative += count
+                le = (("le", bound if bound == "+Inf" else float(bound)),)
+                lines.append(
+                    f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}"
+                )
+            lines.append(
+                f"{name}_sum{_labels(label_names, labels)} {_number(float(value[-2]))}"
+            )
+            lines.append(f"{name}_count{_labels(label_names, labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Middleware ---
+
+
+def _is_staff(request) -> bool:
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_staff)
+
+
+def server_timing(timings, duration, page_cache=None) -> str:
+    parts = [
+        f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} SQL"',
+        f'tpl;dur={max(timings.render - timings.context, 0) * 1000:.1f};desc="Templates"',
+        f'ctx;dur={timings.context * 1000:.1f};desc="Context processors"',
+    ]
+    if page_cache:
+        parts.append(f'cache;desc="{page_cache}"')
+    parts.append(f"total;dur={duration * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """À placer en tête de MIDDLEWARE : mesure la requête complète."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        _install_sql_timers()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, timings, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        await sync_to_async(self.finish)(
+            request, response, timings, time.perf_counter() - start
+        )
+        return response
+
+    def finish(self, request, response, timings, duration):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        method = request.method if request.method in METHODS else "other"
+        page_cache = response.get("X-Page-Cache")
+        registry.record(
+            view,
+            method,
+            f"{response.status_code // 100}xx",
+            timings,
+            duration,
+            page_cache,
+        )
+        if _is_staff(request):
+            response["Server-Timing"] = server_timing(timings, duration, page_cache)
+        slow = getattr(settings, "METRICS_SLOW_REQUEST_MS", 1000)
+        if slow and duration * 1000 >= slow:
+            logger.warning(
+                "Requête lente : %s %s (%s) %.0f ms, %d SQL en %.0f ms",
+                request.method,
+                request.path,
+                view,
+                duration * 1000,
+                timings.queries,
+                timings.db * 1000,
+            )
+        registry.flush()
+
+
+# --- Endpoint ---
+
+
+def _may_scrape(request) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        given = request.headers.get("Authorization", "").encode()
+        if hmac.compare_digest(given, f"Bearer {token}".encode()):
+            return True
+    # Local : connexion directe, pas relayée par le proxy (Caddy)
+    if (
+        request.META.get("REMOTE_ADDR") in ("127.0.0.1", "::1")
+        and "X-Forwarded-For" not in request.headers
+    ):
+        return True
+    return _is_staff(request)
+
+
+@never_cache
+def metrics_view(request):
+    if not _may_scrape(request):
+        return HttpResponseForbidden()
+    registry.flush(force=True)
+    return HttpResponse(
+        render(collect()), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:13
+
+import html
+import re
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+from django.utils.html import strip_tags
+
+# Copie figée de sitecontent/search.py lors de cette migration : le code
+# vivant peut changer sans modifier ce que fait la migration
+SEARCH_FIELDS = {
+    "service": ("title", "excerpt", "body"),
+    "project": ("title", "client", "location", "context", "solution", "results"),
+    "post": ("title", "body"),
+}
+MODELS = tuple(SEARCH_FIELDS)
+PG_CONFIGS = ("french", "english")
+FTS_TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def to_plain_text(value):
+    text = html.unescape(strip_tags(value or ""))
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def build_document(obj):
+    parts = [
+        to_plain_text(getattr(obj, f, "")) for f in SEARCH_FIELDS[obj._meta.model_name]
+    ]
+    return "\n".join(p for p in parts if p)
+
+
+def fts_table(model):
+    return f"{model._meta.db_table}_fts"
+
+
+def pg_index_name(model, config):
+    return f"{model._meta.db_table}_search_{config}"
+
+
+def backfill_documents(apps, schema_editor):
+    for name in MODELS:
+        Model = apps.get_model("sitecontent", name)
+        for obj in Model.objects.all().iterator():
+            obj.search_document = build_document(obj)
+            obj.save(update_fields=["search_document"])
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for name in MODELS:
+        Model = apps.get_model("sitecontent", name)
+        table = Model._meta.db_table
+        if vendor == "postgresql":
+            for config in PG_CONFIGS:
+                schema_editor.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{pg_index_name(Model, config)}" '
+                    f'ON "{table}" USING gin '
+                    f"(to_tsvector('{config}'::regconfig, \"search_document\"))"
+                )
+        elif vendor == "sqlite":
+            fts = fts_table(Model)
+            try:
+                schema_editor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+                    f"USING fts5(search_document, tokenize='{FTS_TOKENIZER}')"
+                )
+            except OperationalError:
+                # SQLite compilé sans FTS5 : search.py se replie sur icontains
+                continue
+            schema_editor.execute(
+                f"INSERT INTO {fts}(rowid, search_document) "
+                f"SELECT id, search_document FROM {table}"
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for name in MODELS:
+        Model = apps.get_model("sitecontent", name)
+        if vendor == "postgresql":
+            for config in PG_CONFIGS:
+                schema_editor.execute(
+                    f'DROP INDEX IF EXISTS "{pg_index_name(Model, config)}"'
+                )
+        elif vendor == "sqlite":
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts_table(Model)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0005_alter_post_body"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_document",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="search_document",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="search_document",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
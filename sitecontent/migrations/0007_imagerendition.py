@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0006_search_document"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageRendition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=255, unique=True)),
+                ("width", models.PositiveIntegerField()),
+                ("height", models.PositiveIntegerField()),
+                ("variants", models.JSONField(default=dict)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_primary_image(apps, schema_editor):
+    Project = apps.get_model("sitecontent", "Project")
+    ProjectImage = apps.get_model("sitecontent", "ProjectImage")
+    for project in Project.objects.filter(primary_image__isnull=True):
+        first = (
+            ProjectImage.objects.filter(project=project)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if first:
+            Project.objects.filter(pk=project.pk).update(primary_image_id=first)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0007_imagerendition"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="primary_image",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="sitecontent.projectimage",
+            ),
+        ),
+        migrations.RunPython(backfill_primary_image, migrations.RunPython.noop),
+    ]
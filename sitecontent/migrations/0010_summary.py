@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:40
+
+import html
+import re
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+# Copie figée de sitecontent/excerpts.py lors de cette migration
+SUMMARY_SOURCES = {
+    "service": ("excerpt", "body"),
+    "project": ("context", "solution", "results"),
+    "post": ("body",),
+}
+SUMMARY_LENGTH = 300
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def to_plain_text(value):
+    text = html.unescape(strip_tags(value or ""))
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def truncate(text, length=SUMMARY_LENGTH):
+    if len(text) <= length:
+        return text
+    cut = text[: length - 1].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:.") + "…"
+
+
+def build_summary(obj):
+    for field in SUMMARY_SOURCES[obj._meta.model_name]:
+        text = to_plain_text(getattr(obj, field, ""))
+        if text:
+            return truncate(text)
+    return ""
+
+
+def backfill_summaries(apps, schema_editor):
+    for name in SUMMARY_SOURCES:
+        Model = apps.get_model("sitecontent", name)
+        for obj in Model.objects.all().iterator():
+            obj.summary = build_summary(obj)
+            obj.save(update_fields=["summary"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0009_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="summary",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="summary",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="summary",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:05
+
+import re
+
+from django.db import migrations, models
+
+# Copie figée de sitecontent/years.parse_years lors de cette migration
+_YEAR_RE = re.compile(r"(?<!\d)(\d{4})(?:\s*[-–—/àa]+\s*(\d{4}|\d{2}))?(?!\d)")
+
+
+def parse_years(value):
+    years = []
+    for first, second in _YEAR_RE.findall(value or ""):
+        years.append(int(first))
+        if len(second) == 2:  # 2019-21
+            years.append(int(first[:2] + second))
+        elif second:
+            years.append(int(second))
+    if not years:
+        return 0, 0
+    return min(years), max(years)
+
+
+def backfill_years(apps, schema_editor):
+    Project = apps.get_model("sitecontent", "Project")
+    for project in Project.objects.exclude(year="").only("year").iterator():
+        project.year_start, project.year_end = parse_years(project.year)
+        project.save(update_fields=["year_start", "year_end"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0010_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="year_end",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="year_start",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_years, migrations.RunPython.noop),
+    ]
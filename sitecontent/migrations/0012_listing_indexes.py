@@ -0,0 +1,88 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0011_project_year_range"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="post",
+            options={"ordering": ["-pub_date", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="partner",
+            index=models.Index(fields=["name"], name="partner_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("published", True)),
+                fields=["-pub_date", "-id"],
+                name="post_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("published", True)),
+                fields=["title", "id"],
+                name="post_title_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("published", True)),
+                fields=["id", "slug", "updated"],
+                name="post_sitemap_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["-created", "title", "id"], name="project_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["title", "id"], name="project_title_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["year_start", "year_end", "id"], name="project_year_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["year_start", "-created", "title", "id"],
+                name="project_year_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["id", "slug", "updated"], name="project_sitemap_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="service",
+            index=models.Index(fields=["title", "id"], name="service_title_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="service",
+            index=models.Index(fields=["updated", "id"], name="service_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="service",
+            index=models.Index(
+                fields=["id", "slug", "updated"], name="service_sitemap_idx"
+            ),
+        ),
+    ]
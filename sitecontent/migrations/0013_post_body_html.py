@@ -0,0 +1,248 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:20
+
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.db import migrations, models
+from django.utils.html import format_html
+
+# Copie figée de sitecontent/richtext.optimize lors de cette migration, sans
+# les images responsive (déclinaisons, taille lue dans le stockage) : le
+# premier passage du worker build_renditions --watch recalcule les articles
+# dont le corps contient des images.
+ALLOWED_TAGS = set(
+    """a abbr b blockquote br caption cite code dd del div dl dt em figcaption
+    figure h1 h2 h3 h4 h5 h6 hr i iframe img ins li mark ol p pre q s small
+    strong sub sup table tbody td tfoot th thead tr u ul""".split()
+)
+
+# Retirées avec leur contenu ; les autres balises inconnues (span, font, o:p…)
+# sont « déballées » : leur texte est conservé
+DROPPED_TAGS = set(
+    """applet button form head math noscript object script select style svg
+    template textarea title""".split()
+)
+VOID_TAGS = {"br", "hr", "img"}
+
+# Blancs sans effet directement dans ces balises (indentation de CKEditor)
+CONTAINER_TAGS = {"ul", "ol", "dl", "table", "thead", "tbody", "tfoot", "tr"}
+
+ALLOWED_ATTRS = {
+    "a": {"href", "title", "target", "id", "name"},
+    "abbr": {"title"},
+    "blockquote": {"cite"},
+    "q": {"cite"},
+    "ol": {"start", "type", "reversed"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan", "scope"},
+    "iframe": {"src", "title", "width", "height", "allow", "allowfullscreen"},
+    **{f"h{level}": {"id"} for level in range(1, 7)},
+}
+URL_ATTRS = {"href", "src", "cite"}
+SAFE_SCHEMES = {"", "http", "https", "mailto", "tel"}
+
+# Seule propriété de style conservée (boutons d'alignement de CKEditor)
+ALIGNABLE_TAGS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "td", "th"}
+_ALIGN_RE = re.compile(r"text-align\s*:\s*(center|right|justify)", re.I)
+
+# Retirées si elles ne contiennent que des blancs (&nbsp;, <br>)
+EMPTY_BLOCKS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6"}
+EMPTY_INLINES = {"b", "em", "i", "mark", "s", "small", "strong", "u"}
+
+_SIZE_RE = re.compile(r"(?:^|;)\s*(width|height)\s*:\s*(\d+)px", re.I)
+_SPACES_RE = re.compile(r"\s{2,}|[\t\r\n\f]")
+_BLANK = " \t\r\n\f\xa0"
+
+
+def safe_url(value: str, schemes=SAFE_SCHEMES) -> bool:
+    # Les navigateurs ignorent blancs et caractères de contrôle (« java\tscript: »)
+    cleaned = "".join(ch for ch in value or "" if ch > " ")
+    try:
+        return urlsplit(cleaned).scheme.lower() in schemes
+    except ValueError:
+        return False
+
+
+def https_url(value: str) -> bool:
+    """URL absolue en https:// (les « //hôte/… » sont refusées)."""
+    cleaned = "".join(ch for ch in value or "" if ch > " ")
+    try:
+        parts = urlsplit(cleaned)
+    except ValueError:
+        return False
+    return parts.scheme.lower() == "https" and bool(parts.netloc)
+
+
+def _display_size(attrs: dict):
+    """Taille d'affichage choisie dans CKEditor (style ou attributs)."""
+    size = {"width": None, "height": None}
+    for name, value in _SIZE_RE.findall(attrs.get("style") or ""):
+        size[name.lower()] = int(value)
+    for name in size:
+        value = (attrs.get(name) or "").strip()
+        if value.isdigit():
+            size[name] = int(value)
+    return size["width"], size["height"]
+
+
+def image_html(attrs):
+    src = (attrs.get("src") or "").strip()
+    if not src or not safe_url(src):
+        return ""
+    width, height = _display_size(attrs)
+    size_attrs = (
+        format_html(' width="{}" height="{}"', width, height)
+        if width and height
+        else ""
+    )
+    return format_html(
+        '<img src="{}" alt="{}"{} loading="lazy" decoding="async">',
+        src,
+        attrs.get("alt") or "",
+        size_attrs,
+    )
+
+
+class _Cleaner(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        # Éléments ouverts : [balise, position dans out, contenu non vide]
+        self.stack = []
+        # Balise retirée avec son contenu en cours, et sa profondeur
+        self.skip_tag, self.skip_depth = None, 0
+        self.pre = 0
+
+    def _mark_content(self):
+        for element in self.stack:
+            element[2] = True
+
+    def _skip(self, tag):
+        self.skip_tag, self.skip_depth = tag, 1
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_tag:
+            self.skip_depth += tag == self.skip_tag
+            return
+        if tag in DROPPED_TAGS:
+            self._skip(tag)
+            return
+        if tag not in ALLOWED_TAGS:
+            return  # déballée
+        attrs = {name: value for name, value in attrs}
+        if tag == "img":
+            markup = image_html(attrs)
+            if markup:
+                self.out.append(markup)
+                self._mark_content()
+            return
+        if tag == "iframe" and not https_url(attrs.get("src")):
+            self._skip(tag)
+            return
+        if tag in VOID_TAGS:
+            self.out.append(f"<{tag}>")
+            if tag == "hr":
+                self._mark_content()
+            return
+        self.out.append(f"<{tag}{self._attributes(tag, attrs)}>")
+        self.stack.append([tag, len(self.out) - 1, tag == "iframe"])
+        if tag == "pre":
+            self.pre += 1
+
+    def _attributes(self, tag, attrs) -> str:
+        allowed = ALLOWED_ATTRS.get(tag, ())
+        kept = {}
+        for name, value in attrs.items():
+            if name not in allowed:
+                continue
+            if name in URL_ATTRS and not safe_url(value):
+                continue
+            kept[name] = value
+        align = _ALIGN_RE.search(attrs.get("style") or "")
+        if tag in ALIGNABLE_TAGS and align:
+            kept["style"] = f"text-align:{align.group(1).lower()}"
+        if tag == "a" and kept.get("target") == "_blank":
+            kept["rel"] = "noopener noreferrer"
+        if tag == "iframe":
+            kept["loading"] = "lazy"
+        return "".join(
+            f" {name}" if value is None else f' {name}="{escape(value)}"'
+            for name, value in kept.items()
+        )
+
+    def handle_endtag(self, tag):
+        if self.skip_tag:
+            self.skip_depth -= tag == self.skip_tag
+            if not self.skip_depth:
+                self.skip_tag = None
+            return
+        if not any(element[0] == tag for element in self.stack):
+            return  # balise déballée ou fermeture orpheline
+        while self.stack:
+            name = self._close()
+            if name == tag:
+                break
+
+    def _close(self) -> str:
+        tag, start, has_content = self.stack.pop()
+        if tag == "pre":
+            self.pre -= 1
+        if not has_content and (tag in EMPTY_BLOCKS or tag in EMPTY_INLINES):
+            # Paragraphe vide (<p>&nbsp;</p>) : supprimé ; balise de mise en
+            # forme vide : remplacée par un blanc s'il séparait deux mots
+            blank = any(self.out[start + 1 :])
+            del self.out[start:]
+            spaced = self.out and self.out[-1].endswith(" ")
+            if blank and tag in EMPTY_INLINES and not spaced:
+                self.out.append(" ")
+        else:
+            self.out.append(f"</{tag}>")
+        return tag
+
+    def handle_data(self, data):
+        if self.skip_tag or not data:
+            return
+        if not self.pre:
+            data = _SPACES_RE.sub(" ", data)
+        if data.strip(_BLANK):
+            self._mark_content()
+        elif self.stack and self.stack[-1][0] in CONTAINER_TAGS:
+            return
+        self.out.append(escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self._close()
+        return "".join(self.out).strip()
+
+
+def optimize(html):
+    cleaner = _Cleaner()
+    cleaner.feed(html or "")
+    return cleaner.close()
+
+
+def backfill_body_html(apps, schema_editor):
+    Post = apps.get_model("sitecontent", "Post")
+    for post in Post.objects.only("body").iterator():
+        post.body_html = optimize(post.body)
+        post.save(update_fields=["body_html"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0012_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="body_html",
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_body_html, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0013_post_body_html"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingExport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tag", models.CharField(max_length=30)),
+                ("slug", models.CharField(blank=True, max_length=255)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:20
+
+from django.db import migrations
+
+
+def create_home_settings(apps, schema_editor):
+    # Ligne unique des réglages de l'accueil (singletons.py) : créée ici plutôt
+    # qu'à la première requête, où plusieurs workers peuvent la créer ensemble
+    HomeSettings = apps.get_model("sitecontent", "HomeSettings")
+    if not HomeSettings.objects.exists():
+        HomeSettings.objects.create()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecontent", "0014_pendingexport"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_home_settings, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
 from ckeditor_uploader.fields import RichTextUploadingField
@@ -13,6 +14,29 @@ class TimeStamped(models.Model):
         abstract = True
 
 
+# --- Projections « liste » : les gros champs texte ne sont pas chargés ---
+
+
+class ServiceQuerySet(models.QuerySet):
+    def for_list(self):
+        return self.defer("body", "search_document")
+
+
+class ProjectQuerySet(models.QuerySet):
+    def for_list(self):
+        return self.select_related("primary_image").defer(
+            "context", "solution", "results", "search_document"
+        )
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(published=True)
+
+    def for_list(self):
+        return self.defer("body", "body_html", "search_document")
+
+
 class HomeSettings(TimeStamped):
     hero_title = models.CharField(
         max_length=160, default="Ingénierie • Industriel • TP"
@@ -47,6 +71,7 @@ class Partner(TimeStamped):
 
     class Meta:
         ordering = ["name"]
+        indexes = [models.Index(fields=["name"], name="partner_name_idx")]
 
     def __str__(self):
         return self.name
@@ -61,9 +86,22 @@ class Service(TimeStamped):
         max_length=60, blank=True, help_text="Nom d’icône (optionnel)"
     )
     cover = models.ImageField(upload_to="services/", blank=True)
+    # Texte brut indexé (voir search.py), recalculé à chaque sauvegarde
+    search_document = models.TextField(blank=True, editable=False)
+    # Résumé en texte brut pour les cartes et balises meta (voir excerpts.py)
+    summary = models.CharField(max_length=300, blank=True, editable=False)
+
+    objects = ServiceQuerySet.as_manager()
 
     class Meta:
         ordering = ["title"]
+        # Un index par tri des listes (+ pk : départage de la pagination) ;
+        # le dernier couvre le sitemap (lu par pk, slug / updated seulement).
+        indexes = [
+            models.Index(fields=["title", "id"], name="service_title_idx"),
+            models.Index(fields=["updated", "id"], name="service_updated_idx"),
+            models.Index(fields=["id", "slug", "updated"], name="service_sitemap_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -78,13 +116,48 @@ class Project(TimeStamped):
     client = models.CharField(max_length=160, blank=True)
     location = models.CharField(max_length=160, blank=True)
     year = models.CharField(max_length=10, blank=True)
+    # Plage d'années tirée de `year` (voir years.py) pour filtres et tri ;
+    # 0 = inconnue (pas de NULL : la pagination par curseur compare les valeurs)
+    year_start = models.PositiveSmallIntegerField(default=0, editable=False)
+    year_end = models.PositiveSmallIntegerField(default=0, editable=False)
     context = models.TextField(blank=True)
     solution = models.TextField(blank=True)
     results = models.TextField(blank=True)
     cover = models.ImageField(upload_to="projects/", blank=True)
+    search_document = models.TextField(blank=True, editable=False)
+    summary = models.CharField(max_length=300, blank=True, editable=False)
+    # Première image de la galerie, dénormalisée (voir signals.py) : les cartes
+    # l'affichent via select_related, sans requête par projet.
+    primary_image = models.ForeignKey(
+        "ProjectImage",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        editable=False,
+    )
+
+    objects = ProjectQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            # Tri par défaut de la liste (-created, title) + départage pk
+            models.Index(
+                fields=["-created", "title", "id"], name="project_created_idx"
+            ),
+            models.Index(fields=["title", "id"], name="project_title_idx"),
+            # Filtre ?year= (plage) et tri par année, dans les deux sens
+            models.Index(
+                fields=["year_start", "year_end", "id"], name="project_year_idx"
+            ),
+            # Filtre ?year= avec le tri par défaut (-created, title)
+            models.Index(
+                fields=["year_start", "-created", "title", "id"],
+                name="project_year_created_idx",
+            ),
+            models.Index(fields=["id", "slug", "updated"], name="project_sitemap_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -104,16 +177,106 @@ class ProjectImage(models.Model):
         return self.caption or self.image.name
 
 
+class ImageRendition(models.Model):
+    """Variantes redimensionnées d'une image uploadée (voir images.py)."""
+
+    source = models.CharField(max_length=255, unique=True)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    # {"webp": [[320, "renditions/…/w320.webp"], …], "jpeg": […], …}
+    variants = models.JSONField(default=dict)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.source
+
+
+class OutboxMessage(models.Model):
+    """Email en attente d'envoi par le worker `send_outbox` (voir outbox.py)."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+    STATUS_CHOICES = [
+        (PENDING, "En attente"),
+        (SENT, "Envoyé"),
+        (DEAD, "Abandonné"),
+    ]
+
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list, blank=True)
+    # [{"filename": …, "content": <base64>, "mimetype": …}, …]
+    attachments = models.JSONField(default=list, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created"]
+        verbose_name = "Email en file d'attente"
+        verbose_name_plural = "File d'envoi des emails"
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)}"
+
+
+class PendingExport(models.Model):
+    """Pages de l'export statique à régénérer par le worker (voir prerender.py)."""
+
+    tag = models.CharField(max_length=30)
+    # Objet sauvegardé ; vide : toutes les pages du tag
+    slug = models.CharField(max_length=255, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.tag} {self.slug}".strip()
+
+
 class Post(TimeStamped):
     title = models.CharField(max_length=160)
     slug = models.SlugField(unique=True)
     body = RichTextUploadingField()
+    # Corps nettoyé, images responsive : calculé à la sauvegarde (richtext.py) ;
+    # NULL = pas encore traité (corps brut nettoyé à l'affichage), "" = corps vide
+    body_html = models.TextField(null=True, blank=True, editable=False)
     published = models.BooleanField(default=True)
     pub_date = models.DateField(auto_now_add=True)
     cover = models.ImageField(upload_to="blog/", blank=True)
+    search_document = models.TextField(blank=True, editable=False)
+    summary = models.CharField(max_length=300, blank=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
-        ordering = ["-pub_date"]
+        # pk en départage, dans le même sens : liste, curseur et voisins
+        # (blog_detail) parcourent le même index, dans un sens ou l'autre.
+        ordering = ["-pub_date", "-id"]
+        # Index partiels : le site ne lit que les articles publiés
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"],
+                name="post_pub_date_idx",
+                condition=models.Q(published=True),
+            ),
+            models.Index(
+                fields=["title", "id"],
+                name="post_title_idx",
+                condition=models.Q(published=True),
+            ),
+            models.Index(
+                fields=["id", "slug", "updated"],
+                name="post_sitemap_idx",
+                condition=models.Q(published=True),
+            ),
+        ]
 
     def __str__(self):
         return self.title
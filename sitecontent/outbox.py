@@ -0,0 +1,212 @@
+# sitecontent/outbox.py
+"""
+File d'envoi des emails (outbox).
+
+La vue contact ne parle plus au serveur SMTP : les messages sont enregistrés
+en base (OutboxMessage) puis envoyés par le worker `manage.py send_outbox`.
+En cas d'échec, nouvel essai avec un délai exponentiel ; au-delà de
+OUTBOX_MAX_ATTEMPTS le message passe en « abandonné » (visible dans l'admin).
+"""
+import base64
+import datetime
+import logging
+import random
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 8)
+RETRY_BASE = getattr(settings, "OUTBOX_RETRY_BASE", 60)  # secondes
+RETRY_MAX = getattr(settings, "OUTBOX_RETRY_MAX", 6 * 60 * 60)
+# Un message réservé par un worker qui meurt redevient disponible après ce délai.
+# Renouvelé avant chaque envoi (renew_lease) : il couvre la connexion et un
+# envoi (une dizaine d'échanges SMTP, chacun borné par EMAIL_TIMEOUT), pas
+# tout un lot.
+EMAIL_TIMEOUT = getattr(settings, "EMAIL_TIMEOUT", None) or 0
+LEASE = getattr(settings, "OUTBOX_LEASE", max(5 * 60, 10 * EMAIL_TIMEOUT))
+
+
+# --- Mise en file ---
+
+
+def enqueue(message: EmailMessage) -> OutboxMessage:
+    """Enregistre `message` pour envoi différé (pièces jointes en base64)."""
+    attachments = []
+    for filename, content, mimetype in message.attachments:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        attachments.append(
+            {
+                "filename": filename,
+                "content": base64.b64encode(content).decode("ascii"),
+                "mimetype": mimetype,
+            }
+        )
+    return OutboxMessage.objects.create(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        reply_to=list(message.reply_to),
+        attachments=attachments,
+    )
+
+
+def to_email_message(row: OutboxMessage, mail_connection=None) -> EmailMessage:
+    message = EmailMessage(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email,
+        to=row.to,
+        reply_to=row.reply_to,
+        connection=mail_connection,
+    )
+    for item in row.attachments:
+        message.attach(
+            item["filename"], base64.b64decode(item["content"]), item["mimetype"]
+        )
+    return message
+
+
+# --- Livraison ---
+
+
+def retry_delay(attempts: int) -> datetime.timedelta:
+    """Délai exponentiel (plafonné) avant l'essai suivant, avec ±10 % d'aléa."""
+    delay = min(RETRY_BASE * 2 ** max(attempts - 1, 0), RETRY_MAX)
+    return datetime.timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+
+def _lease_until():
+    return timezone.now() + datetime.timedelta(seconds=LEASE)
+
+
+def claim_due(limit: int) -> list:
+    """
+    Réserve jusqu'à `limit` messages échus : leur prochaine échéance est
+    repoussée de LEASE, ce qui évite un double envoi par un second worker.
+    """
+    now = timezone.now()
+    qs = OutboxMessage.objects.filter(
+        status=OutboxMessage.PENDING, next_attempt_at__lte=now
+    ).order_by("next_attempt_at", "pk")
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            rows = list(qs.select_for_update(skip_locked=True)[:limit])
+            OutboxMessage.objects.filter(pk__in=[r.pk for r in rows]).update(
+                attempts=F("attempts") + 1, next_attempt_at=_lease_until()
+            )
+    else:
+        # Sans SKIP LOCKED (SQLite) : UPDATE conditionnel ligne par ligne, la
+        # ligne n'est à nous que si personne ne l'a réservée depuis la lecture
+        rows = [
+            row
+            for row in qs[:limit]
+            if OutboxMessage.objects.filter(
+                pk=row.pk,
+                status=OutboxMessage.PENDING,
+                attempts=row.attempts,
+                next_attempt_at=row.next_attempt_at,
+            ).update(attempts=F("attempts") + 1, next_attempt_at=_lease_until())
+        ]
+    for row in rows:
+        row.attempts += 1
+    return rows
+
+
+def renew_lease(rows) -> None:
+    """Prolonge la réservation des messages du lot pas encore traités."""
+    OutboxMessage.objects.filter(
+        pk__in=[r.pk for r in rows], status=OutboxMessage.PENDING
+    ).update(next_attempt_at=_lease_until())
+
+
+def _mark_sent(row: OutboxMessage) -> None:
+    OutboxMessage.objects.filter(pk=row.pk).update(
+        status=OutboxMessage.SENT, sent_at=timezone.now(), last_error=""
+    )
+
+
+def _mark_failed(row: OutboxMessage, error: Exception) -> str:
+    message = f"{type(error).__name__}: {error}"[:2000]
+    if row.attempts >= MAX_ATTEMPTS:
+        status, next_attempt_at = OutboxMessage.DEAD, timezone.now()
+        logger.error("Outbox message %s abandoned: %s", row.pk, message)
+    else:
+        status = OutboxMessage.PENDING
+        next_attempt_at = timezone.now() + retry_delay(row.attempts)
+        logger.warning(
+            "Outbox message %s failed (attempt %s): %s", row.pk, row.attempts, message
+        )
+    OutboxMessage.objects.filter(pk=row.pk).update(
+        status=status, next_attempt_at=next_attempt_at, last_error=message
+    )
+    return status
+
+
+def _count_failure(stats: dict, status: str) -> None:
+    stats["dead" if status == OutboxMessage.DEAD else "retry"] += 1
+
+
+def deliver_due(batch_size: int = 20) -> dict:
+    """
+    Envoie les messages échus sur une seule connexion SMTP.
+    Retourne les compteurs {"sent", "retry", "dead"}.
+    """
+    stats = {"sent": 0, "retry": 0, "dead": 0}
+    rows = claim_due(batch_size)
+    if not rows:
+        return stats
+
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as e:
+        for row in rows:
+            _count_failure(stats, _mark_failed(row, e))
+        return stats
+
+    try:
+        for i, row in enumerate(rows):
+            if i:
+                # Lot long (SMTP lent) : aucun message restant ne doit expirer
+                renew_lease(rows[i:])
+            try:
+                to_email_message(row, mail_connection).send(fail_silently=False)
+            except Exception as e:
+                _count_failure(stats, _mark_failed(row, e))
+            else:
+                _mark_sent(row)
+                stats["sent"] += 1
+    finally:
+        try:
+            mail_connection.close()
+        except Exception:
+            pass
+    return stats
+
+
+def requeue(queryset) -> int:
+    """Remet en file (admin) des messages abandonnés ou en attente."""
+    return queryset.exclude(status=OutboxMessage.SENT).update(
+        status=OutboxMessage.PENDING,
+        attempts=0,
+        next_attempt_at=timezone.now(),
+    )
+
+
+def purge_sent(days: int) -> int:
+    """Supprime les messages envoyés depuis plus de `days` jours."""
+    limit = timezone.now() - datetime.timedelta(days=days)
+    deleted, _ = OutboxMessage.objects.filter(
+        status=OutboxMessage.SENT, sent_at__lt=limit
+    ).delete()
+    return deleted
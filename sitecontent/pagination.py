@@ -0,0 +1,193 @@
+# sitecontent/pagination.py
+"""
+Pagination par curseur (keyset) + comptages mis en cache.
+
+Au lieu d'un OFFSET (de plus en plus lent en profondeur) et d'un COUNT(*)
+à chaque page, la page suivante est lue « après » le dernier élément affiché,
+selon le tri de la requête complété par la clé primaire (départage stable).
+
+Les anciennes URLs ?page=N restent servies par CachedCountPaginator.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import hashlib
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from . import caching
+
+COUNT_TIMEOUT = 60 * 60
+
+
+# --- Comptages ---
+
+
+def cached_count(queryset, *tags) -> int:
+    """COUNT(*) mis en cache, invalidé par les versions des `tags` (caching.py)."""
+    if queryset.query.is_empty():
+        return 0  # .none() : pas de SQL (str(query) lèverait EmptyResultSet)
+    tags = tags or (caching.tag_for_model(queryset.model),)
+    digest = hashlib.md5(str(queryset.query).encode("utf-8")).hexdigest()
+    return caching.remember(f"count:{digest}", queryset.count, tags, COUNT_TIMEOUT)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator classique (?page=N) dont le total vient du cache."""
+
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list)
+
+
+# --- Curseurs ---
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(direction: str, values) -> str:
+    raw = json.dumps({"d": direction, "v": [_encode_value(v) for v in values]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Retourne (direction, valeurs) ou None si le curseur est invalide."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction, values = data["d"], data["v"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        return None
+    if direction not in ("next", "prev") or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class KeysetPage:
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous, paginator):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return ""
+        return encode_cursor("next", self.paginator.values_of(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return ""
+        return encode_cursor("prev", self.paginator.values_of(self.object_list[0]))
+
+
+class KeysetPaginator:
+    """
+    Pagine `queryset` selon son tri (order_by, sinon Meta.ordering), complété
+    par la clé primaire. Seuls les tris sur des noms de champs ou d'annotations
+    (« -created », « title »…) sont supportés.
+    """
+
+    def __init__(self, queryset, per_page, with_count=False):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(f.lstrip("-") in ("pk", "id") for f in ordering):
+            ordering.append("pk")
+        self.fields = [(f.lstrip("-"), f.startswith("-")) for f in ordering]
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.with_count = with_count
+
+    @cached_property
+    def count(self):
+        return cached_count(self.queryset) if self.with_count else None
+
+    def values_of(self, obj):
+        return [
+            obj.pk if name in ("pk", "id") else getattr(obj, name)
+            for name, _ in self.fields
+        ]
+
+    def _to_python(self, name, value):
+        if name in ("pk", "id"):
+            return value
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value  # annotation (ex. search_rank)
+        return field.to_python(value)
+
+    def _seek(self, values, forward: bool):
+        """Q « strictement après » (forward) ou « avant » les valeurs données."""
+        condition = Q()
+        for i, (name, desc) in enumerate(self.fields):
+            op = "lt" if desc == forward else "gt"
+            clause = Q(**{f"{name}__{op}": values[i]})
+            for j in range(i):
+                clause &= Q(**{self.fields[j][0]: values[j]})
+            condition |= clause
+        return condition
+
+    def page(self, cursor: str = ""):
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is not None and len(decoded[1]) != len(self.fields):
+            decoded = None  # curseur d'un autre tri : on repart du début
+
+        if decoded is None:
+            rows = list(self.queryset[: self.per_page + 1])
+            return KeysetPage(
+                rows[: self.per_page], len(rows) > self.per_page, False, self
+            )
+
+        direction, raw = decoded
+        try:
+            values = [self._to_python(n, v) for (n, _), v in zip(self.fields, raw)]
+        except Exception:
+            return self.page()
+
+        if direction == "next":
+            rows = list(
+                self.queryset.filter(self._seek(values, True))[: self.per_page + 1]
+            )
+            return KeysetPage(
+                rows[: self.per_page], len(rows) > self.per_page, True, self
+            )
+
+        rows = list(
+            self.queryset.filter(self._seek(values, False)).reverse()[
+                : self.per_page + 1
+            ]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        rows.reverse()
+        return KeysetPage(rows, True, has_previous, self)
@@ -0,0 +1,365 @@
+# sitecontent/prerender.py
+"""
+Export statique : pages publiques pré-rendues en fichiers servis directement
+par Caddy (file_server, variantes .gz / .zst), sans passer par gunicorn.
+
+Arborescence (STATIC_EXPORT_ROOT) :
+* <chemin>/index.html : la page sans paramètre (« / », « /blog/mon-article/ ») ;
+* <chemin>/index<N>.html : ?page=N des listes paginées ;
+* sitemap.xml et sitemap-<section>.xml (première page) à la racine.
+
+Le Caddyfile essaie ces fichiers puis passe la main à Django : contact,
+recherches, curseurs (?cursor=), visiteurs connectés.
+
+Les pages traversent toute la pile Django (middlewares, cache, vues) ; une
+page qui pose un cookie ou rend un jeton CSRF n'est pas exportée, comme pour
+le cache de pages. Après une sauvegarde (signals.py), les fichiers des pages
+touchées sont retirés tout de suite : Caddy passe la main à Django, qui sert
+la page à jour. Leur régénération est notée en base (PendingExport, validée
+avec la sauvegarde) et faite par le worker `build_renditions --watch`.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import zstandard
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.paginator import Paginator
+from django.test import RequestFactory
+from django.urls import reverse
+
+from . import caching, sitemaps
+from .context_processors import nav_services
+from .models import PendingExport, Post, Project, ProjectImage, Service
+from .views import LIST_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Pages sans paramètre
+PAGES = ("home", "services_list", "partners", "about", "contact_thanks")
+
+# Listes paginées (?page=N) : objets affichés
+LIST_PAGES = {
+    "projects_list": lambda: Project.objects.all(),
+    "blog_list": lambda: Post.objects.published(),
+}
+
+# Pages de détail : objets exportés
+DETAIL_PAGES = {
+    "service_detail": lambda: Service.objects.all(),
+    "project_detail": lambda: Project.objects.all(),
+    "blog_detail": lambda: Post.objects.published(),
+}
+
+# Pages à régénérer après la sauvegarde d'un modèle (tag de caching.py).
+# « sitecontact » (header / footer) et le mega-menu régénèrent tout.
+PAGES_FOR_TAG = {
+    "service": ("home", "services_list", "service_detail"),
+    "project": ("home", "projects_list", "project_detail"),
+    "post": ("home", "blog_list", "blog_detail"),
+    "partner": ("home", "partners"),
+    "homesettings": ("home",),
+}
+
+# Chaque article affiche ses voisins et les plus récents : tous à refaire
+ALL_DETAILS = {"blog_detail"}
+
+# Tag « tout l'export » (header / footer, mega-menu)
+ALL_PAGES = "*"
+
+# Empreinte du mega-menu au dernier export (change → toutes les pages)
+NAV_FILE = ".nav"
+
+# Lignes de PendingExport traitées par passage du worker
+QUEUE_BATCH = 500
+
+COMPRESSED = (".gz", ".zst")
+
+_PAGE_FILE_RE = re.compile(r"^index(\d+)\.html$")
+
+
+def export_root():
+    root = getattr(settings, "STATIC_EXPORT_ROOT", "")
+    return Path(root) if root else None
+
+
+def target(root: Path, path: str, page=None) -> Path:
+    """Fichier de `path` (URL se terminant par /) ; `page` : ?page=N."""
+    return root / path.lstrip("/") / f"index{page or ''}.html"
+
+
+def _compress(data: bytes) -> dict:
+    return {
+        ".gz": gzip.compress(data, compresslevel=9, mtime=0),
+        ".zst": zstandard.ZstdCompressor(level=19).compress(data),
+    }
+
+
+def _replace(path: Path, data: bytes) -> None:
+    # Écriture atomique : Caddy ne lit jamais un fichier à moitié écrit ;
+    # nom temporaire propre au processus / thread (workers concurrents)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _remove(path: Path) -> bool:
+    if not path.exists():
+        return False
+    for suffix in ("", *COMPRESSED):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+    try:
+        path.parent.rmdir()  # dossier d'un objet supprimé, s'il est vide
+    except OSError:
+        pass
+    return True
+
+
+def _nav_fingerprint() -> str:
+    rows = [(s.pk, s.slug, s.title, s.summary) for s in nav_services()]
+    return hashlib.md5(repr(rows).encode("utf-8")).hexdigest()
+
+
+def nav_changed(root: Path) -> bool:
+    try:
+        previous = (root / NAV_FILE).read_text(encoding="ascii")
+    except OSError:
+        return True
+    return previous != _nav_fingerprint()
+
+
+def stale_pages(root: Path, changes: dict):
+    """
+    Pages touchées par {tag: {slug, …}} (None = tous) : {nom: slugs, None =
+    toutes}, ou None si tout l'export est à refaire.
+    """
+    if ALL_PAGES in changes or "sitecontact" in changes:
+        return None
+    if "service" in changes and nav_changed(root):
+        return None
+    pages = {}
+    for tag, slugs in changes.items():
+        for name in PAGES_FOR_TAG.get(tag, ()):
+            all_details = None in slugs or name in ALL_DETAILS
+            if name in DETAIL_PAGES and not all_details:
+                pages[name] = set(slugs)
+            else:
+                pages[name] = None
+    return pages
+
+
+class Exporter:
+    """Rend les pages publiques dans `root` pour SITE_URL (ou `site_url`)."""
+
+    def __init__(self, root, site_url: str = ""):
+        parts = urlsplit(site_url or getattr(settings, "SITE_URL", ""))
+        if not parts.netloc:
+            raise ImproperlyConfigured(
+                "SITE_URL (ex. https://www.annoor.tech) est requis pour l'export "
+                "statique : liens absolus, balises canoniques et sitemaps."
+            )
+        self.root = Path(root)
+        self.protocol, self.domain = parts.scheme or "https", parts.netloc
+        # Requêtes construites ici, servies par la pile de middlewares du site
+        self.factory = RequestFactory(HTTP_HOST=self.domain)
+        self.handler = WSGIHandler()
+        self.stats = Counter()
+
+    # --- Fichiers ---
+
+    def write(self, path: Path, data: bytes) -> None:
+        if path.is_file() and path.read_bytes() == data:
+            # Inchangé : mtime (donc ETag / Last-Modified de Caddy) conservé
+            self.stats["unchanged"] += 1
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Variantes compressées d'abord : le fichier principal (try_files)
+        # n'apparaît qu'une fois ses variantes en place
+        for suffix, compressed in _compress(data).items():
+            _replace(path.with_name(path.name + suffix), compressed)
+        _replace(path, data)
+        self.stats["written"] += 1
+
+    def remove(self, path: Path) -> None:
+        if _remove(path):
+            self.stats["removed"] += 1
+
+    # --- Pages ---
+
+    def render(self, url: str, path: Path) -> None:
+        request = self.factory.get(url, secure=self.protocol == "https")
+        # Http404 et exceptions des vues : réponse d'erreur, comme en production
+        response = self.handler.get_response(request)
+        if response.status_code == 200 and caching.can_store(request, response):
+            self.write(path, response.content)
+            return
+        # Introuvable, redirigée ou personnalisée : Django la sert lui-même
+        if response.status_code >= 500:
+            logger.error("Export statique : %s a répondu %s", url, response.status_code)
+            self.stats["errors"] += 1
+        elif response.status_code == 200:
+            self.stats["skipped"] += 1
+        self.remove(path)
+
+    def render_page(self, name: str) -> None:
+        url = reverse(name)
+        self.render(url, target(self.root, url))
+
+    def render_list(self, name: str) -> None:
+        url = reverse(name)
+        self.render(url, target(self.root, url))
+        pages = Paginator(LIST_PAGES[name](), LIST_PAGE_SIZE).num_pages
+        for page in range(1, pages + 1):
+            self.render(f"{url}?page={page}", target(self.root, url, page))
+        # Pages en trop après des suppressions
+        folder = target(self.root, url).parent
+        if folder.is_dir():
+            for path in folder.iterdir():
+                match = _PAGE_FILE_RE.match(path.name)
+                if match and int(match.group(1)) > pages:
+                    self.remove(path)
+
+    def render_details(self, name: str, slugs=None) -> None:
+        """Pages de `slugs` (toutes par défaut) ; retire celles des objets disparus."""
+        current = set(DETAIL_PAGES[name]().values_list("slug", flat=True))
+        for slug in sorted(current if slugs is None else set(slugs) & current):
+            url = reverse(name, kwargs={"slug": slug})
+            self.render(url, target(self.root, url))
+        # Objets supprimés, dépubliés ou renommés (ancien slug)
+        folder = target(self.root, reverse(name, kwargs={"slug": "x"})).parent.parent
+        if folder.is_dir():
+            for path in folder.iterdir():
+                if path.is_dir() and path.name not in current:
+                    self.remove(path / "index.html")
+
+    def render_sitemaps(self, sections=None) -> None:
+        # Mêmes fichiers que /sitemap.xml (cache partagé, voir sitemaps.py) ;
+        # les pages suivantes (?p=N) restent servies par Django
+        for section in sections or sitemaps.SITEMAPS:
+            data = sitemaps.get_section(section, 1, self.protocol, self.domain)
+            if data is None:
+                continue
+            self.write(self.root / f"sitemap-{section}.xml", gzip.decompress(data))
+        data = sitemaps.get_index(self.protocol, self.domain)
+        self.write(self.root / "sitemap.xml", gzip.decompress(data))
+
+    # --- Export complet / incrémental ---
+
+    def render_all(self) -> None:
+        for name in PAGES:
+            self.render_page(name)
+        for name in LIST_PAGES:
+            self.render_list(name)
+        for name in DETAIL_PAGES:
+            self.render_details(name)
+        self.render_sitemaps()
+        self.root.mkdir(parents=True, exist_ok=True)
+        _replace(self.root / NAV_FILE, _nav_fingerprint().encode("ascii"))
+
+    def refresh(self, changes: dict) -> None:
+        """Pages touchées par des sauvegardes : {tag: {slug, …}} (None = tous)."""
+        pages = stale_pages(self.root, changes)
+        if pages is None:
+            self.render_all()
+            return
+        for name, slugs in pages.items():
+            if name in LIST_PAGES:
+                self.render_list(name)
+            elif name in DETAIL_PAGES:
+                self.render_details(name, slugs)
+            else:
+                self.render_page(name)
+        sections = [s for s, t in sitemaps.SECTION_TAGS.items() if t in changes]
+        if sections:
+            self.render_sitemaps(sections)
+
+
+def slug_for(instance):
+    """Slug de la page de détail touchée (celle du projet pour une image)."""
+    if isinstance(instance, ProjectImage):
+        instance = Project.objects.filter(pk=instance.project_id).first()
+    return getattr(instance, "slug", None)
+
+
+# --- Régénération par le worker ---
+
+
+def enabled() -> bool:
+    return export_root() is not None and bool(getattr(settings, "SITE_URL", ""))
+
+
+def discard(root: Path, changes: dict) -> bool:
+    """
+    Retire les fichiers des pages touchées (Caddy passe la main à Django).
+    Retourne False si tout l'export a été retiré.
+    """
+    pages = stale_pages(root, changes)
+    if pages is None:
+        for path in [*root.rglob("index*.html"), *root.glob("sitemap*.xml")]:
+            _remove(path)
+        return False
+    for name, slugs in pages.items():
+        if name in LIST_PAGES:
+            folder = target(root, reverse(name)).parent
+            paths = folder.glob("index*.html")
+        elif name in DETAIL_PAGES and slugs is None:
+            folder = target(root, reverse(name, kwargs={"slug": "x"})).parent.parent
+            paths = folder.glob("*/index.html")
+        elif name in DETAIL_PAGES:
+            urls = (reverse(name, kwargs={"slug": slug}) for slug in slugs)
+            paths = [target(root, url) for url in urls]
+        else:
+            paths = [target(root, reverse(name))]
+        for path in list(paths):
+            _remove(path)
+    sections = [s for s, t in sitemaps.SECTION_TAGS.items() if t in changes]
+    for section in sections:
+        _remove(root / f"sitemap-{section}.xml")
+    if sections:
+        _remove(root / "sitemap.xml")
+    return True
+
+
+def queue(changes: dict) -> None:
+    """
+    Pages touchées par des sauvegardes {tag: {slug, …}} (None = tous) :
+    fichiers retirés tout de suite, régénération notée en base (dans la
+    transaction en cours : rien n'est perdu si le processus redémarre).
+    """
+    if not enabled():
+        return
+    if not discard(export_root(), changes):
+        # Nav modifiée : tout l'export, même si elle est rétablie d'ici là
+        changes = {**changes, ALL_PAGES: {None}}
+    PendingExport.objects.bulk_create(
+        PendingExport(tag=tag, slug=slug or "")
+        for tag, slugs in changes.items()
+        for slug in slugs
+    )
+
+
+def process_queue() -> int:
+    """Régénère les pages en file (worker) ; retourne le nombre de lignes."""
+    rows = list(
+        PendingExport.objects.order_by("pk").values_list("pk", "tag", "slug")[
+            :QUEUE_BATCH
+        ]
+    )
+    if not rows:
+        return 0
+    changes = {}
+    for _, tag, slug in rows:
+        changes.setdefault(tag, set()).add(slug or None)
+    Exporter(export_root()).refresh(changes)
+    # En cas d'échec, les lignes restent en file pour le passage suivant ;
+    # celles ajoutées pendant le rendu (pk plus grand) aussi
+    PendingExport.objects.filter(pk__lte=rows[-1][0]).delete()
+    return len(rows)
@@ -0,0 +1,410 @@
+# sitecontent/queryplans.py
+"""
+Plans d'exécution des pages (commande explain_queries).
+
+Chaque URL est rejouée par le client de test, cache vidé, et chaque SELECT
+capturé est repassé à EXPLAIN : ANALYZE (JSON) sur Postgres, QUERY PLAN sur
+SQLite. Trois constats, regroupés d'une URL à l'autre puis classés :
+
+- seq_scan : table lue en entier (SCAN sans index / Seq Scan) ;
+- sort     : tri fait après lecture (TEMP B-TREE / nœud Sort) ;
+- repeat   : même requête, aux paramètres près, répétée dans une page (N+1).
+
+Les index suggérés sont déduits du SQL (égalités, puis plage, puis tri) :
+indicatifs, à valider sur le plan réel.
+"""
+import hashlib
+import re
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.contrib import admin
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import sitemaps
+from .benchmark import site_urls
+from .models import Project
+
+# Un constat « pèse » : poids × occurrences × lignes de la table
+WEIGHTS = {"seq_scan": 3, "sort": 2, "repeat": 1}
+REPEAT_THRESHOLD = 3
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_FROM_RE = re.compile(r'\bFROM\s+"(\w+)"')
+_SUBQUERY_RE = re.compile(r"\(\s*SELECT\b[^()]*(?:\([^()]*\)[^()]*)*\)", re.IGNORECASE)
+_CONDITION_RE = re.compile(
+    r'"(\w+)"\."(\w+)"\s*(=|IN\b|IS\b|<=|>=|<|>|BETWEEN\b|I?LIKE\b)\s*(\S*)',
+    re.IGNORECASE,
+)
+# Booléen nu : WHERE "t"."published" / NOT "t"."published"
+_BOOLEAN_RE = re.compile(
+    r'(?:^|\(|\bAND\s|\bOR\s)\s*(NOT\s+)?"(\w+)"\."(\w+)"\s*(?=$|\)|AND\b|OR\b)',
+    re.IGNORECASE,
+)
+_ORDER_TERM_RE = re.compile(r'^"(\w+)"\."(\w+)"(?:\s+(?:ASC|(DESC)))?$', re.IGNORECASE)
+_SQLITE_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS (\w+))?$")
+
+
+# --- URLs rejouées ---
+
+
+def page_variants(staff=False) -> dict:
+    """
+    Nom -> chemin : URLs publiques (site_urls), combinaisons q / sort / year /
+    page des listes, sections de sitemap ; listes de l'admin si `staff`.
+    """
+    word = (Project.objects.values_list("title", flat=True).first() or "projet").split()
+    word = word[0] if word else "projet"
+    urls = site_urls()
+    variants = {
+        "services_list": ["q", "sort=title", "sort=-updated"],
+        "projects_list": [
+            "q",
+            "sort=-year",
+            "sort=year",
+            "sort=title",
+            "year=2020",
+            "year=2018-2020",
+            "page=2",
+        ],
+        "blog_list": [
+            "q",
+            "sort=pub_date",
+            "sort=title",
+            "year=2021",
+            "year=2020-2021",
+            "page=2",
+        ],
+    }
+    for name, queries in variants.items():
+        for query in queries:
+            query = f"q={word}" if query == "q" else query
+            urls[f"{name}?{query}"] = f"{reverse(name)}?{query}"
+    for section in sitemaps.SITEMAPS:
+        urls[f"sitemap-{section}"] = reverse(
+            "sitemap_section", kwargs={"section": section}
+        )
+    if staff:
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label != "sitecontent":
+                continue
+            name = f"admin:{model._meta.app_label}_{model._meta.model_name}"
+            path = reverse(f"{name}_changelist")
+            urls[name] = path
+            if model_admin.search_fields:
+                urls[f"{name}?q"] = f"{path}?q={word}"
+    return urls
+
+
+def next_cursor_url(path, content: bytes):
+    """Lien « page suivante » (?cursor=…) d'une liste, ou None."""
+    match = re.search(rb"[?&;]cursor=([\w-]+)", content)
+    if not match:
+        return None
+    return f"{path.split('?')[0]}?cursor={match.group(1).decode()}"
+
+
+def capture(client, path) -> tuple:
+    """(réponse, SQL exécutés) pour `path`, cache vidé : tout est recalculé."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(path)
+    return response, [query["sql"] for query in queries.captured_queries]
+
+
+# --- EXPLAIN ---
+
+
+def shape(sql: str) -> str:
+    """SQL sans ses valeurs : deux requêtes de même forme sont « la même »."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    return _IN_RE.sub("(…)", sql)
+
+
+def explain(sql: str):
+    """Plan de `sql` : arbre JSON (Postgres, avec ANALYZE) ou lignes SQLite."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)
+            plan = cursor.fetchone()[0]
+            return plan[0] if isinstance(plan, list) else plan
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _aliases(sql: str) -> dict:
+    """Alias -> table ("sitecontent_post" U0 …)."""
+    aliases = {table: table for table in _FROM_RE.findall(sql)}
+    for table, alias in re.findall(r'"(\w+)"\s+(?:AS\s+)?(U\d+|T\d+)\b', sql):
+        aliases[alias] = table
+    return aliases
+
+
+def plan_issues(sql: str, plan) -> list:
+    """[(constat, table, détail)] relevés dans le plan."""
+    issues = []
+    if isinstance(plan, dict):  # Postgres
+        stack = [plan["Plan"]]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.get("Plans", ()))
+            kind = node["Node Type"]
+            if kind == "Seq Scan":
+                detail = node.get("Filter", "")
+                issues.append(("seq_scan", node["Relation Name"], detail))
+            elif kind in ("Sort", "Incremental Sort"):
+                tables = _FROM_RE.findall(sql)
+                keys = ", ".join(node.get("Sort Key", ()))
+                issues.append(("sort", tables[0] if tables else "?", keys))
+        return issues
+    aliases = _aliases(sql)
+    tables = _FROM_RE.findall(sql)
+    for detail in plan:
+        match = _SQLITE_SCAN_RE.match(detail)
+        if match and match.group(1) != "CONSTANT":
+            table = aliases.get(match.group(1), match.group(1))
+            issues.append(("seq_scan", table, detail))
+        elif "TEMP B-TREE FOR ORDER BY" in detail:
+            issues.append(("sort", tables[0] if tables else "?", detail))
+    return issues
+
+
+def plan_time(plan):
+    """Durée mesurée par EXPLAIN ANALYZE (ms), None sur SQLite."""
+    return plan.get("Execution Time") if isinstance(plan, dict) else None
+
+
+# --- Index suggérés ---
+
+
+def _models_by_table() -> dict:
+    return {model._meta.db_table: model for model in apps.get_models()}
+
+
+def _main_clauses(sql: str) -> tuple:
+    """(WHERE, ORDER BY) de la requête principale, sous-requêtes exclues."""
+    upper = sql.upper()
+    keywords = (" WHERE ", " GROUP BY ", " ORDER BY ", " LIMIT ", " OFFSET ")
+    marks, depth, quoted = {}, 0, False
+    for i, char in enumerate(sql):
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0 and char == " ":
+            for keyword in keywords:
+                if keyword not in marks and upper.startswith(keyword, i):
+                    marks[keyword] = i
+
+    def clause(keyword):
+        if keyword not in marks:
+            return ""
+        start = marks[keyword] + len(keyword)
+        ends = [at for at in marks.values() if at > marks[keyword]]
+        return sql[start : min(ends, default=len(sql))]
+
+    return _SUBQUERY_RE.sub("(…)", clause(" WHERE ")), clause(" ORDER BY ")
+
+
+def suggest_index(sql: str, table: str, kind: str):
+    """
+    {"fields", "condition", "index", "existing", "note"} pour `table` : champs
+    en égalité, puis une plage, puis le tri ; booléens nus -> index partiel.
+    None si la requête principale ne filtre ni ne trie `table`.
+    """
+    model = _models_by_table().get(table)
+    if model is None:
+        return None
+    fields = {f.column: f for f in model._meta.concrete_fields}
+    names = {name for name, target in _aliases(sql).items() if target == table}
+    where, order_by = _main_clauses(sql)
+
+    equal, ranges, unindexable, condition = [], [], [], {}
+    for negated, alias, column in _BOOLEAN_RE.findall(where):
+        field = fields.get(column) if alias in names else None
+        if field is not None and field.get_internal_type() == "BooleanField":
+            condition[field.name] = not negated
+    for alias, column, op, value in _CONDITION_RE.findall(where):
+        field = fields.get(column) if alias in names else None
+        if field is None or value.upper().startswith("(SELECT") or value == "(…)":
+            continue
+        op = op.upper()
+        if op.endswith("LIKE"):
+            if value.startswith("'%"):
+                unindexable.append(field.name)
+        elif op in ("=", "IN", "IS"):
+            equal.append(field.name)
+        else:
+            ranges.append(field.name)
+
+    order, notes = [], []
+    for term in (t.strip() for t in order_by.split(",") if t.strip()):
+        match = _ORDER_TERM_RE.match(term)
+        field = fields.get(match.group(2)) if match else None
+        if field is None or match.group(1) not in names:
+            # Tri sur une expression (pertinence…) : l'index ne sert plus au-delà
+            notes.append(f"tri sur « {term[:40]} » : non indexable")
+            break
+        order.append(("-" if match.group(3) else "") + field.name)
+
+    columns = {}
+    for name in equal + ranges[:1] + order:
+        if name.lstrip("-") not in condition:
+            columns.setdefault(name.lstrip("-"), name)
+    columns = list(columns.values())
+    if unindexable:
+        notes.append(
+            f"LIKE '%…%' sur {', '.join(unindexable)} : pas d'index B-tree "
+            "possible (recherche plein texte, voir search.py)"
+        )
+    if not columns and (notes or not condition):
+        if not notes:
+            return None
+        return {
+            "fields": [],
+            "condition": {},
+            "index": None,
+            "existing": None,
+            "note": " ; ".join(notes),
+        }
+
+    existing = _existing_index(model, columns, condition)
+    if kind == "repeat":
+        notes.insert(0, "regrouper : select_related / prefetch_related")
+    elif existing:
+        notes.insert(
+            0,
+            f"index {existing} utilisable : le planificateur lui préfère un "
+            "parcours complet (table petite ou filtre peu sélectif)",
+        )
+    columns = columns or ["id"]
+    name = f"{model._meta.model_name}_{'_'.join(f.lstrip('-') for f in columns)}"
+    index = f"models.Index(fields={columns!r}, name={name[:26] + '_idx'!r}"
+    if condition:
+        terms = ", ".join(f"{field}={value}" for field, value in condition.items())
+        index += f", condition=Q({terms})"
+    return {
+        "fields": columns,
+        "condition": condition,
+        "index": index.replace("'", '"') + ")",
+        "existing": existing,
+        "note": " ; ".join(notes),
+    }
+
+
+def _existing_index(model, fields, condition):
+    """Index de `model` dont les premiers champs sont `fields` (dans un sens ou l'autre)."""
+    meta = model._meta
+    flipped = [f[1:] if f.startswith("-") else f"-{f}" for f in fields]
+    for index in meta.indexes:
+        # Index partiel : utilisable si la requête porte la même condition
+        if index.condition is not None and dict(index.condition.children) != condition:
+            continue
+        if not fields or list(index.fields[: len(fields)]) in (fields, flipped):
+            return index.name
+    if len(fields) == 1:
+        for field in meta.concrete_fields:
+            if field.name == fields[0].lstrip("-") and (
+                field.primary_key or field.unique or field.db_index
+            ):
+                return f"{field.name} (unique)" if field.unique else field.name
+    return None
+
+
+# --- Rapport ---
+
+
+def analyse(pages: dict, min_rows=0) -> dict:
+    """
+    `pages` : nom d'URL -> SQL capturés. Constats regroupés par (type, table,
+    forme de requête), classés par score décroissant.
+    """
+    row_counts = {}
+
+    def rows(table):
+        if table not in row_counts:
+            model = _models_by_table().get(table)
+            row_counts[table] = model._base_manager.count() if model else 0
+        return row_counts[table]
+
+    findings = {}
+    explained = {}
+    totals = {"queries": 0, "explained": 0}
+
+    def add(kind, table, sql, url, detail, count=1, time_ms=None):
+        if rows(table) < min_rows:
+            return
+        digest = hashlib.md5(shape(sql).encode("utf-8")).hexdigest()[:10]
+        key = f"{kind}:{table}:{digest}"
+        finding = findings.setdefault(
+            key,
+            {
+                "key": key,
+                "kind": kind,
+                "table": table,
+                "rows": rows(table),
+                "occurrences": 0,
+                "urls": [],
+                "detail": detail,
+                "sql": sql,
+                "time_ms": None,
+                "suggestion": suggest_index(sql, table, kind),
+            },
+        )
+        finding["occurrences"] += count
+        if url not in finding["urls"]:
+            finding["urls"].append(url)
+        if time_ms is not None:
+            finding["time_ms"] = round(max(finding["time_ms"] or 0, time_ms), 3)
+
+    for url, statements in pages.items():
+        selects = [
+            sql
+            for sql in statements
+            if sql.lstrip().upper().startswith(("SELECT", "WITH"))
+        ]
+        totals["queries"] += len(statements)
+        for sql in selects:
+            key = shape(sql)
+            if key not in explained:
+                explained[key] = explain(sql)
+                totals["explained"] += 1
+            plan = explained[key]
+            for kind, table, detail in plan_issues(sql, plan):
+                add(kind, table, sql, url, detail, time_ms=plan_time(plan))
+        # N+1 : même forme répétée ; la première occurrence n'est pas en trop
+        examples = {}
+        for sql in selects:
+            examples.setdefault(shape(sql), sql)
+        for key, count in Counter(shape(sql) for sql in selects).items():
+            if count >= REPEAT_THRESHOLD:
+                tables = _FROM_RE.findall(examples[key])
+                table = tables[0] if tables else "?"
+                add("repeat", table, examples[key], url, f"{count} fois", count - 1)
+
+    for finding in findings.values():
+        finding["score"] = (
+            WEIGHTS[finding["kind"]] * finding["occurrences"] * max(finding["rows"], 1)
+        )
+    ranked = sorted(findings.values(), key=lambda f: (-f["score"], f["key"]))
+    for rank, finding in enumerate(ranked, 1):
+        finding["rank"] = rank
+    by_kind = defaultdict(int)
+    for finding in ranked:
+        by_kind[finding["kind"]] += 1
+    return {
+        "pages": len(pages),
+        **totals,
+        "by_kind": dict(by_kind),
+        "findings": ranked,
+    }
@@ -0,0 +1,226 @@
+# sitecontent/ratelimit.py
+"""
+Limitation de débit partagée entre workers, dans Redis (REDIS_URL).
+
+Deux algorithmes, en mémoire constante par clé :
+
+* SlidingWindow(limit, window) : compteur à fenêtre glissante approchée
+  (fenêtre courante + fenêtre précédente pondérée), INCR + EXPIRE dans une
+  transaction Redis ;
+* TokenBucket(rate, capacity) : seau à jetons (rafales jusqu'à `capacity`,
+  puis `rate` requêtes/s), mis à jour par un script Lua.
+
+Sans REDIS_URL (dev, tests), aucune limite n'est appliquée : un cache
+fichiers ou mémoire n'offre pas de compteur atomique entre processus, et la
+limite réelle serait multipliée par le nombre de workers. Un avertissement
+est journalisé à la première requête limitée.
+
+Usage :
+    @ratelimit("search", TokenBucket(rate=1, capacity=20), key=search_key)
+    def projects_list(request): …
+"""
+import logging
+import math
+import time
+from dataclasses import dataclass
+from functools import wraps
+
+import redis
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_warned = False
+
+
+def _redis():
+    """Client redis-py (pool de connexions, thread-safe) ; None sans REDIS_URL."""
+    global _client
+    url = getattr(settings, "REDIS_URL", None)
+    if not url:
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(url)
+    return _client
+
+
+def _make_key(key: str) -> str:
+    # Préfixe et version du cache partagé (KEY_PREFIX), comme ses autres clés
+    cache = caches[getattr(settings, "RATELIMIT_CACHE_ALIAS", "default")]
+    return getattr(cache, "shared", cache).make_and_validate_key(key)
+
+
+def _fail_open(remaining: int):
+    global _warned
+    if not _warned:
+        _warned = True
+        logger.warning(
+            "Rate limit désactivé : REDIS_URL n'est pas défini (pas de "
+            "compteur atomique partagé entre les workers)."
+        )
+    return Decision(True, remaining, 0)
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    remaining: int
+    retry_after: int  # secondes (0 si autorisé)
+
+
+# --- Fenêtre glissante ---
+
+
+class SlidingWindow:
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+
+    def hit(self, key: str) -> Decision:
+        client = _redis()
+        if client is None:
+            return _fail_open(self.limit)
+        now = time.time()
+        index, elapsed = divmod(now, self.window)
+        current_key = _make_key(f"rl:sw:{key}:{int(index)}")
+        pipe = client.pipeline()  # MULTI / EXEC
+        pipe.incr(current_key)
+        # Deux fenêtres de vie : la fenêtre courante sert encore de « précédente »
+        pipe.expire(current_key, self.window * 2)
+        pipe.get(_make_key(f"rl:sw:{key}:{int(index) - 1}"))
+        current, _, previous = pipe.execute()
+        previous = int(previous or 0)
+        estimate = previous * (1 - elapsed / self.window) + current
+        if estimate <= self.limit:
+            return Decision(True, int(self.limit - estimate), 0)
+        return Decision(False, 0, math.ceil(self.window - elapsed))
+
+
+# --- Seau à jetons ---
+
+# KEYS[1] = clé ; ARGV = rate, capacity, cost. Horloge du serveur Redis.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+
+    def _decision(self, allowed: bool, tokens: float, cost: int) -> Decision:
+        if allowed:
+            return Decision(True, int(tokens), 0)
+        return Decision(False, 0, math.ceil((cost - tokens) / self.rate))
+
+    def hit(self, key: str, cost: int = 1) -> Decision:
+        client = _redis()
+        if client is None:
+            return _fail_open(self.capacity)
+        allowed, tokens = client.eval(
+            TOKEN_BUCKET_LUA,
+            1,
+            _make_key(f"rl:tb:{key}"),
+            self.rate,
+            self.capacity,
+            cost,
+        )
+        return self._decision(bool(allowed), float(tokens), cost)
+
+
+# --- Clés ---
+
+
+def client_ip(request) -> str:
+    # utile derrière proxy en prod
+    xff = request.META.get("HTTP_X_FORWARDED_FOR")
+    if xff:
+        return xff.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def search_key(request):
+    """Ne limite que les recherches (?q=…) : la navigation simple est libre."""
+    if (request.GET.get("q") or "").strip():
+        return client_ip(request)
+    return None
+
+
+# --- Décorateur ---
+
+
+def too_many_requests(request, decision: Decision):
+    response = HttpResponse(
+        "Trop de requêtes. Réessayez dans quelques instants.",
+        status=429,
+        content_type="text/plain; charset=utf-8",
+    )
+    response["Retry-After"] = str(decision.retry_after)
+    return response
+
+
+def ratelimit(
+    scope: str,
+    limiter,
+    key=client_ip,
+    methods=("GET", "POST"),
+    on_limited=too_many_requests,
+):
+    """
+    Limite la vue par `key(request)` (None = pas de limite pour cette requête).
+    Placé sous @anonymous_page_cache, seules les requêtes non servies par le
+    cache consomment le quota.
+    """
+
+    def check(request):
+        if request.method in methods:
+            ident = key(request)
+            if ident is not None:
+                decision = limiter.hit(f"{scope}:{ident}")
+                if not decision.allowed:
+                    return on_limited(request, decision)
+        return None
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                limited = await sync_to_async(check)(request)
+                if limited is not None:
+                    return limited
+                return await view(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limited = check(request)
+            if limited is not None:
+                return limited
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
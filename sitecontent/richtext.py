@@ -0,0 +1,379 @@
+# sitecontent/richtext.py
+"""
+Corps des articles prêt à afficher (Post.body_html), calculé à la sauvegarde
+depuis le HTML de CKEditor (Post.body) :
+
+* liste blanche de balises et d'attributs (script, on*, javascript: … retirés) :
+  le template l'affiche tel quel avec |safe ;
+* superflu de CKEditor retiré : style / class / lang en ligne (sauf
+  l'alignement du texte), <span> / <font>, commentaires, paragraphes vides ;
+* images du stockage média (uploads CKEditor) : déclinaisons redimensionnées
+  et recompressées (images.py) en <picture> + srcset, width / height,
+  loading="lazy" et decoding="async" (pas de décalage de mise en page).
+
+La sauvegarde n'ouvre aucun fichier du stockage média (R2) : déclinaisons
+manquantes et dimensions des originaux (width / height) sont lues par le
+worker `build_renditions --watch`, hors de la requête de l'admin, qui
+recalcule ensuite le corps (les premières vues affichent l'original).
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+from PIL import Image
+
+from . import images
+from .models import ImageRendition, Post
+
+ALLOWED_TAGS = set(
+    """a abbr b blockquote br caption cite code dd del div dl dt em figcaption
+    figure h1 h2 h3 h4 h5 h6 hr i iframe img ins li mark ol p pre q s small
+    strong sub sup table tbody td tfoot th thead tr u ul""".split()
+)
+
+# Retirées avec leur contenu ; les autres balises inconnues (span, font, o:p…)
+# sont « déballées » : leur texte est conservé
+DROPPED_TAGS = set(
+    """applet button form head math noscript object script select style svg
+    template textarea title""".split()
+)
+VOID_TAGS = {"br", "hr", "img"}
+
+# Blancs sans effet directement dans ces balises (indentation de CKEditor)
+CONTAINER_TAGS = {"ul", "ol", "dl", "table", "thead", "tbody", "tfoot", "tr"}
+
+ALLOWED_ATTRS = {
+    "a": {"href", "title", "target", "id", "name"},
+    "abbr": {"title"},
+    "blockquote": {"cite"},
+    "q": {"cite"},
+    "ol": {"start", "type", "reversed"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan", "scope"},
+    "iframe": {"src", "title", "width", "height", "allow", "allowfullscreen"},
+    **{f"h{level}": {"id"} for level in range(1, 7)},
+}
+URL_ATTRS = {"href", "src", "cite"}
+SAFE_SCHEMES = {"", "http", "https", "mailto", "tel"}
+
+# Seule propriété de style conservée (boutons d'alignement de CKEditor)
+ALIGNABLE_TAGS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "td", "th"}
+_ALIGN_RE = re.compile(r"text-align\s*:\s*(center|right|justify)", re.I)
+
+# Retirées si elles ne contiennent que des blancs (&nbsp;, <br>)
+EMPTY_BLOCKS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6"}
+EMPTY_INLINES = {"b", "em", "i", "mark", "s", "small", "strong", "u"}
+
+# Colonne de l'article (blog_detail.html : 8 colonnes sur 12)
+BODY_IMAGE_SIZES = "(min-width: 1280px) 800px, (min-width: 768px) 66vw, 100vw"
+
+# Formats déclinés (les GIF animés et SVG restent tels quels)
+RESIZABLE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+_SIZE_RE = re.compile(r"(?:^|;)\s*(width|height)\s*:\s*(\d+)px", re.I)
+_SPACES_RE = re.compile(r"\s{2,}|[\t\r\n\f]")
+_BLANK = " \t\r\n\f\xa0"
+
+
+# --- URLs ---
+
+
+def safe_url(value: str, schemes=SAFE_SCHEMES) -> bool:
+    # Les navigateurs ignorent blancs et caractères de contrôle (« java\tscript: »)
+    cleaned = "".join(ch for ch in value or "" if ch > " ")
+    try:
+        return urlsplit(cleaned).scheme.lower() in schemes
+    except ValueError:
+        return False
+
+
+def https_url(value: str) -> bool:
+    """URL absolue en https:// (les « //hôte/… » sont refusées)."""
+    cleaned = "".join(ch for ch in value or "" if ch > " ")
+    try:
+        parts = urlsplit(cleaned)
+    except ValueError:
+        return False
+    return parts.scheme.lower() == "https" and bool(parts.netloc)
+
+
+def media_source(src: str):
+    """Nom dans le stockage média d'une URL d'image du site (None sinon)."""
+    media_url = settings.MEDIA_URL
+    if media_url.startswith("/"):
+        # URL relative ou absolue collée depuis le site (https://…/media/…)
+        path = urlsplit(src).path
+    else:
+        path = src.split("?", 1)[0]
+    if not path.startswith(media_url):
+        return None
+    name = unquote(path[len(media_url) :])
+    if not name.lower().endswith(RESIZABLE_SUFFIXES) or ".." in name.split("/"):
+        return None
+    return name
+
+
+# --- Images ---
+
+
+def _display_size(attrs: dict):
+    """Taille d'affichage choisie dans CKEditor (style ou attributs)."""
+    size = {"width": None, "height": None}
+    for name, value in _SIZE_RE.findall(attrs.get("style") or ""):
+        size[name.lower()] = int(value)
+    for name in size:
+        value = (attrs.get(name) or "").strip()
+        if value.isdigit():
+            size[name] = int(value)
+    return size["width"], size["height"]
+
+
+def _intrinsic_size(source: str):
+    # En-tête seulement (Pillow ne décode pas l'image pour .size)
+    try:
+        with default_storage.open(source, "rb") as f, Image.open(f) as img:
+            width, height = img.size
+            if img.getexif().get(0x0112) in (5, 6, 7, 8):  # rotation EXIF
+                width, height = height, width
+            return width, height
+    except Exception:
+        return None
+
+
+def _scaled(display, intrinsic):
+    width, height = display
+    if width and height:
+        return width, height
+    if not intrinsic:
+        return None
+    iw, ih = intrinsic
+    if width:
+        return width, max(1, round(ih * width / iw))
+    if height:
+        return max(1, round(iw * height / ih)), height
+    return iw, ih
+
+
+def image_html(attrs: dict, intrinsic_sizes: bool = False) -> str:
+    src = (attrs.get("src") or "").strip()
+    if not src or not safe_url(src):
+        return ""
+    alt = attrs.get("alt") or ""
+    display = _display_size(attrs)
+    source = media_source(src)
+    rendition = images.get_rendition(source) if source else None
+    if rendition:
+        dimensions = _scaled(display, (rendition["width"], rendition["height"]))
+        width = display[0] or (dimensions[0] if display[1] else None)
+        sizes = f"(max-width: {width}px) 100vw, {width}px" if width else None
+        return images.picture_html(
+            rendition, sizes or BODY_IMAGE_SIZES, alt, dimensions=dimensions
+        )
+    # Ouvre le fichier : worker / commandes seulement (intrinsic_sizes)
+    intrinsic = _intrinsic_size(source) if source and intrinsic_sizes else None
+    dimensions = _scaled(display, intrinsic)
+    size_attrs = (
+        format_html(' width="{}" height="{}"', *dimensions) if dimensions else ""
+    )
+    return format_html(
+        '<img src="{}" alt="{}"{} loading="lazy" decoding="async">',
+        src,
+        alt,
+        size_attrs,
+    )
+
+
+# --- Nettoyage ---
+
+
+class _Cleaner(HTMLParser):
+    def __init__(self, intrinsic_sizes=False):
+        super().__init__(convert_charrefs=True)
+        self.intrinsic_sizes = intrinsic_sizes
+        self.out = []
+        # Éléments ouverts : [balise, position dans out, contenu non vide]
+        self.stack = []
+        # Balise retirée avec son contenu en cours, et sa profondeur
+        self.skip_tag, self.skip_depth = None, 0
+        self.pre = 0
+
+    def _mark_content(self):
+        for element in self.stack:
+            element[2] = True
+
+    def _skip(self, tag):
+        self.skip_tag, self.skip_depth = tag, 1
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_tag:
+            self.skip_depth += tag == self.skip_tag
+            return
+        if tag in DROPPED_TAGS:
+            self._skip(tag)
+            return
+        if tag not in ALLOWED_TAGS:
+            return  # déballée
+        attrs = {name: value for name, value in attrs}
+        if tag == "img":
+            markup = image_html(attrs, self.intrinsic_sizes)
+            if markup:
+                self.out.append(markup)
+                self._mark_content()
+            return
+        if tag == "iframe" and not https_url(attrs.get("src")):
+            self._skip(tag)
+            return
+        if tag in VOID_TAGS:
+            self.out.append(f"<{tag}>")
+            if tag == "hr":
+                self._mark_content()
+            return
+        self.out.append(f"<{tag}{self._attributes(tag, attrs)}>")
+        self.stack.append([tag, len(self.out) - 1, tag == "iframe"])
+        if tag == "pre":
+            self.pre += 1
+
+    def _attributes(self, tag, attrs) -> str:
+        allowed = ALLOWED_ATTRS.get(tag, ())
+        kept = {}
+        for name, value in attrs.items():
+            if name not in allowed:
+                continue
+            if name in URL_ATTRS and not safe_url(value):
+                continue
+            kept[name] = value
+        align = _ALIGN_RE.search(attrs.get("style") or "")
+        if tag in ALIGNABLE_TAGS and align:
+            kept["style"] = f"text-align:{align.group(1).lower()}"
+        if tag == "a" and kept.get("target") == "_blank":
+            kept["rel"] = "noopener noreferrer"
+        if tag == "iframe":
+            kept["loading"] = "lazy"
+        return "".join(
+            f" {name}" if value is None else f' {name}="{escape(value)}"'
+            for name, value in kept.items()
+        )
+
+    def handle_endtag(self, tag):
+        if self.skip_tag:
+            self.skip_depth -= tag == self.skip_tag
+            if not self.skip_depth:
+                self.skip_tag = None
+            return
+        if not any(element[0] == tag for element in self.stack):
+            return  # balise déballée ou fermeture orpheline
+        while self.stack:
+            name = self._close()
+            if name == tag:
+                break
+
+    def _close(self) -> str:
+        tag, start, has_content = self.stack.pop()
+        if tag == "pre":
+            self.pre -= 1
+        if not has_content and (tag in EMPTY_BLOCKS or tag in EMPTY_INLINES):
+            # Paragraphe vide (<p>&nbsp;</p>) : supprimé ; balise de mise en
+            # forme vide : remplacée par un blanc s'il séparait deux mots
+            blank = any(self.out[start + 1 :])
+            del self.out[start:]
+            spaced = self.out and self.out[-1].endswith(" ")
+            if blank and tag in EMPTY_INLINES and not spaced:
+                self.out.append(" ")
+        else:
+            self.out.append(f"</{tag}>")
+        return tag
+
+    def handle_data(self, data):
+        if self.skip_tag or not data:
+            return
+        if not self.pre:
+            data = _SPACES_RE.sub(" ", data)
+        if data.strip(_BLANK):
+            self._mark_content()
+        elif self.stack and self.stack[-1][0] in CONTAINER_TAGS:
+            return
+        self.out.append(escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self._close()
+        return "".join(self.out).strip()
+
+
+def optimize(html: str, intrinsic_sizes: bool = False) -> str:
+    """
+    HTML CKEditor → HTML nettoyé, sûr, images responsive. `intrinsic_sizes` :
+    lit dans le stockage la taille des images pas encore déclinées.
+    """
+    cleaner = _Cleaner(intrinsic_sizes)
+    cleaner.feed(html or "")
+    return cleaner.close()
+
+
+class _ImageSources(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.sources = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "img":
+            return
+        source = media_source(dict(attrs).get("src") or "")
+        if source and source not in self.sources:
+            self.sources.append(source)
+
+
+def body_sources(html: str) -> list:
+    """Images du stockage média présentes dans le corps."""
+    parser = _ImageSources()
+    parser.feed(html or "")
+    parser.close()
+    return parser.sources
+
+
+# --- Sauvegarde ---
+
+
+def update_body_html(sender, instance, **kwargs):
+    """pre_save : recalcule le corps prêt à afficher (sans lire le stockage)."""
+    instance.body_html = optimize(instance.body)
+
+
+def missing_renditions(sources) -> list:
+    done = set(
+        ImageRendition.objects.filter(source__in=sources).values_list(
+            "source", flat=True
+        )
+    )
+    return [source for source in sources if source not in done]
+
+
+def optimize_post(pk, force: bool = False):
+    """
+    Déclinaisons des images du corps puis body_html recalculé (update() : ni
+    signaux ni `updated` modifié). Retourne le slug si le corps a changé.
+    """
+    post = Post.objects.filter(pk=pk).only("slug", "body", "body_html").first()
+    if post is None:
+        return None
+    sources = body_sources(post.body)
+    for source in sources if force else missing_renditions(sources):
+        images.build_renditions(source, force=force)
+    body_html = optimize(post.body, intrinsic_sizes=True)
+    if body_html == post.body_html:
+        return None
+    Post.objects.filter(pk=pk).update(body_html=body_html)
+    return post.slug
+
+
+def recent_posts(since) -> list:
+    """Articles modifiés depuis `since` (tous si None) dont le corps a des images."""
+    posts = Post.objects.filter(body__contains="<img")
+    if since is not None:
+        posts = posts.filter(updated__gte=since)
+    return list(posts.order_by("pk").values_list("pk", flat=True))
@@ -0,0 +1,178 @@
+# sitecontent/search.py
+"""
+Recherche plein texte sur Service, Project et Post.
+
+Chaque objet maintient un champ `search_document` (texte brut, sans HTML)
+recalculé à la sauvegarde. L'index dépend du moteur :
+
+* PostgreSQL : index GIN sur to_tsvector('french'|'english', search_document),
+  interrogé via websearch_to_tsquery et classé par ts_rank ;
+* SQLite : table virtuelle FTS5 par modèle (tokenizer porter/unicode61),
+  tenue à jour depuis les signaux et classée par bm25 ;
+* autre moteur (ou FTS5 indisponible) : repli sur icontains par mot.
+
+Document et table FTS5 ne suivent que save() / delete() (signaux) : après un
+QuerySet.update() ou un import en masse touchant les champs indexés, relancer
+`manage.py rebuild_search_index`.
+"""
+import html
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+from django.utils.translation import get_language
+
+# Champs indexés, par nom de modèle (utilisable aussi avec les modèles
+# « historiques » des migrations)
+SEARCH_FIELDS = {
+    "service": ("title", "excerpt", "body"),
+    "project": ("title", "client", "location", "context", "solution", "results"),
+    "post": ("title", "body"),
+}
+
+# Configurations Postgres (stemming) selon la langue active
+PG_CONFIGS = {"fr": "french", "en": "english"}
+DEFAULT_PG_CONFIG = "french"
+
+FTS_TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_SPACES_RE = re.compile(r"\s+")
+
+_fts_tables = set()
+
+
+# --- Document ---
+
+
+def to_plain_text(value: str) -> str:
+    text = html.unescape(strip_tags(value or ""))
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def build_document(instance) -> str:
+    fields = SEARCH_FIELDS[instance._meta.model_name]
+    parts = [to_plain_text(getattr(instance, f, "")) for f in fields]
+    return "\n".join(p for p in parts if p)
+
+
+def update_document(sender, instance, **kwargs):
+    """pre_save : recalcule le document avant écriture."""
+    instance.search_document = build_document(instance)
+
+
+# --- Noms de tables / détection des index ---
+
+
+def fts_table(model) -> str:
+    return f"{model._meta.db_table}_fts"
+
+
+def pg_index_name(model, config: str) -> str:
+    return f"{model._meta.db_table}_search_{config}"
+
+
+def has_fts(model) -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    table = fts_table(model)
+    # Seule la présence est mémorisée : appelé avant `migrate` (ou sans FTS5),
+    # on revérifie au prochain appel au lieu de se replier pour tout le processus
+    if table not in _fts_tables and table in connection.introspection.table_names():
+        _fts_tables.add(table)
+    return table in _fts_tables
+
+
+# --- Maintenance de l'index FTS5 (SQLite) ---
+
+
+def index_object(sender, instance, **kwargs):
+    """post_save : (ré)indexe la ligne dans la table FTS5."""
+    if not has_fts(sender):
+        return
+    table = fts_table(sender)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+        cursor.execute(
+            f"INSERT INTO {table}(rowid, search_document) VALUES (%s, %s)",
+            [instance.pk, instance.search_document],
+        )
+
+
+def unindex_object(sender, instance, **kwargs):
+    """post_delete : retire la ligne de la table FTS5."""
+    if not has_fts(sender):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {fts_table(sender)} WHERE rowid = %s", [instance.pk]
+        )
+
+
+def rebuild_fts(model) -> None:
+    if not has_fts(model):
+        return
+    table = fts_table(model)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(
+            f"INSERT INTO {table}(rowid, search_document) "
+            f"SELECT id, search_document FROM {model._meta.db_table}"
+        )
+
+
+# --- Requêtes ---
+
+
+def _words(q: str) -> list:
+    return _WORD_RE.findall(q or "")
+
+
+def search(queryset, q: str):
+    """
+    Filtre `queryset` sur la recherche `q` et annote `search_rank`
+    (plus grand = plus pertinent).
+    """
+    words = _words(q)
+    if not words:
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        ).none()
+
+    model = queryset.model
+    table = connection.ops.quote_name(model._meta.db_table)
+
+    if connection.vendor == "postgresql":
+        config = PG_CONFIGS.get((get_language() or "")[:2], DEFAULT_PG_CONFIG)
+        # Expression identique à celle de l'index GIN (cf. migration 0006)
+        vector = f"to_tsvector('{config}'::regconfig, {table}.\"search_document\")"
+        tsquery = f"websearch_to_tsquery('{config}'::regconfig, %s)"
+        return queryset.filter(
+            RawSQL(f"{vector} @@ {tsquery}", [q], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({vector}, {tsquery})", [q], output_field=FloatField()
+            )
+        )
+
+    if has_fts(model):
+        fts = fts_table(model)
+        # Chaque mot entre guillemets (pas d'injection de syntaxe FTS5),
+        # suffixé de * pour la recherche par préfixe ; ET implicite.
+        match = " ".join(f'"{w}"*' for w in words)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({fts}) FROM {fts} "
+                f'WHERE {fts} MATCH %s AND rowid = {table}."id"',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    for word in words:
+        queryset = queryset.filter(search_document__icontains=word)
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
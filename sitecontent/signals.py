@@ -0,0 +1,124 @@
+# sitecontent/signals.py
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from . import caching, excerpts, prerender, richtext, search, sitemaps, years
+from .models import (
+    HomeSettings,
+    Partner,
+    Post,
+    Project,
+    ProjectImage,
+    Service,
+    SiteContact,
+)
+
+CACHED_MODELS = (
+    Service,
+    Project,
+    ProjectImage,
+    Post,
+    Partner,
+    HomeSettings,
+    SiteContact,
+)
+
+
+def invalidate_page_cache(sender, **kwargs):
+    # Toute édition (admin, shell, commande) rend obsolètes les pages concernées.
+    # Après commit : une requête qui voit la nouvelle version lit aussi les
+    # nouvelles lignes (sinon elle mettrait l'ancienne page sous la nouvelle
+    # version). Enregistré en premier, passe avant sitemaps et export statique.
+    transaction.on_commit(partial(caching.bump, caching.tag_for_model(sender)))
+
+
+for _model in CACHED_MODELS:
+    post_save.connect(invalidate_page_cache, sender=_model)
+    post_delete.connect(invalidate_page_cache, sender=_model)
+
+
+# --- Index de recherche ---
+
+for _model in (Service, Project, Post):
+    pre_save.connect(search.update_document, sender=_model)
+    post_save.connect(search.index_object, sender=_model)
+    post_delete.connect(search.unindex_object, sender=_model)
+
+
+# --- Résumés en texte brut (cartes, balises meta) ---
+
+for _model in (Service, Project, Post):
+    pre_save.connect(excerpts.update_summary, sender=_model)
+
+
+# --- Corps des articles prêt à afficher (nettoyé, images responsive) ---
+
+pre_save.connect(richtext.update_body_html, sender=Post)
+
+
+# --- Années des projets (filtre / tri par plage) ---
+
+pre_save.connect(years.update_years, sender=Project)
+
+
+# --- Image principale des projets ---
+
+
+def refresh_primary_image(*project_ids):
+    for project_id in {pid for pid in project_ids if pid}:
+        first = (
+            ProjectImage.objects.filter(project_id=project_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        Project.objects.filter(pk=project_id).update(primary_image_id=first)
+
+
+def project_image_saved(sender, instance, **kwargs):
+    # Projet courant + ancien projet si l'image a été déplacée
+    previous = Project.objects.filter(primary_image=instance).values_list(
+        "pk", flat=True
+    )
+    refresh_primary_image(instance.project_id, *previous)
+
+
+def project_image_deleted(sender, instance, **kwargs):
+    refresh_primary_image(instance.project_id)
+
+
+post_save.connect(project_image_saved, sender=ProjectImage)
+post_delete.connect(project_image_deleted, sender=ProjectImage)
+
+
+# --- Sitemaps : régénération de la seule section touchée ---
+
+
+def publish_sitemaps(sender, **kwargs):
+    sections = sitemaps.sections_for_model(sender)
+    if sections:
+        transaction.on_commit(partial(sitemaps.publish, *sections))
+
+
+for _model in (Service, Project, Post):
+    post_save.connect(publish_sitemaps, sender=_model)
+    post_delete.connect(publish_sitemaps, sender=_model)
+
+
+# --- Export statique : régénération des seules pages touchées ---
+
+
+def refresh_static_export(sender, instance, **kwargs):
+    # Dans la transaction : fichiers périmés retirés avant le commit, ligne
+    # PendingExport validée avec la sauvegarde (rendue par le worker)
+    if not prerender.enabled():
+        return
+    tag = caching.tag_for_model(sender)
+    prerender.queue({tag: {prerender.slug_for(instance)}})
+
+
+for _model in CACHED_MODELS:
+    post_save.connect(refresh_static_export, sender=_model)
+    post_delete.connect(refresh_static_export, sender=_model)
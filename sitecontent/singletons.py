@@ -0,0 +1,59 @@
+# sitecontent/singletons.py
+"""
+Registre des réglages « singleton » (HomeSettings, SiteContact).
+
+La ligne est chargée une fois par processus et gardée en mémoire. Le numéro
+de version du tag (voir caching.py), stocké dans le cache partagé, est relu
+à chaque accès : après une sauvegarde dans l'admin (une fois validée), chaque
+worker recharge.
+"""
+import threading
+
+from . import caching
+from .models import HomeSettings, SiteContact
+
+_MISSING = object()
+
+
+class SingletonRegistry:
+    def __init__(self, model, create: bool = False):
+        self.model = model
+        self.create = create
+        self.tag = caching.tag_for_model(model)
+        self._lock = threading.Lock()
+        self._obj = _MISSING
+        self._version = None
+
+    def get(self):
+        # Version lue AVANT le chargement, et incrémentée seulement après le
+        # commit de la sauvegarde (signals.py) : si on lit la nouvelle version,
+        # la ligne chargée ensuite est déjà la nouvelle. Une sauvegarde
+        # concurrente coûte au pire un rechargement de plus, jamais une valeur
+        # périmée gardée sous la nouvelle version.
+        version = caching.get_versions([self.tag])[0]
+        if self._obj is not _MISSING and self._version == version:
+            return self._obj
+        with self._lock:
+            if self._obj is _MISSING or self._version != version:
+                self._obj = self._load()
+                self._version = version
+        return self._obj
+
+    def clear(self):
+        with self._lock:
+            self._obj = _MISSING
+            self._version = None
+
+    def _load(self):
+        obj = self.model.objects.order_by("pk").first()
+        if obj is None and self.create:
+            # Ligne créée par la migration 0015 ; recréée ici si elle a été
+            # supprimée. Clé laissée à la séquence (une pk explicite la laisse
+            # en retard sous Postgres) ; deux processus concurrents peuvent
+            # créer chacun une ligne : la plus ancienne (pk) sert partout.
+            obj = self.model.objects.create()
+        return obj
+
+
+home_settings = SingletonRegistry(HomeSettings, create=True)
+site_contact = SingletonRegistry(SiteContact)
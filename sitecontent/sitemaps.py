@@ -1,39 +1,70 @@
+# sitecontent/sitemaps.py
+"""
+Sitemaps : index + sections paginées, pré-générées et compressées (gzip).
+
+Chaque page de section est rendue une fois puis gardée dans le cache partagé
+sous la version du tag du modèle (caching.py) : une sauvegarde ne régénère
+que la section concernée (et l'index). Si SITE_URL est défini, la
+régénération est faite dès la publication (signals.py) ; sinon au premier
+passage d'un robot, protégé contre les accès simultanés.
+"""
+import gzip
+from urllib.parse import urlsplit
+
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
-from .models import Service, Project, Post
+from django.core.paginator import InvalidPage
+from django.db.models import Max
+from django.template.loader import render_to_string
 from django.urls import reverse
 
+from . import caching
+from .models import Service, Project, Post
 
-class ServiceSitemap(Sitemap):
-    changefreq = "monthly"
-    priority = 0.8
+SITEMAP_TIMEOUT = 7 * 24 * 60 * 60
+
+
+class ModelSitemap(Sitemap):
+    """Ne charge que slug / updated de `model` ; lastmod = updated."""
+
+    model = None
+    limit = getattr(settings, "SITEMAP_PAGE_SIZE", 5000)
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
 
     def items(self):
-        return Service.objects.all()
+        return self.get_queryset().only("slug", "updated").order_by("pk")
 
     def location(self, obj):
         return obj.get_absolute_url()
 
+    def lastmod(self, obj):
+        return obj.updated
+
+    def get_latest_lastmod(self):
+        return self.get_queryset().aggregate(latest=Max("updated"))["latest"]
 
-class ProjectSitemap(Sitemap):
+
+class ServiceSitemap(ModelSitemap):
+    model = Service
     changefreq = "monthly"
-    priority = 0.9
+    priority = 0.8
 
-    def items(self):
-        return Project.objects.all()
 
-    def location(self, obj):
-        return obj.get_absolute_url()
+class ProjectSitemap(ModelSitemap):
+    model = Project
+    changefreq = "monthly"
+    priority = 0.9
 
 
-class PostSitemap(Sitemap):
+class PostSitemap(ModelSitemap):
+    model = Post
     changefreq = "weekly"
     priority = 0.6
 
-    def items(self):
-        return Post.objects.filter(published=True)
-
-    def location(self, obj):
-        return obj.get_absolute_url()
+    def get_queryset(self):
+        return super().get_queryset().filter(published=True)
 
 
 class StaticSitemap(Sitemap):
@@ -52,3 +83,109 @@ class StaticSitemap(Sitemap):
 
     def location(self, item):
         return reverse(item)
+
+
+SITEMAPS = {
+    "services": ServiceSitemap,
+    "projects": ProjectSitemap,
+    "posts": PostSitemap,
+    "static": StaticSitemap,
+}
+
+# Tag (caching.py) dont dépend chaque section ; la section statique ne
+# dépend que des templates.
+SECTION_TAGS = {"services": "service", "projects": "project", "posts": "post"}
+
+
+class _Site:
+    def __init__(self, domain):
+        self.domain = self.name = domain
+
+
+# --- Rendu ---
+
+
+def _section_tags(section) -> tuple:
+    tag = SECTION_TAGS.get(section)
+    return (tag,) if tag else ()
+
+
+def render_section(section: str, page: int, protocol: str, domain: str) -> bytes:
+    sitemap = SITEMAPS[section]()
+    urls = sitemap.get_urls(page=page, site=_Site(domain), protocol=protocol)
+    xml = render_to_string("sitemap.xml", {"urlset": urls})
+    return gzip.compress(xml.encode("utf-8"), mtime=0)
+
+
+def render_index(protocol: str, domain: str) -> bytes:
+    entries = []
+    for section, cls in SITEMAPS.items():
+        sitemap = cls()
+        location = reverse("sitemap_section", kwargs={"section": section})
+        last_mod = sitemap.get_latest_lastmod()
+        for page in range(1, sitemap.paginator.num_pages + 1):
+            suffix = f"?p={page}" if page > 1 else ""
+            entries.append(
+                {
+                    "location": f"{protocol}://{domain}{location}{suffix}",
+                    "last_mod": last_mod,
+                }
+            )
+    xml = render_to_string("sitemap_index.xml", {"sitemaps": entries})
+    return gzip.compress(xml.encode("utf-8"), mtime=0)
+
+
+# --- Cache ---
+
+
+def _key(*parts) -> str:
+    # RELEASE : un déploiement (nouvelles URLs, section statique) régénère tout
+    return ":".join(["sitemap", getattr(settings, "RELEASE", ""), *map(str, parts)])
+
+
+def get_section(section: str, page: int, protocol: str, domain: str) -> bytes:
+    """XML gzippé de la page `page` de `section` (None si la page n'existe pas)."""
+
+    def build():
+        try:
+            return render_section(section, page, protocol, domain)
+        except InvalidPage:
+            return b""  # mémorisé aussi : pas de requête pour les pages absentes
+
+    data = caching.remember(
+        _key(section, page, protocol, domain),
+        build,
+        _section_tags(section),
+        SITEMAP_TIMEOUT,
+    )
+    return data or None
+
+
+def get_index(protocol: str, domain: str) -> bytes:
+    return caching.remember(
+        _key("index", protocol, domain),
+        lambda: render_index(protocol, domain),
+        tuple(SECTION_TAGS.values()),
+        SITEMAP_TIMEOUT,
+    )
+
+
+def publish(*sections) -> None:
+    """
+    Pré-génère l'index et les sections données (toutes par défaut) pour
+    SITE_URL. Sans SITE_URL, la génération se fera à la première requête.
+    """
+    site_url = getattr(settings, "SITE_URL", "")
+    if not site_url:
+        return
+    parts = urlsplit(site_url)
+    protocol, domain = parts.scheme or "https", parts.netloc
+    for section in sections or SITEMAPS:
+        for page in range(1, SITEMAPS[section]().paginator.num_pages + 1):
+            get_section(section, page, protocol, domain)
+    get_index(protocol, domain)
+
+
+def sections_for_model(model) -> list:
+    tag = caching.tag_for_model(model)
+    return [s for s, t in SECTION_TAGS.items() if t == tag]
@@ -0,0 +1,1177 @@
+# sitecontent/stylesheet.py
+"""
+Feuille de style utilitaire générée au build (manage.py build_css).
+
+Remplace le CDN Tailwind (compilateur JIT exécuté dans le navigateur) : les
+templates et BASE_INPUT_CLASS (forms.py) sont parcourus, chaque mot reconnu
+comme une classe utilitaire produit sa règle CSS, et le tout est écrit dans
+static/css/site.css, servi haché et compressé par WhiteNoise.
+
+Le générateur couvre le sous-ensemble de Tailwind v3 employé par le site
+(espacements, couleurs et opacités, dégradés, grilles, transformations,
+ombres, anneaux, variantes hover/focus/group/responsive, valeurs et
+propriétés arbitraires). Une classe inconnue est simplement ignorée, comme
+avec Tailwind ; le thème reprend l'ancienne configuration du CDN. Le plugin
+typography (`prose`) n'était pas chargé par le CDN et ne l'est pas ici.
+"""
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+CONTENT = ("templates/**/*.html", "sitecontent/forms.py")
+OUTPUT = "static/css/site.css"
+
+HEADER = "/* Généré par `python manage.py build_css` : ne pas modifier. */\n"
+
+# --- Thème ---
+
+SCREENS = {
+    "sm": "640px",
+    "md": "768px",
+    "lg": "1024px",
+    "xl": "1280px",
+    "2xl": "1536px",
+}
+
+SHADES = ("50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950")
+
+PALETTE = {
+    "slate": "f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617",
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a",
+    "orange": "fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407",
+    "amber": "fffbeb fef3c7 fde68a fcd34d fbbf24 f59e0b d97706 b45309 92400e 78350f 451a03",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16",
+    "emerald": "ecfdf5 d1fae5 a7f3d0 6ee7b7 34d399 10b981 059669 047857 065f46 064e3b 022c22",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554",
+    "indigo": "eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b",
+}
+
+# Couleurs de la marque (ex-`tailwind.config` de base.html)
+BRAND_COLORS = {
+    "brand": {
+        "DEFAULT": "f97316",
+        "50": "fff7ed",
+        "100": "ffedd5",
+        "200": "fed7aa",
+        "500": "f97316",
+        "600": "ea580c",
+        "700": "c2410c",
+    },
+    "secondary": {
+        "DEFAULT": "10b981",
+        "50": "ecfdf5",
+        "100": "d1fae5",
+        "600": "059669",
+        "700": "047857",
+    },
+    "accent": {
+        "DEFAULT": "6366f1",
+        "50": "eef2ff",
+        "100": "e0e7ff",
+        "600": "4f46e5",
+        "700": "4338ca",
+    },
+    "ink": {"900": "0f172a", "700": "334155", "500": "64748b"},
+}
+
+COLORS = {"black": "000000", "white": "ffffff"}
+for _name, _hexes in PALETTE.items():
+    COLORS.update({f"{_name}-{s}": h for s, h in zip(SHADES, _hexes.split())})
+for _name, _shades in BRAND_COLORS.items():
+    for _shade, _hex in _shades.items():
+        COLORS[_name if _shade == "DEFAULT" else f"{_name}-{_shade}"] = _hex
+
+SPECIAL_COLORS = {
+    "transparent": "transparent",
+    "current": "currentColor",
+    "inherit": "inherit",
+}
+
+SPACING_STEPS = (
+    "0 0.5 1 1.5 2 2.5 3 3.5 4 5 6 7 8 9 10 11 12 14 16 20 24 28 32 36 40 44 48"
+    " 52 56 60 64 72 80 96"
+).split()
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"),
+    "sm": ("0.875rem", "1.25rem"),
+    "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"),
+    "xl": ("1.25rem", "1.75rem"),
+    "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"),
+    "4xl": ("2.25rem", "2.5rem"),
+    "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"),
+    "7xl": ("4.5rem", "1"),
+}
+
+FONT_WEIGHTS = {
+    "thin": "100",
+    "extralight": "200",
+    "light": "300",
+    "normal": "400",
+    "medium": "500",
+    "semibold": "600",
+    "bold": "700",
+    "extrabold": "800",
+    "black": "900",
+}
+
+LEADING = {
+    "none": "1",
+    "tight": "1.25",
+    "snug": "1.375",
+    "normal": "1.5",
+    "relaxed": "1.625",
+    "loose": "2",
+}
+
+TRACKING = {
+    "tighter": "-0.05em",
+    "tight": "-0.025em",
+    "normal": "0em",
+    "wide": "0.025em",
+    "wider": "0.05em",
+    "widest": "0.1em",
+}
+
+RADII = {
+    "none": "0px",
+    "sm": "0.125rem",
+    "": "0.25rem",
+    "md": "0.375rem",
+    "lg": "0.5rem",
+    "xl": "0.9rem",
+    "2xl": "1.25rem",
+    "3xl": "1.5rem",
+    "full": "9999px",
+}
+
+MAX_WIDTHS = {
+    "none": "none",
+    "xs": "20rem",
+    "sm": "24rem",
+    "md": "28rem",
+    "lg": "32rem",
+    "xl": "36rem",
+    "2xl": "42rem",
+    "3xl": "48rem",
+    "4xl": "56rem",
+    "5xl": "64rem",
+    "6xl": "72rem",
+    "7xl": "80rem",
+    "full": "100%",
+    "prose": "65ch",
+}
+
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "inner": "inset 0 2px 4px 0 rgb(0 0 0 / 0.05)",
+    "none": "0 0 #0000",
+    "card": "0 10px 30px -12px rgba(2,8,23,.20)",
+    "brand": "0 12px 28px -10px rgba(249,115,22,.35)",
+}
+
+BACKGROUND_IMAGES = {
+    "none": "none",
+    "grid-slate": (
+        "linear-gradient(to right, rgba(15,23,42,.06) 1px, transparent 1px),"
+        " linear-gradient(to bottom, rgba(15,23,42,.06) 1px, transparent 1px)"
+    ),
+}
+
+BACKGROUND_SIZES = {
+    "auto": "auto",
+    "cover": "cover",
+    "contain": "contain",
+    "grid-8": "8px 8px",
+}
+
+GRADIENT_DIRECTIONS = {
+    "t": "top",
+    "tr": "top right",
+    "r": "right",
+    "br": "bottom right",
+    "b": "bottom",
+    "bl": "bottom left",
+    "l": "left",
+    "tl": "top left",
+}
+
+BLURS = {
+    "none": "0",
+    "sm": "4px",
+    "": "8px",
+    "md": "12px",
+    "lg": "16px",
+    "xl": "24px",
+    "2xl": "40px",
+    "3xl": "64px",
+}
+
+EASINGS = {
+    "linear": "linear",
+    "in": "cubic-bezier(0.4, 0, 1, 1)",
+    "out": "cubic-bezier(0, 0, 0.2, 1)",
+    "in-out": "cubic-bezier(0.4, 0, 0.2, 1)",
+}
+
+TRANSITIONS = {
+    "": (
+        "color, background-color, border-color, text-decoration-color, fill,"
+        " stroke, opacity, box-shadow, transform, filter, backdrop-filter"
+    ),
+    "all": "all",
+    "colors": (
+        "color, background-color, border-color, text-decoration-color, fill, stroke"
+    ),
+    "opacity": "opacity",
+    "shadow": "box-shadow",
+    "transform": "transform",
+}
+
+# --- Base ---
+
+# Preflight de Tailwind v3 (modern-normalize + remise à zéro des marges)
+PREFLIGHT = """\
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:ui-sans-serif,system-ui,sans-serif,"Apple Color Emoji","Segoe UI Emoji","Segoe UI Symbol","Noto Color Emoji";font-feature-settings:normal;font-variation-settings:normal;-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+abbr:where([title]){-webkit-text-decoration:underline dotted;text-decoration:underline dotted}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,"Liberation Mono","Courier New",monospace;font-feature-settings:normal;font-variation-settings:normal;font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-0.25em}
+sup{top:-0.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+:-moz-ui-invalid{box-shadow:none}
+progress{vertical-align:baseline}
+::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+::-webkit-search-decoration{-webkit-appearance:none}
+::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+dialog{padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]:where(:not([hidden="until-found"])){display:none}
+*,::before,::after,::backdrop{--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-skew-x:0;--tw-skew-y:0;--tw-scale-x:1;--tw-scale-y:1;--tw-scroll-snap-strictness:proximity;--tw-ring-inset: ;--tw-ring-offset-width:0px;--tw-ring-offset-color:#fff;--tw-ring-color:rgb(59 130 246 / 0.5);--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-shadow-colored:0 0 #0000}
+"""
+
+
+def _container() -> str:
+    rules = [
+        ".container{width:100%;margin-right:auto;margin-left:auto;"
+        "padding-right:1rem;padding-left:1rem}"
+    ]
+    for width in SCREENS.values():
+        rules.append(f"@media (min-width:{width}){{.container{{max-width:{width}}}}}")
+    return "\n".join(rules) + "\n"
+
+
+# --- Valeurs ---
+
+_NUMBER_RE = re.compile(r"\d+(\.\d+)?")
+_FRACTION_RE = re.compile(r"(\d+)/(\d+)")
+
+
+def _arbitrary(value: str):
+    """`[16px]` → `16px` (les `_` valent des espaces), sinon None."""
+    if len(value) > 2 and value[0] == "[" and value[-1] == "]":
+        return value[1:-1].replace("_", " ")
+    return None
+
+
+def _negate(value: str, negative: bool) -> str:
+    if not negative or value in ("0", "0px"):
+        return value
+    if value[0].isdigit() or value[0] == ".":
+        return f"-{value}"
+    return f"calc({value} * -1)"
+
+
+def _spacing(value: str, negative=False, extra=None):
+    if extra and value in extra:
+        return _negate(extra[value], negative)
+    if value in SPACING_STEPS:
+        rem = float(value) / 4
+        result = "0px" if value == "0" else f"{rem:g}rem"
+    elif value == "px":
+        result = "1px"
+    elif _FRACTION_RE.fullmatch(value):
+        num, den = map(int, _FRACTION_RE.fullmatch(value).groups())
+        result = f"{num / den * 100:g}%"
+    else:
+        result = _arbitrary(value)
+    return None if result is None else _negate(result, negative)
+
+
+_SIZES = {"auto": "auto", "full": "100%", "min": "min-content", "max": "max-content"}
+_SIZES["fit"] = "fit-content"
+
+
+def _rgb(hex_value: str) -> str:
+    r, g, b = (int(hex_value[i : i + 2], 16) for i in (0, 2, 4))
+    return f"{r} {g} {b}"
+
+
+def _color(value: str):
+    """`slate-200`, `brand/20`, `[#abc]` → couleur CSS, sinon None."""
+    name, _, alpha = value.partition("/")
+    if name in SPECIAL_COLORS:
+        return None if alpha else SPECIAL_COLORS[name]
+    arbitrary = _arbitrary(name)
+    if arbitrary is not None:
+        return arbitrary if _looks_like_color(arbitrary) and not alpha else None
+    hex_value = COLORS.get(name)
+    if hex_value is None:
+        return None
+    if not alpha:
+        return f"#{hex_value}"
+    if not alpha.isdigit() or int(alpha) > 100:
+        return None
+    return f"rgb({_rgb(hex_value)} / {int(alpha) / 100:g})"
+
+
+def _transparent(value: str):
+    """Même teinte, opacité nulle (fin implicite d'un dégradé)."""
+    name = value.partition("/")[0]
+    if name in COLORS:
+        return f"rgb({_rgb(COLORS[name])} / 0)"
+    return "rgb(255 255 255 / 0)"
+
+
+def _looks_like_color(value: str) -> bool:
+    return value.startswith(("#", "rgb", "hsl", "color("))
+
+
+def _looks_like_image(value: str) -> bool:
+    return value.startswith("url(") or "gradient(" in value
+
+
+# --- Utilitaires ---
+
+TRANSFORM = (
+    "translate(var(--tw-translate-x), var(--tw-translate-y))"
+    " rotate(var(--tw-rotate)) skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y))"
+    " scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))"
+)
+
+BOX_SHADOW = (
+    "var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000),"
+    " var(--tw-shadow)"
+)
+
+SR_ONLY = [
+    ("position", "absolute"),
+    ("width", "1px"),
+    ("height", "1px"),
+    ("padding", "0"),
+    ("margin", "-1px"),
+    ("overflow", "hidden"),
+    ("clip", "rect(0, 0, 0, 0)"),
+    ("white-space", "nowrap"),
+    ("border-width", "0"),
+]
+
+DISPLAYS = {
+    "block": "block",
+    "inline-block": "inline-block",
+    "inline": "inline",
+    "flex": "flex",
+    "inline-flex": "inline-flex",
+    "table": "table",
+    "flow-root": "flow-root",
+    "grid": "grid",
+    "inline-grid": "inline-grid",
+    "contents": "contents",
+    "list-item": "list-item",
+    "hidden": "none",
+}
+
+SIDES = {
+    "t": ("top",),
+    "r": ("right",),
+    "b": ("bottom",),
+    "l": ("left",),
+    "x": ("left", "right"),
+    "y": ("top", "bottom"),
+    "s": ("inline-start",),
+    "e": ("inline-end",),
+}
+
+CORNERS = {
+    "t": ("top-left", "top-right"),
+    "r": ("top-right", "bottom-right"),
+    "b": ("bottom-right", "bottom-left"),
+    "l": ("top-left", "bottom-left"),
+    "tl": ("top-left",),
+    "tr": ("top-right",),
+    "br": ("bottom-right",),
+    "bl": ("bottom-left",),
+}
+
+ALIGNS = {
+    "start": "flex-start",
+    "end": "flex-end",
+    "center": "center",
+    "between": "space-between",
+    "around": "space-around",
+    "evenly": "space-evenly",
+    "stretch": "stretch",
+    "baseline": "baseline",
+}
+
+
+def _sides(prefix, sides, value):
+    return [(f"{prefix}-{side}", value) for side in SIDES[sides]]
+
+
+def _inset(m, neg):
+    value = _spacing(m["v"], neg, {"auto": "auto", "full": "100%"})
+    if value is None:
+        return None
+    props = {
+        "inset": ("inset",),
+        "inset-x": ("left", "right"),
+        "inset-y": ("top", "bottom"),
+        "start": ("inset-inline-start",),
+        "end": ("inset-inline-end",),
+    }.get(m["p"], (m["p"],))
+    return [(prop, value) for prop in props]
+
+
+def _margin(m, neg):
+    value = _spacing(m["v"], neg, {"auto": "auto"})
+    if value is None:
+        return None
+    if not m["s"]:
+        return [("margin", value)]
+    return _sides("margin", m["s"], value)
+
+
+def _padding(m, neg):
+    value = _spacing(m["v"])
+    if value is None:
+        return None
+    if not m["s"]:
+        return [("padding", value)]
+    return _sides("padding", m["s"], value)
+
+
+def _size(prop, extra):
+    def build(m, neg):
+        value = _spacing(m["v"], extra=extra)
+        if value is None:
+            return None
+        return [(p, value) for p in prop]
+
+    return build
+
+
+def _max_width(m, neg):
+    if m["v"] in MAX_WIDTHS:
+        return [("max-width", MAX_WIDTHS[m["v"]])]
+    if m["v"].startswith("screen-") and m["v"][7:] in SCREENS:
+        return [("max-width", SCREENS[m["v"][7:]])]
+    value = _arbitrary(m["v"])
+    return value and [("max-width", value)]
+
+
+def _aspect(m, neg):
+    value = {"auto": "auto", "square": "1 / 1", "video": "16 / 9"}.get(m["v"])
+    if value is None:
+        value = _arbitrary(m["v"])
+    return value and [("aspect-ratio", value.replace("/", " / "))]
+
+
+def _translate(m, neg):
+    value = _spacing(m["v"], neg, {"full": "100%"})
+    if value is None:
+        return None
+    return [(f"--tw-translate-{m['a']}", value), ("transform", TRANSFORM)]
+
+
+def _scale(m, neg):
+    value = m["v"]
+    if value.isdigit():
+        value = f"{int(value) / 100:g}"
+    else:
+        value = _arbitrary(value)
+    if value is None:
+        return None
+    axes = (m["a"],) if m["a"] else ("x", "y")
+    return [(f"--tw-scale-{a}", value) for a in axes] + [("transform", TRANSFORM)]
+
+
+def _animation(m, neg):
+    value = {"none": "none"}.get(m["v"]) or _arbitrary(m["v"])
+    return value and [("animation", value)]
+
+
+def _grid_cols(m, neg):
+    if m["v"] == "none":
+        return [("grid-template-columns", "none")]
+    if m["v"].isdigit():
+        return [("grid-template-columns", f"repeat({m['v']}, minmax(0, 1fr))")]
+    value = _arbitrary(m["v"])
+    return value and [("grid-template-columns", value)]
+
+
+def _col_span(m, neg):
+    if m["v"] == "full":
+        return [("grid-column", "1 / -1")]
+    return [("grid-column", f"span {m['v']} / span {m['v']}")]
+
+
+def _gap(m, neg):
+    value = _spacing(m["v"])
+    if value is None:
+        return None
+    prop = {"x": "column-gap", "y": "row-gap"}.get(m["a"], "gap")
+    return [(prop, value)]
+
+
+def _space(m, neg):
+    value = _spacing(m["v"], neg)
+    if value is None:
+        return None
+    start, end = ("left", "right") if m["a"] == "x" else ("top", "bottom")
+    decls = [(f"margin-{start}", value), (f"margin-{end}", "0px")]
+    return decls, " > :not([hidden]) ~ :not([hidden])"
+
+
+def _rounded(m, neg):
+    value = RADII.get(m["v"] or "")
+    if value is None:
+        value = _arbitrary(m["v"] or "")
+    if value is None:
+        return None
+    if not m["c"]:
+        return [("border-radius", value)]
+    return [(f"border-{corner}-radius", value) for corner in CORNERS[m["c"]]]
+
+
+def _border_width(m, neg):
+    value = m["v"]
+    if value is None:
+        value = "1px"
+    elif value.isdigit():
+        value = f"{value}px"
+    else:
+        value = _arbitrary(value)
+        if value is None or _looks_like_color(value):
+            return None
+    if not m["s"]:
+        return [("border-width", value)]
+    return [(f"border-{side}-width", value) for side in SIDES[m["s"]]]
+
+
+def _border_color(m, neg):
+    value = _color(m["v"])
+    return value and [("border-color", value)]
+
+
+def _background(m, neg):
+    value = m["v"]
+    if value in BACKGROUND_IMAGES:
+        return [("background-image", BACKGROUND_IMAGES[value])]
+    if value.startswith("gradient-to-") and value[12:] in GRADIENT_DIRECTIONS:
+        direction = GRADIENT_DIRECTIONS[value[12:]]
+        return [
+            (
+                "background-image",
+                f"linear-gradient(to {direction}, var(--tw-gradient-stops))",
+            )
+        ]
+    if value in BACKGROUND_SIZES:
+        return [("background-size", BACKGROUND_SIZES[value])]
+    if value in ("center", "top", "bottom", "left", "right"):
+        return [("background-position", value)]
+    if value in ("repeat", "no-repeat"):
+        return [("background-repeat", value)]
+    arbitrary = _arbitrary(value)
+    if arbitrary is not None and _looks_like_image(arbitrary):
+        return [("background-image", arbitrary)]
+    color = _color(value)
+    return color and [("background-color", color)]
+
+
+def _gradient(m, neg):
+    color = _color(m["v"])
+    if color is None:
+        return None
+    if m["p"] == "from":
+        return [
+            ("--tw-gradient-from", color),
+            ("--tw-gradient-to", _transparent(m["v"])),
+            ("--tw-gradient-stops", "var(--tw-gradient-from), var(--tw-gradient-to)"),
+        ]
+    if m["p"] == "via":
+        return [
+            ("--tw-gradient-to", _transparent(m["v"])),
+            (
+                "--tw-gradient-stops",
+                f"var(--tw-gradient-from), {color}, var(--tw-gradient-to)",
+            ),
+        ]
+    return [("--tw-gradient-to", color)]
+
+
+def _text(m, neg):
+    size, _, leading = m["v"].partition("/")
+    if size in FONT_SIZES:
+        font_size, line_height = FONT_SIZES[size]
+        if leading:
+            line_height = LEADING.get(leading) or _spacing(leading)
+            if line_height is None:
+                return None
+        return [("font-size", font_size), ("line-height", line_height)]
+    arbitrary = _arbitrary(m["v"])
+    if arbitrary is not None and not _looks_like_color(arbitrary):
+        return [("font-size", arbitrary)]
+    color = _color(m["v"])
+    return color and [("color", color)]
+
+
+def _leading(m, neg):
+    value = LEADING.get(m["v"]) or _spacing(m["v"])
+    return value and [("line-height", value)]
+
+
+def _tracking(m, neg):
+    value = TRACKING.get(m["v"]) or _arbitrary(m["v"])
+    return value and [("letter-spacing", _negate(value, neg))]
+
+
+def _placeholder(m, neg):
+    color = _color(m["v"])
+    return color and ([("color", color)], "::placeholder")
+
+
+def _opacity(m, neg):
+    if m["v"].isdigit() and int(m["v"]) <= 100:
+        return [("opacity", f"{int(m['v']) / 100:g}")]
+    value = _arbitrary(m["v"])
+    return value and [("opacity", value)]
+
+
+def _shadow(m, neg):
+    value = SHADOWS.get(m["v"] or "")
+    if value is None:
+        return None
+    colored = re.sub(r"rgba?\([^)]*\)", "var(--tw-shadow-color)", value)
+    return [
+        ("--tw-shadow", value),
+        ("--tw-shadow-colored", colored),
+        ("box-shadow", BOX_SHADOW),
+    ]
+
+
+def _ring_width(m, neg):
+    value = m["v"]
+    if value is None:
+        width = "3px"
+    elif value.isdigit():
+        width = f"{value}px"
+    else:
+        return None
+    return [
+        (
+            "--tw-ring-offset-shadow",
+            "var(--tw-ring-inset) 0 0 0 var(--tw-ring-offset-width)"
+            " var(--tw-ring-offset-color)",
+        ),
+        (
+            "--tw-ring-shadow",
+            f"var(--tw-ring-inset) 0 0 0 calc({width} + var(--tw-ring-offset-width))"
+            " var(--tw-ring-color)",
+        ),
+        (
+            "box-shadow",
+            "var(--tw-ring-offset-shadow), var(--tw-ring-shadow),"
+            " var(--tw-shadow, 0 0 #0000)",
+        ),
+    ]
+
+
+def _ring_color(m, neg):
+    color = _color(m["v"])
+    return color and [("--tw-ring-color", color)]
+
+
+def _backdrop_blur(m, neg):
+    value = BLURS.get(m["v"] or "")
+    if value is None:
+        value = _arbitrary(m["v"] or "")
+    if value is None:
+        return None
+    return [
+        ("-webkit-backdrop-filter", f"blur({value})"),
+        ("backdrop-filter", f"blur({value})"),
+    ]
+
+
+def _transition(m, neg):
+    props = TRANSITIONS.get(m["v"] or "")
+    if props is None:
+        return None
+    return [
+        ("transition-property", props),
+        ("transition-timing-function", EASINGS["in-out"]),
+        ("transition-duration", "150ms"),
+    ]
+
+
+def _duration(m, neg):
+    value = f"{m['v']}ms" if m["v"].isdigit() else _arbitrary(m["v"])
+    return value and [("transition-duration", value)]
+
+
+def _arbitrary_property(m, neg):
+    prop, value = m["prop"], m["value"].replace("_", " ")
+    return [(prop, value)]
+
+
+def _fixed(*decls):
+    return lambda m, neg: list(decls)
+
+
+# (motif, constructeur, accepte un préfixe « - »), dans l'ordre de sortie :
+# à spécificité égale, la dernière règle l'emporte (ex. `p-4 pt-2`).
+UTILITIES = [
+    (r"sr-only", _fixed(*SR_ONLY), False),
+    (
+        r"pointer-events-(?P<v>none|auto)",
+        lambda m, n: [("pointer-events", m["v"])],
+        False,
+    ),
+    (r"visible", _fixed(("visibility", "visible")), False),
+    (r"invisible", _fixed(("visibility", "hidden")), False),
+    (
+        r"(?P<v>static|fixed|absolute|relative|sticky)",
+        lambda m, n: [("position", m["v"])],
+        False,
+    ),
+    (r"(?P<p>inset-x|inset-y|inset)-(?P<v>.+)", _inset, True),
+    (r"(?P<p>top|right|bottom|left|start|end)-(?P<v>.+)", _inset, True),
+    (
+        r"z-(?P<v>\d+|auto)",
+        lambda m, n: [("z-index", _negate(m["v"], n))],
+        True,
+    ),
+    (
+        r"order-(?P<v>\d+|first|last|none)",
+        lambda m, n: [
+            (
+                "order",
+                {"first": "-9999", "last": "9999", "none": "0"}.get(
+                    m["v"], _negate(m["v"], n)
+                ),
+            )
+        ],
+        True,
+    ),
+    (r"col-span-(?P<v>\d+|full)", _col_span, False),
+    (r"m(?P<s>)-(?P<v>.+)", _margin, True),
+    (r"m(?P<s>[xy])-(?P<v>.+)", _margin, True),
+    (r"m(?P<s>[trblse])-(?P<v>.+)", _margin, True),
+    (
+        r"line-clamp-(?P<v>\d+)",
+        lambda m, n: [
+            ("overflow", "hidden"),
+            ("display", "-webkit-box"),
+            ("-webkit-box-orient", "vertical"),
+            ("-webkit-line-clamp", m["v"]),
+        ],
+        False,
+    ),
+    (
+        r"(?P<v>%s)" % "|".join(DISPLAYS),
+        lambda m, n: [("display", DISPLAYS[m["v"]])],
+        False,
+    ),
+    (r"aspect-(?P<v>.+)", _aspect, False),
+    (r"size-(?P<v>.+)", _size(("width", "height"), _SIZES), False),
+    (r"h-(?P<v>.+)", _size(("height",), {**_SIZES, "screen": "100vh"}), False),
+    (
+        r"max-h-(?P<v>.+)",
+        _size(("max-height",), {"none": "none", "full": "100%", "screen": "100vh"}),
+        False,
+    ),
+    (
+        r"min-h-(?P<v>.+)",
+        _size(("min-height",), {**_SIZES, "screen": "100vh"}),
+        False,
+    ),
+    (r"w-(?P<v>.+)", _size(("width",), {**_SIZES, "screen": "100vw"}), False),
+    (r"min-w-(?P<v>.+)", _size(("min-width",), _SIZES), False),
+    (r"max-w-(?P<v>.+)", _max_width, False),
+    (r"flex-1", _fixed(("flex", "1 1 0%")), False),
+    (r"flex-auto", _fixed(("flex", "1 1 auto")), False),
+    (r"flex-initial", _fixed(("flex", "0 1 auto")), False),
+    (r"flex-none", _fixed(("flex", "none")), False),
+    (r"shrink-0", _fixed(("flex-shrink", "0")), False),
+    (r"grow", _fixed(("flex-grow", "1")), False),
+    (r"translate-(?P<a>[xy])-(?P<v>.+)", _translate, True),
+    (r"scale-(?:(?P<a>[xy])-)?(?P<v>.+)", _scale, False),
+    (r"animate-(?P<v>.+)", _animation, False),
+    (
+        r"cursor-(?P<v>auto|default|pointer|wait|text|move|not-allowed|zoom-in|zoom-out)",
+        lambda m, n: [("cursor", m["v"])],
+        False,
+    ),
+    (
+        r"select-(?P<v>none|text|all|auto)",
+        lambda m, n: [("-webkit-user-select", m["v"]), ("user-select", m["v"])],
+        False,
+    ),
+    (
+        r"list-(?P<v>none|disc|decimal)",
+        lambda m, n: [("list-style-type", m["v"])],
+        False,
+    ),
+    (
+        r"snap-(?P<v>x|y|both)",
+        lambda m, n: [
+            ("scroll-snap-type", f"{m['v']} var(--tw-scroll-snap-strictness)")
+        ],
+        False,
+    ),
+    (
+        r"snap-(?P<v>mandatory|proximity)",
+        lambda m, n: [("--tw-scroll-snap-strictness", m["v"])],
+        False,
+    ),
+    (
+        r"snap-(?P<v>start|end|center)",
+        lambda m, n: [("scroll-snap-align", m["v"])],
+        False,
+    ),
+    (r"grid-cols-(?P<v>.+)", _grid_cols, False),
+    (r"flex-row", _fixed(("flex-direction", "row")), False),
+    (r"flex-col", _fixed(("flex-direction", "column")), False),
+    (r"flex-wrap", _fixed(("flex-wrap", "wrap")), False),
+    (r"flex-nowrap", _fixed(("flex-wrap", "nowrap")), False),
+    (
+        r"place-content-(?P<v>center|start|end|between|around|evenly|stretch)",
+        lambda m, n: [("place-content", ALIGNS[m["v"]].replace("flex-", ""))],
+        False,
+    ),
+    (
+        r"place-items-(?P<v>center|start|end|stretch)",
+        lambda m, n: [("place-items", m["v"])],
+        False,
+    ),
+    (
+        r"items-(?P<v>start|end|center|baseline|stretch)",
+        lambda m, n: [("align-items", ALIGNS[m["v"]])],
+        False,
+    ),
+    (
+        r"justify-(?P<v>start|end|center|between|around|evenly)",
+        lambda m, n: [("justify-content", ALIGNS[m["v"]])],
+        False,
+    ),
+    (
+        r"self-(?P<v>auto|start|end|center|stretch)",
+        lambda m, n: [("align-self", ALIGNS.get(m["v"], m["v"]))],
+        False,
+    ),
+    (r"gap-(?:(?P<a>[xy])-)?(?P<v>.+)", _gap, False),
+    (r"space-(?P<a>[xy])-(?P<v>.+)", _space, True),
+    (
+        r"overflow-(?P<v>auto|hidden|clip|visible|scroll)",
+        lambda m, n: [("overflow", m["v"])],
+        False,
+    ),
+    (
+        r"overflow-(?P<a>[xy])-(?P<v>auto|hidden|clip|visible|scroll)",
+        lambda m, n: [(f"overflow-{m['a']}", m["v"])],
+        False,
+    ),
+    (r"scroll-smooth", _fixed(("scroll-behavior", "smooth")), False),
+    (
+        r"truncate",
+        _fixed(
+            ("overflow", "hidden"),
+            ("text-overflow", "ellipsis"),
+            ("white-space", "nowrap"),
+        ),
+        False,
+    ),
+    (
+        r"whitespace-(?P<v>normal|nowrap|pre|pre-line|pre-wrap)",
+        lambda m, n: [("white-space", m["v"])],
+        False,
+    ),
+    (r"break-words", _fixed(("overflow-wrap", "break-word")), False),
+    (r"rounded(?:-(?P<c>tl|tr|br|bl|[trbl]))?(?:-(?P<v>.+))?", _rounded, False),
+    (r"border(?:-(?P<s>[xy]))?(?:-(?P<v>\d+|\[.+\]))?", _border_width, False),
+    (r"border-(?P<s>[trblse])(?:-(?P<v>\d+|\[.+\]))?", _border_width, False),
+    (
+        r"border-(?P<v>solid|dashed|dotted|double|none)",
+        lambda m, n: [("border-style", m["v"])],
+        False,
+    ),
+    (r"border-(?P<v>.+)", _border_color, False),
+    (r"bg-(?P<v>.+)", _background, False),
+    (r"(?P<p>from|via|to)-(?P<v>.+)", _gradient, False),
+    (
+        r"object-(?P<v>contain|cover|fill|none|scale-down)",
+        lambda m, n: [("object-fit", m["v"])],
+        False,
+    ),
+    (
+        r"object-(?P<v>center|top|bottom|left|right)",
+        lambda m, n: [("object-position", m["v"])],
+        False,
+    ),
+    (r"p(?P<s>)-(?P<v>.+)", _padding, False),
+    (r"p(?P<s>[xy])-(?P<v>.+)", _padding, False),
+    (r"p(?P<s>[trblse])-(?P<v>.+)", _padding, False),
+    (
+        r"text-(?P<v>left|center|right|justify|start|end)",
+        lambda m, n: [("text-align", m["v"])],
+        False,
+    ),
+    (r"text-(?P<v>.+)", _text, False),
+    (
+        r"font-(?P<v>%s)" % "|".join(FONT_WEIGHTS),
+        lambda m, n: [("font-weight", FONT_WEIGHTS[m["v"]])],
+        False,
+    ),
+    (r"uppercase", _fixed(("text-transform", "uppercase")), False),
+    (r"lowercase", _fixed(("text-transform", "lowercase")), False),
+    (r"capitalize", _fixed(("text-transform", "capitalize")), False),
+    (r"normal-case", _fixed(("text-transform", "none")), False),
+    (r"italic", _fixed(("font-style", "italic")), False),
+    (r"leading-(?P<v>.+)", _leading, False),
+    (r"tracking-(?P<v>.+)", _tracking, True),
+    (
+        r"underline",
+        _fixed(
+            ("-webkit-text-decoration-line", "underline"),
+            ("text-decoration-line", "underline"),
+        ),
+        False,
+    ),
+    (
+        r"line-through",
+        _fixed(
+            ("-webkit-text-decoration-line", "line-through"),
+            ("text-decoration-line", "line-through"),
+        ),
+        False,
+    ),
+    (
+        r"no-underline",
+        _fixed(
+            ("-webkit-text-decoration-line", "none"), ("text-decoration-line", "none")
+        ),
+        False,
+    ),
+    (
+        r"underline-offset-(?P<v>\d+)",
+        lambda m, n: [("text-underline-offset", f"{m['v']}px")],
+        False,
+    ),
+    (r"placeholder-(?P<v>.+)", _placeholder, False),
+    (
+        r"antialiased",
+        _fixed(
+            ("-webkit-font-smoothing", "antialiased"),
+            ("-moz-osx-font-smoothing", "grayscale"),
+        ),
+        False,
+    ),
+    (r"opacity-(?P<v>.+)", _opacity, False),
+    (
+        r"mix-blend-(?P<v>normal|multiply|screen|overlay|darken|lighten)",
+        lambda m, n: [("mix-blend-mode", m["v"])],
+        False,
+    ),
+    (r"shadow(?:-(?P<v>[\w-]+))?", _shadow, False),
+    (
+        r"outline-none",
+        _fixed(("outline", "2px solid transparent"), ("outline-offset", "2px")),
+        False,
+    ),
+    (r"ring(?:-(?P<v>\d+))?", _ring_width, False),
+    (r"ring-(?P<v>.+)", _ring_color, False),
+    (r"backdrop-blur(?:-(?P<v>.+))?", _backdrop_blur, False),
+    (r"transition(?:-(?P<v>[a-z]+))?", _transition, False),
+    (r"duration-(?P<v>.+)", _duration, False),
+    (
+        r"ease-(?P<v>linear|in|out|in-out)",
+        lambda m, n: [("transition-timing-function", EASINGS[m["v"]])],
+        False,
+    ),
+    (r"\[(?P<prop>[a-z-]+):(?P<value>[^\]]+)\]", _arbitrary_property, False),
+]
+UTILITIES = [(re.compile(p), build, neg) for p, build, neg in UTILITIES]
+
+
+def _utility(name: str):
+    """(rang, déclarations, suffixe de sélecteur) de `name`, sinon None."""
+    negative = name.startswith("-")
+    base = name[1:] if negative else name
+    for rank, (pattern, build, negatable) in enumerate(UTILITIES):
+        if negative and not negatable:
+            continue
+        match = pattern.fullmatch(base)
+        if match is None:
+            continue
+        result = build(match, negative)
+        if not result:
+            continue
+        decls, suffix = result if isinstance(result, tuple) else (result, "")
+        return rank, decls, suffix
+    return None
+
+
+# --- Variantes ---
+
+PSEUDO_CLASSES = {
+    "first": ":first-child",
+    "last": ":last-child",
+    "odd": ":nth-child(odd)",
+    "even": ":nth-child(even)",
+    "focus-within": ":focus-within",
+    "hover": ":hover",
+    "focus": ":focus",
+    "focus-visible": ":focus-visible",
+    "active": ":active",
+    "disabled": ":disabled",
+}
+
+PSEUDO_ELEMENTS = {"placeholder": "::placeholder", "backdrop": "::backdrop"}
+
+GROUP_VARIANTS = {
+    "group-hover": ".group:hover",
+    "group-focus": ".group:focus",
+    "group-focus-within": ".group:focus-within",
+}
+
+VARIANT_ORDER = [*PSEUDO_ELEMENTS, *PSEUDO_CLASSES, *GROUP_VARIANTS]
+
+
+def _split_variants(token: str) -> list:
+    """`md:hover:[a:b]` → ['md', 'hover', '[a:b]'] (les `:` entre crochets restent)."""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(token):
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == ":" and depth == 0:
+            parts.append(token[start:i])
+            start = i + 1
+    parts.append(token[start:])
+    return parts
+
+
+def _escape(name: str) -> str:
+    escaped = re.sub(r"([^a-zA-Z0-9_-])", r"\\\1", name)
+    if escaped[0].isdigit():
+        escaped = f"\\3{escaped[0]} {escaped[1:]}"
+    return escaped
+
+
+def _rule(token: str):
+    """(clé de tri, écran, règle CSS) de `token`, sinon None."""
+    *variants, name = _split_variants(token)
+    if not name or len(set(variants)) != len(variants):
+        return None
+    utility = _utility(name)
+    if utility is None:
+        return None
+    rank, decls, suffix = utility
+
+    screen, group, pseudo, element, order = None, "", "", "", 0
+    for variant in variants:
+        if variant in SCREENS and screen is None:
+            screen = variant
+        elif variant in PSEUDO_CLASSES:
+            pseudo += PSEUDO_CLASSES[variant]
+        elif variant in PSEUDO_ELEMENTS:
+            element = PSEUDO_ELEMENTS[variant]
+        elif variant in GROUP_VARIANTS and not group:
+            group = GROUP_VARIANTS[variant] + " "
+        else:
+            return None
+        if variant in VARIANT_ORDER:
+            order = max(order, VARIANT_ORDER.index(variant) + 1)
+
+    selector = f"{group}.{_escape(token)}{pseudo}{suffix}{element}"
+    body = ";".join(f"{prop}:{value}" for prop, value in decls)
+    return (order, rank, token), screen, f"{selector}{{{body}}}"
+
+
+# --- Génération ---
+
+# Mots candidats : tout ce qui n'est ni espace, ni guillemet, ni balise
+_TOKEN_RE = re.compile(r"[^\s\"'`<>={}]+")
+
+
+def scan(paths) -> set:
+    tokens = set()
+    for path in paths:
+        tokens.update(_TOKEN_RE.findall(Path(path).read_text(encoding="utf-8")))
+    return tokens
+
+
+def generate(tokens) -> tuple:
+    """(css, nombre de classes) pour les classes utilitaires parmi `tokens`."""
+    rules = {None: [], **{screen: [] for screen in SCREENS}}
+    for token in tokens:
+        rule = _rule(token)
+        if rule is not None:
+            key, screen, css = rule
+            rules[screen].append((key, css))
+
+    out = [HEADER, PREFLIGHT, _container()]
+    out += [css + "\n" for _, css in sorted(rules[None])]
+    for screen, width in SCREENS.items():
+        if rules[screen]:
+            out.append(f"@media (min-width:{width}){{\n")
+            out += [css + "\n" for _, css in sorted(rules[screen])]
+            out.append("}\n")
+    return "".join(out), sum(len(r) for r in rules.values())
+
+
+def content_files(base_dir=None) -> list:
+    base_dir = Path(base_dir or settings.BASE_DIR)
+    files = set()
+    for pattern in CONTENT:
+        files.update(base_dir.glob(pattern))
+    return sorted(files)
+
+
+def build(base_dir=None) -> tuple:
+    return generate(scan(content_files(base_dir)))
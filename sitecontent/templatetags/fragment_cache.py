@@ -0,0 +1,69 @@
+# sitecontent/templatetags/fragment_cache.py
+import hashlib
+
+from django import template
+
+from sitecontent import caching
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, name, vary_on, tags, fingerprint):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+        self.tags = tags
+        self.fingerprint = fingerprint
+
+    def render(self, context):
+        tags = self.tags.resolve(context).split() if self.tags else ()
+        return caching.fragment(
+            self.name.resolve(context),
+            lambda: self.nodelist.render(context),
+            tags=tags,
+            vary_on=[value.resolve(context) for value in self.vary_on],
+            fingerprint=self.fingerprint,
+        )
+
+
+def _template_fingerprint(origin) -> str:
+    # Source du template : une modification invalide ses fragments, même
+    # sans RELEASE (lu une fois, à la compilation du template)
+    try:
+        source = origin.loader.get_contents(origin)
+    except (AttributeError, template.TemplateDoesNotExist):
+        return ""
+    return hashlib.md5(source.encode("utf-8")).hexdigest()[:12]
+
+
+@register.tag
+def fragment(parser, token):
+    """
+    Fragment mis en cache jusqu'à la prochaine sauvegarde d'un des modèles de
+    `tags` (versions de caching.py). Les valeurs paresseuses qu'il affiche ne
+    sont lues qu'au rendu, donc pas du tout quand il est en cache.
+
+    Usage : {% fragment "header" [vary_on …] tags="service sitecontact" %} … {% endfragment %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' attend un nom de fragment : "
+            '{% fragment "header" tags="service" %}'
+        )
+    name, vary_on, tags = parser.compile_filter(bits[1]), [], None
+    for bit in bits[2:]:
+        if bit.startswith("tags="):
+            tags = parser.compile_filter(bit[len("tags=") :])
+        elif bit.split("=", 1)[0].isidentifier() and "=" in bit:
+            raise template.TemplateSyntaxError(
+                f"'{bits[0]}' : argument nommé inconnu « {bit} » (seul tags= existe)"
+            )
+        else:
+            vary_on.append(parser.compile_filter(bit))
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    return FragmentNode(
+        nodelist, name, vary_on, tags, _template_fingerprint(parser.origin)
+    )
@@ -0,0 +1,44 @@
+# sitecontent/templatetags/responsive_images.py
+from django import template
+from django.utils.html import format_html
+
+from sitecontent.images import get_rendition, picture_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(
+    image,
+    sizes="100vw",
+    alt="",
+    css_class="",
+    loading="lazy",
+    fetchpriority="",
+    intrinsic=True,
+):
+    """
+    <picture> avec sources AVIF/WebP et <img> JPEG en srcset.
+    Repli sur l'original tant que les variantes ne sont pas générées.
+    intrinsic=False omet width/height (images dont seule la hauteur est fixée
+    en CSS, ex. logos : l'attribut width imposerait la largeur d'origine).
+
+    Usage : {% responsive_image p.cover sizes="(min-width: 1280px) 33vw, 100vw" css_class="h-48 w-full object-cover" %}
+    """
+    if not image:
+        return ""
+    extra = format_html(' fetchpriority="{}"', fetchpriority) if fetchpriority else ""
+
+    rendition = get_rendition(image.name)
+    if not rendition:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async"{}>',
+            image.url,
+            alt,
+            css_class,
+            loading,
+            extra,
+        )
+
+    dimensions = (rendition["width"], rendition["height"]) if intrinsic else None
+    return picture_html(rendition, sizes, alt, css_class, loading, extra, dimensions)
@@ -1,3 +1,453 @@
-from django.test import TestCase
+import datetime
+import shutil
+import smtplib
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from . import cache_backends, caching, outbox, prerender, search, singletons, views
+from .models import (
+    HomeSettings,
+    OutboxMessage,
+    Partner,
+    PendingExport,
+    Post,
+    Service,
+)
+
+
+class FailingEmailBackend(LocmemBackend):
+    """Backend locmem dont chaque envoi échoue (serveur SMTP injoignable)."""
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPServerDisconnected("connexion perdue")
+
+
+def enqueue(**kwargs):
+    message = EmailMessage(
+        subject=kwargs.get("subject", "Contact"),
+        body="Bonjour",
+        from_email="site@example.com",
+        to=["contact@example.com"],
+        reply_to=["client@example.com"],
+    )
+    message.attach("devis.txt", "lignes", "text/plain")
+    return outbox.enqueue(message)
+
+
+# --- Outbox ---
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class OutboxDeliveryTests(TestCase):
+    def test_sends_due_message(self):
+        row = enqueue()
+
+        self.assertEqual(outbox.deliver_due(), {"sent": 1, "retry": 0, "dead": 0})
+
+        self.assertEqual(len(mail.outbox), 1)
+        sent = mail.outbox[0]
+        self.assertEqual(sent.to, ["contact@example.com"])
+        self.assertEqual(sent.reply_to, ["client@example.com"])
+        self.assertEqual(sent.attachments[0][:2], ("devis.txt", "lignes"))
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboxMessage.SENT)
+        self.assertEqual(row.attempts, 1)
+        self.assertIsNotNone(row.sent_at)
+        # Déjà envoyé : plus rien à faire
+        self.assertEqual(outbox.deliver_due(), {"sent": 0, "retry": 0, "dead": 0})
+
+    def test_file_backend_writes_message(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        enqueue(subject="Par fichier")
+
+        with self.settings(
+            EMAIL_BACKEND="django.core.mail.backends.filebased.EmailBackend",
+            EMAIL_FILE_PATH=path,
+        ):
+            self.assertEqual(outbox.deliver_due()["sent"], 1)
+
+        (written,) = Path(path).iterdir()
+        self.assertIn("Subject: Par fichier", written.read_text())
+
+    def test_future_message_is_not_sent(self):
+        row = enqueue()
+        OutboxMessage.objects.filter(pk=row.pk).update(
+            next_attempt_at=timezone.now() + datetime.timedelta(minutes=5)
+        )
+
+        self.assertEqual(outbox.deliver_due()["sent"], 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_claimed_message_is_not_claimed_twice(self):
+        row = enqueue()
+
+        self.assertEqual([r.pk for r in outbox.claim_due(10)], [row.pk])
+        # Second worker : le message est réservé pour LEASE secondes
+        self.assertEqual(outbox.claim_due(10), [])
+
+    def test_lease_is_renewed_for_rest_of_batch(self):
+        rows = [enqueue(subject=f"Message {i}") for i in range(3)]
+        claimed = outbox.claim_due(10)
+        past = timezone.now() - datetime.timedelta(seconds=1)
+        OutboxMessage.objects.update(next_attempt_at=past)
+
+        outbox.renew_lease(claimed[1:])
+
+        due = OutboxMessage.objects.filter(next_attempt_at__lte=timezone.now())
+        self.assertEqual(list(due.values_list("pk", flat=True)), [rows[0].pk])
+
+
+@override_settings(EMAIL_BACKEND="sitecontent.tests.FailingEmailBackend")
+class OutboxRetryTests(TestCase):
+    def make_due(self, row):
+        OutboxMessage.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+
+    def test_failure_is_retried_with_backoff(self):
+        row = enqueue()
+
+        for attempt in (1, 2, 3):
+            before = timezone.now()
+            stats = outbox.deliver_due()
+            self.assertEqual(stats, {"sent": 0, "retry": 1, "dead": 0})
+
+            row.refresh_from_db()
+            self.assertEqual(row.status, OutboxMessage.PENDING)
+            self.assertEqual(row.attempts, attempt)
+            self.assertIn("SMTPServerDisconnected", row.last_error)
+            # Délai doublé à chaque échec (±10 %)
+            delay = (row.next_attempt_at - before).total_seconds()
+            expected = outbox.RETRY_BASE * 2 ** (attempt - 1)
+            self.assertGreaterEqual(delay, expected * 0.9)
+            self.assertLessEqual(delay, expected * 1.1 + 1)
+            # Pas d'envoi avant l'échéance
+            self.assertEqual(outbox.deliver_due()["retry"], 0)
+            self.make_due(row)
+
+    def test_message_is_dead_lettered_after_max_attempts(self):
+        row = enqueue()
+        OutboxMessage.objects.filter(pk=row.pk).update(attempts=outbox.MAX_ATTEMPTS - 1)
+
+        self.assertEqual(outbox.deliver_due(), {"sent": 0, "retry": 0, "dead": 1})
+
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboxMessage.DEAD)
+        self.assertEqual(row.attempts, outbox.MAX_ATTEMPTS)
+        self.make_due(row)
+        self.assertEqual(outbox.claim_due(10), [])
+
+        # Remis en file depuis l'admin : nouvelle série d'essais
+        self.assertEqual(outbox.requeue(OutboxMessage.objects.all()), 1)
+        with self.settings(
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"
+        ):
+            self.assertEqual(outbox.deliver_due()["sent"], 1)
+
+
+# --- Recherche ---
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pump = Service.objects.create(
+            title="Pompage solaire",
+            slug="pompage",
+            body="<p>Installation de pompes &amp; forages</p>",
+        )
+        cls.network = Service.objects.create(
+            title="Réseaux", slug="reseaux", body="<p>Câblage et fibre</p>"
+        )
+
+    def found(self, q):
+        return sorted(
+            search.search(Service.objects.all(), q).values_list("slug", flat=True)
+        )
+
+    def test_fts_index_is_used(self):
+        self.assertTrue(search.has_fts(Service))
+
+    def test_matches_words_from_any_field(self):
+        self.assertEqual(self.found("forages"), ["pompage"])
+        self.assertEqual(self.found("fibre"), ["reseaux"])
+        # ET implicite entre les mots
+        self.assertEqual(self.found("pompage fibre"), [])
+
+    def test_prefix_terms(self):
+        self.assertEqual(self.found("pomp"), ["pompage"])
+        self.assertEqual(self.found("câbl"), ["reseaux"])
+
+    def test_quotes_and_operators_are_plain_words(self):
+        self.assertEqual(self.found('"solaire'), ["pompage"])
+        self.assertEqual(self.found('solaire" OR "fibre'), [])
+        self.assertEqual(self.found("NEAR(pompage fibre)"), [])
+        self.assertEqual(self.found('" * -'), [])
+
+    def test_rank_is_annotated(self):
+        results = search.search(Service.objects.all(), "solaire")
+        self.assertGreater(results.get().search_rank, 0)
+
+    def test_index_follows_save_and_delete(self):
+        self.network.body = "<p>Vidéosurveillance</p>"
+        self.network.save()
+        self.assertEqual(self.found("fibre"), [])
+        self.assertEqual(self.found("vidéo"), ["reseaux"])
+        self.network.delete()
+        self.assertEqual(self.found("vidéo"), [])
+
+    def test_icontains_fallback_without_fts(self):
+        with mock.patch.object(search, "has_fts", return_value=False):
+            self.assertEqual(self.found("OMPES"), ["pompage"])
+            self.assertEqual(self.found("pompes forages"), ["pompage"])
+            self.assertEqual(self.found('"fibre'), ["reseaux"])
+            self.assertEqual(
+                search.search(Service.objects.all(), "fibre").get().search_rank, 0
+            )
+
+
+# --- Blog ---
+
+
+class BlogListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for slug, year in (("ancien", 2019), ("recent", 2021)):
+            post = Post.objects.create(title=slug, slug=slug, body="<p>Texte</p>")
+            Post.objects.filter(pk=post.pk).update(pub_date=datetime.date(year, 5, 1))
+
+    def listed(self, **params):
+        request = RequestFactory().get("/blog/", params)
+        return [post.slug for post in views._blog_context(request)["posts"]]
+
+    def test_year_filter(self):
+        self.assertEqual(self.listed(year="2021"), ["recent"])
+        self.assertEqual(self.listed(year="2018-2020"), ["ancien"])
+
+    def test_invalid_year_is_ignored(self):
+        self.assertEqual(self.listed(year="abc"), ["recent", "ancien"])
+
+    def test_neighbours_with_same_pub_date(self):
+        # Même jour : départage par pk, dans le sens de la liste
+        day = datetime.date(2022, 3, 1)
+        for slug in ("a", "b", "c"):
+            post = Post.objects.create(title=slug, slug=slug, body="<p>Texte</p>")
+            Post.objects.filter(pk=post.pk).update(pub_date=day)
+
+        post, prev_post, next_post, recent_posts = views._post_with_neighbours("b")
+
+        self.assertEqual((prev_post.slug, post.slug, next_post.slug), ("a", "b", "c"))
+        self.assertEqual([r.slug for r in recent_posts], ["c", "a", "recent", "ancien"])
+        self.assertIsNone(views._post_with_neighbours("c")[2])
+        # Plus ancien du jour (plus petit pk) : suivant de l'article de 2021
+        self.assertEqual(views._post_with_neighbours("recent")[2].slug, "a")
+
+    def test_neighbours_outside_latest_posts(self):
+        for i in range(6):
+            post = Post.objects.create(title=f"n{i}", slug=f"n{i}", body="<p>T</p>")
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=datetime.date(2023, 1, i + 1)
+            )
+
+        post, prev_post, next_post, recent_posts = views._post_with_neighbours("ancien")
+
+        self.assertIsNone(prev_post)
+        self.assertEqual(next_post.slug, "recent")
+        self.assertEqual([r.slug for r in recent_posts], ["n5", "n4", "n3", "n2", "n1"])
+
+    def test_unprocessed_body_is_sanitized(self):
+        Post.objects.filter(slug="recent").update(
+            body='<p onclick="x()">Brut<script>alert(1)</script></p>', body_html=None
+        )
+        post = views._post_with_neighbours("recent")[0]
+        self.assertEqual(post.body_html, "<p>Brut</p>")
+
+
+# --- Export statique ---
+
+
+class StaticExportQueueTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.root = Path(root)
+        overrides = override_settings(
+            STATIC_EXPORT_ROOT=root,
+            SITE_URL="https://www.example.org",
+            ALLOWED_HOSTS=["www.example.org"],
+            # Pas de manifeste (collectstatic) pour rendre les templates
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {
+                    "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+                },
+            },
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.post = Post.objects.create(
+            title="Article", slug="article", body="<p>A</p>"
+        )
+        PendingExport.objects.all().delete()
+
+    def page(self, url):
+        return prerender.target(self.root, url)
+
+    def test_save_discards_pages_and_queues_render(self):
+        prerender.Exporter(self.root).render_details("blog_detail")
+        page = self.page("/blog/article/")
+        self.assertTrue(page.is_file())
+
+        self.post.title = "Nouveau titre"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+            # Retirée avant le commit : Caddy passe la main à Django
+            self.assertFalse(page.exists())
+        self.assertEqual(
+            list(PendingExport.objects.values_list("tag", "slug")),
+            [("post", "article")],
+        )
+
+        self.assertEqual(prerender.process_queue(), 1)
+        self.assertIn("Nouveau titre", page.read_text())
+        self.assertFalse(PendingExport.objects.exists())
+        self.assertEqual(prerender.process_queue(), 0)
+
+    def test_missing_page_is_not_exported(self):
+        exporter = prerender.Exporter(self.root)
+        exporter.render("/blog/inconnu/", self.page("/blog/inconnu/"))
+        self.assertFalse(self.page("/blog/inconnu/").exists())
+        self.assertEqual(exporter.stats["errors"], 0)
+
+
+# --- Singletons ---
+
+
+class SingletonTests(TestCase):
+    def setUp(self):
+        singletons.home_settings.clear()
+        self.addCleanup(singletons.home_settings.clear)
+
+    def test_row_created_by_migration(self):
+        self.assertEqual(
+            singletons.home_settings.get(), HomeSettings.objects.order_by("pk").first()
+        )
+
+    def test_deleted_row_is_recreated_without_fixed_pk(self):
+        old_pk = HomeSettings.objects.get().pk
+        HomeSettings.objects.all().delete()
+        singletons.home_settings.clear()
+
+        obj = singletons.home_settings.get()
+
+        self.assertGreater(obj.pk, old_pk)
+        self.assertEqual(HomeSettings.objects.count(), 1)
+
+
+# --- Cache ---
+
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "sitecontent.cache_backends.TwoTierCache",
+        "LOCATION": "shared",
+        "OPTIONS": {"LOCAL_TIMEOUT": 5},
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tests",
+    },
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return f"valeur {self.calls}"
+
+    def test_get_or_compute_computes_once(self):
+        self.assertEqual(cache.get_or_compute("k", self.compute, 60), "valeur 1")
+        self.assertEqual(cache.get_or_compute("k", self.compute, 60), "valeur 1")
+        self.assertEqual(self.calls, 1)
+        self.assertFalse(cache.shared.has_key("k:lock"))
+
+    def test_waits_for_value_computed_elsewhere(self):
+        # Un autre processus tient le verrou puis publie sa valeur
+        cache.shared.add("k:lock", 1)
+
+        def publish(seconds):
+            cache.shared.set("k", ("autre worker", 0.1, None))
+
+        with mock.patch.object(cache_backends.time, "sleep", side_effect=publish):
+            self.assertEqual(cache.get_or_compute("k", self.compute), "autre worker")
+        self.assertEqual(self.calls, 0)
+
+    def test_local_copy_expires_after_shared_change(self):
+        cache.set("k", "ancienne")
+        cache.shared.set("k", "nouvelle")  # écrite par un autre worker
+
+        self.assertEqual(cache.get("k"), "ancienne")
+        later = time.monotonic() + TEST_CACHES["default"]["OPTIONS"]["LOCAL_TIMEOUT"]
+        with mock.patch.object(cache_backends.time, "monotonic", return_value=later):
+            self.assertEqual(cache.get("k"), "nouvelle")
+
+    def test_remember_is_recomputed_after_bump(self):
+        self.assertEqual(caching.remember("r", self.compute, ("partner",)), "valeur 1")
+        self.assertEqual(caching.remember("r", self.compute, ("partner",)), "valeur 1")
+        # Version relue dans le niveau partagé : pas d'attente du local
+        caching.bump("partner")
+        self.assertEqual(caching.remember("r", self.compute, ("partner",)), "valeur 2")
+
+
+@override_settings(CACHES=TEST_CACHES, PAGE_CACHE_TIMEOUT=600)
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def page(self, csrf=False, **cookies):
+        def view(request):
+            self.calls += 1
+            return HttpResponse(get_token(request) if csrf else "Partenaires")
+
+        request = RequestFactory().get("/partners/")
+        request.COOKIES.update(cookies)
+        return caching.anonymous_page_cache("partner")(view)(request)
+
+    def test_hit_until_save_bumps_version(self):
+        self.assertEqual(self.page()["X-Page-Cache"], "MISS")
+        self.assertEqual(self.page()["X-Page-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Partner.objects.create(name="Nouveau partenaire")
+
+        self.assertEqual(self.page()["X-Page-Cache"], "MISS")
+        self.assertEqual(self.calls, 2)
+
+    def test_csrf_response_is_not_stored(self):
+        self.assertNotIn("X-Page-Cache", self.page(csrf=True))
+        self.assertNotIn("X-Page-Cache", self.page(csrf=True))
+        self.assertEqual(self.calls, 2)
+
+    def test_authenticated_request_bypasses_cache(self):
+        self.page()
+        cookies = {settings.SESSION_COOKIE_NAME: "session"}
+        self.assertNotIn("X-Page-Cache", self.page(**cookies))
+        self.assertEqual(self.calls, 2)
+        # … et sa réponse n'a pas été stockée pour les anonymes
+        self.assertEqual(self.page()["X-Page-Cache"], "HIT")
@@ -1,63 +1,104 @@
-import time
+import gzip
+
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
-from django.http import HttpResponse
-from .models import HomeSettings, Service, Project, Partner, Post
+from django.http import Http404, HttpResponse
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    IntegerField,
+    Q,
+    Subquery,
+    TextField,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import Coalesce, Lag, Lead, RowNumber
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from .models import Service, Project, Partner, Post
 from .forms import ContactForm
 from django.contrib import messages
-from django.core.cache import cache
+from .caching import anonymous_page_cache
+from .conditional import conditional_page
+from . import richtext, search, singletons, sitemaps, years
+from .pagination import CachedCountPaginator, KeysetPaginator
+from .ratelimit import SlidingWindow, TokenBucket, client_ip, ratelimit, search_key
+
+# Recherches : rafale de 20, puis 1 par seconde et par IP
+SEARCH_LIMIT = TokenBucket(rate=1, capacity=20)
 
+# Cartes par page des listes projets / blog (voir aussi prerender.py)
+LIST_PAGE_SIZE = 9
 
+
+@conditional_page()
+@anonymous_page_cache()
 def about(request):
     return render(request, "about.html")
 
 
+@conditional_page("homesettings", "project", "partner", "post")
+@anonymous_page_cache("homesettings", "project", "partner", "post")
 def home(request):
-    settings = HomeSettings.objects.first() or HomeSettings.objects.create()
-    services = Service.objects.all()[:6]
-    projects = Project.objects.all()[:6]
-    partners = Partner.objects.all()
-    posts = Post.objects.filter(published=True)[:3]
-    return render(
-        request,
-        "home.html",
-        {
-            "settings": settings,
-            "services": services,
-            "projects": projects,
-            "partners": partners,
-            "posts": posts,
-        },
-    )
+    return render(request, "home.html", _home_context())
 
 
+def _home_context():
+    # Valeurs paresseuses : une section en cache ({% fragment %}) ne lit rien
+    return {
+        "settings": SimpleLazyObject(singletons.home_settings.get),
+        "services": Service.objects.for_list()[:6],
+        "projects": Project.objects.for_list()[:6],
+        "partners": Partner.objects.all(),
+        "posts": Post.objects.published().for_list()[:3],
+    }
+
+
+@conditional_page()
+@anonymous_page_cache()
+@ratelimit("search", SEARCH_LIMIT, key=search_key)
 def services_list(request):
-    qs = Service.objects.all()
+    return render(request, "services_list.html", {"services": _services(request)})
+
+
+def _services(request):
+    qs = Service.objects.for_list()
 
     q = (request.GET.get("q") or "").strip()
     sort = (request.GET.get("sort") or "").strip()
 
     if q:
-        qs = qs.filter(
-            Q(title__icontains=q) | Q(excerpt__icontains=q) | Q(body__icontains=q)
-        )
+        qs = search.search(qs, q)
 
-    if sort in {"title", "-updated"}:
-        qs = qs.order_by(sort)
+    if sort == "title":
+        qs = qs.order_by("title")
+    elif sort == "-updated":
+        qs = qs.order_by("-updated", "-pk")  # index (updated, id) lu à rebours
+    elif q:
+        qs = qs.order_by("-search_rank", "title")
     else:
         qs = qs.order_by("title")
-
-    return render(request, "services_list.html", {"services": qs})
+    return qs
 
 
+@conditional_page(exists=lambda request, slug: Service.objects.filter(slug=slug))
+@anonymous_page_cache()
 def service_detail(request, slug):
     service = get_object_or_404(Service, slug=slug)
     return render(request, "service_detail.html", {"service": service})
 
 
+@conditional_page("project")
+@anonymous_page_cache("project")
+@ratelimit("search", SEARCH_LIMIT, key=search_key)
 def projects_list(request):
-    qs = Project.objects.all().prefetch_related("images")
+    return render(request, "projects_list.html", _projects_context(request))
+
+
+def _projects_context(request):
+    qs = Project.objects.for_list()
 
     # --- Query params (GET) ---
     q = (request.GET.get("q") or "").strip()
@@ -66,16 +107,9 @@ def projects_list(request):
     year = (request.GET.get("year") or "").strip()
     sort = (request.GET.get("sort") or "").strip()
 
-    # --- Recherche plein texte simple ---
+    # --- Recherche plein texte (index FTS, voir search.py) ---
     if q:
-        qs = qs.filter(
-            Q(title__icontains=q)
-            | Q(client__icontains=q)
-            | Q(location__icontains=q)
-            | Q(context__icontains=q)
-            | Q(solution__icontains=q)
-            | Q(results__icontains=q)
-        )
+        qs = search.search(qs, q)
 
     # --- Filtres ---
     if client:
@@ -83,152 +117,256 @@ def projects_list(request):
     if location:
         qs = qs.filter(location__icontains=location)
     if year:
-        qs = qs.filter(year__icontains=year)
+        # « 2020 », « 2018-2020 », « 2018- » : projets dont la plage recoupe
+        year_range = years.parse_year_query(year)
+        qs = qs.filter(years.overlap_q(*year_range)) if year_range else qs.none()
 
-    # --- Tri ---
+    # --- Tri (chaque tri suit un index, pk compris) ---
     allowed_sorts = {
-        "-year": "-year",
-        "year": "year",
-        "title": "title",
-        "-created": "-created",  # fallback technique
+        "-year": ("-year_start", "-year_end", "-pk"),
+        "year": ("year_start", "year_end", "pk"),
+        "title": ("title",),
+        "-created": ("-created", "title"),  # fallback technique
     }
     if sort in allowed_sorts:
-        qs = qs.order_by(allowed_sorts[sort])
+        qs = qs.order_by(*allowed_sorts[sort])
+    elif q:
+        qs = qs.order_by("-search_rank", "-created")  # pertinence d'abord
     else:
         qs = qs.order_by("-created", "title")  # tri recommandé par défaut
 
-    # --- Pagination ---
-    page = request.GET.get("page", "1")
-    paginator = Paginator(qs, 9)  # 9 cartes / page
-    try:
+    # --- Pagination (9 cartes / page) ---
+    # ?page=N : anciennes URLs (offset) ; sinon curseur ?cursor=… (keyset)
+    page = request.GET.get("page")
+    if page:
+        paginator = CachedCountPaginator(qs, LIST_PAGE_SIZE)
         page_obj = paginator.get_page(page)
-    except (PageNotAnInteger, EmptyPage):
-        page_obj = paginator.get_page(1)
+    else:
+        paginator = KeysetPaginator(qs, LIST_PAGE_SIZE, with_count=True)
+        page_obj = paginator.page(request.GET.get("cursor", ""))
 
-    context = {
+    return {
         "projects": page_obj.object_list,  # utilisé par le template
         "page_obj": page_obj,  # pagination (optionnelle dans le template)
+        "result_count": paginator.count,
     }
-    return render(request, "projects_list.html", context)
 
 
+@conditional_page(
+    "project", exists=lambda request, slug: Project.objects.filter(slug=slug)
+)
+@anonymous_page_cache("project")
 def project_detail(request, slug):
     project = get_object_or_404(Project, slug=slug)
     return render(request, "project_detail.html", {"project": project})
 
 
+@conditional_page("partner")
+@anonymous_page_cache("partner")
 def partners_view(request):
     return render(request, "partners.html", {"partners": Partner.objects.all()})
 
 
+@conditional_page("post")
+@anonymous_page_cache("post")
+@ratelimit("search", SEARCH_LIMIT, key=search_key)
 def blog_list(request):
-    qs = Post.objects.filter(published=True)
+    return render(request, "blog_list.html", _blog_context(request))
+
+
+def _blog_context(request):
+    qs = Post.objects.published().for_list()
 
     q = (request.GET.get("q") or "").strip()
     year = (request.GET.get("year") or "").strip()
     sort = (request.GET.get("sort") or "").strip()
 
     if q:
-        qs = qs.filter(Q(title__icontains=q) | Q(body__icontains=q))
+        qs = search.search(qs, q)
 
-    if year.isdigit():
-        qs = qs.filter(pub_date__year=int(year))
+    # Année ou plage d'années : intervalle de dates (index post_pub_date_idx) ;
+    # valeur invalide ignorée, comme avant
+    year_range = years.parse_year_query(year)
+    if year_range:
+        qs = qs.filter(years.date_range_q("pub_date", *year_range))
 
-    # Tri autorisé
-    allowed_sorts = {"-pub_date", "pub_date", "title"}
+    # Tri autorisé (sans tri : Meta.ordering, -pub_date puis -id)
+    allowed_sorts = {
+        "-pub_date": ("-pub_date", "-pk"),
+        "pub_date": ("pub_date", "pk"),
+        "title": ("title",),
+    }
     if sort in allowed_sorts:
-        qs = qs.order_by(sort)
+        qs = qs.order_by(*allowed_sorts[sort])
+    elif q:
+        qs = qs.order_by("-search_rank", "-pub_date")
+
+    # 9 cartes par page ; ?page=N conservé pour les anciennes URLs
+    page = request.GET.get("page")
+    if page:
+        paginator = CachedCountPaginator(qs, LIST_PAGE_SIZE)
+        page_obj = paginator.get_page(page)
+    else:
+        paginator = KeysetPaginator(qs, LIST_PAGE_SIZE, with_count=True)
+        page_obj = paginator.page(request.GET.get("cursor", ""))
+
+    return {
+        "posts": page_obj.object_list,
+        "page_obj": page_obj,
+        "is_paginated": page_obj.has_other_pages(),
+        "result_count": paginator.count,
+    }
 
-    paginator = Paginator(qs, 9)  # 9 cartes par page
-    page_obj = paginator.get_page(request.GET.get("page"))
 
+@conditional_page(
+    "post",
+    exists=lambda request, slug: Post.objects.filter(slug=slug, published=True),
+)
+@anonymous_page_cache("post")
+def blog_detail(request, slug):
+    post, prev_post, next_post, recent_posts = _post_with_neighbours(slug)
     return render(
         request,
-        "blog_list.html",
+        "blog_detail.html",
         {
-            "posts": page_obj.object_list,
-            "page_obj": page_obj,
-            "is_paginated": page_obj.has_other_pages(),
+            "post": post,
+            "prev_post": prev_post,
+            "next_post": next_post,
+            "recent_posts": recent_posts,
         },
     )
 
 
-def blog_detail(request, slug):
-    post = get_object_or_404(Post, slug=slug, published=True)
-
-    prev_post = (
-        Post.objects.filter(published=True, pub_date__lt=post.pub_date)
-        .order_by("-pub_date")
-        .first()
+def _post_with_neighbours(slug, recent=5):
+    """
+    Article + précédent / suivant + récents en une seule requête (fenêtrage).
+    Tri stable (pub_date, pk) : les articles du même jour se suivent aussi.
+    Le corps n'est lu que pour l'article affiché.
+    """
+    published = Post.objects.filter(published=True)
+    # Lignes utiles choisies avant le fenêtrage, par des sondes sur l'index
+    # post_pub_date_idx : l'article, ses deux voisins et les plus récents
+    # (au plus recent + 3 lignes, au lieu de tous les articles publiés)
+    article = published.filter(slug=slug)
+    day = Subquery(article.values("pub_date")[:1])
+    pk = Subquery(article.values("pk")[:1])
+    # Borne sur pub_date seule d'abord : parcours de l'index à partir du jour
+    newer = published.filter(pub_date__gte=day).filter(
+        Q(pub_date__gt=day) | Q(pk__gt=pk)
     )
-    next_post = (
-        Post.objects.filter(published=True, pub_date__gt=post.pub_date)
-        .order_by("pub_date")
-        .first()
+    older = published.filter(pub_date__lte=day).filter(
+        Q(pub_date__lt=day) | Q(pk__lt=pk)
     )
-    recent_posts = (
-        Post.objects.filter(published=True)
-        .exclude(pk=post.pk)
-        .order_by("-pub_date")[:5]
+    latest = published.order_by("-pub_date", "-pk")[: recent + 1]
+    nearby = (
+        Q(slug=slug)
+        | Q(pk__in=latest.values("pk"))
+        | Q(pk=Subquery(newer.order_by("pub_date", "pk").values("pk")[:1]))
+        | Q(pk=Subquery(older.order_by("-pub_date", "-pk").values("pk")[:1]))
     )
 
-    return render(
-        request,
-        "blog_detail.html",
-        {
-            "post": post,
-            "prev_post": prev_post,
-            "next_post": next_post,
-            "recent_posts": recent_posts,
-        },
+    newest_first = [F("pub_date").desc(), F("pk").desc()]
+    current = Case(
+        When(slug=slug, then=Value(1)), default=Value(0), output_field=IntegerField()
+    )
+    rows = list(
+        published.filter(nearby)
+        .defer("body", "body_html", "search_document")
+        .annotate(
+            is_current=current,
+            # les recent + 1 premières lignes sont celles de `latest`
+            position=Window(RowNumber(), order_by=newest_first),
+            # ligne juste après (plus ancienne) / avant (plus récente) l'article
+            follows_current=Window(Lag(current), order_by=newest_first),
+            precedes_current=Window(Lead(current), order_by=newest_first),
+            # body_html (richtext.py) ; HTML brut de CKEditor si l'article
+            # n'est pas encore traité (NULL), nettoyé ci-dessous
+            current_body=Case(
+                When(slug=slug, then=Coalesce("body_html", "body")),
+                default=Value(""),
+                output_field=TextField(),
+            ),
+            body_pending=Case(
+                When(slug=slug, body_html__isnull=True, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+        .order_by("position")
     )
 
+    post = next((r for r in rows if r.is_current), None)
+    if post is None:
+        raise Http404("Article introuvable")
+    post.body_html = (
+        richtext.optimize(post.current_body) if post.body_pending else post.current_body
+    )
+    prev_post = next((r for r in rows if r.follows_current), None)
+    next_post = next((r for r in rows if r.precedes_current), None)
+    recent_posts = [r for r in rows if r.position <= recent + 1 and not r.is_current][
+        :recent
+    ]
+    return post, prev_post, next_post, recent_posts
+
+
+# --- Sitemaps ---
+
+
+def _sitemap_response(request, data):
+    # Fichiers stockés gzippés : servis tels quels aux clients qui l'acceptent
+    if "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+        response = HttpResponse(data, content_type="application/xml")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(gzip.decompress(data), content_type="application/xml")
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+def sitemap_index(request):
+    data = sitemaps.get_index(request.scheme, request.get_host())
+    return _sitemap_response(request, data)
 
-def _client_ip(request):
-    # utile derrière proxy en prod
-    xff = request.META.get("HTTP_X_FORWARDED_FOR")
-    if xff:
-        return xff.split(",")[0].strip()
-    return request.META.get("REMOTE_ADDR", "")
 
+def sitemap_section(request, section):
+    page = request.GET.get("p", "1")
+    if section not in sitemaps.SITEMAPS or not page.isdigit() or int(page) < 1:
+        raise Http404("Sitemap introuvable")
+    data = sitemaps.get_section(section, int(page), request.scheme, request.get_host())
+    if data is None:
+        raise Http404("Page de sitemap introuvable")
+    return _sitemap_response(request, data)
 
-def _throttle_ok(ip: str, window_sec: int = 60, limit: int = 5) -> bool:
-    key = f"contact_hits:{ip}"
-    now = int(time.time())
-    hits = cache.get(key, [])
-    hits = [t for t in hits if now - t < window_sec]
-    hits.append(now)
-    cache.set(key, hits, window_sec)
-    return len(hits) <= limit
 
+def _contact_limited(request, decision):
+    messages.error(request, "Trop de tentatives. Réessayez dans une minute.")
+    return redirect("contact")
 
+
+@ratelimit(
+    "contact",
+    SlidingWindow(limit=5, window=60),
+    methods=("POST",),
+    on_limited=_contact_limited,
+)
 def contact(request):
     """
     GET  -> affiche le formulaire
-    POST -> valide, envoie l'email (SMTP Namecheap), redirige vers 'merci'
+    POST -> valide, met l'email en file d'envoi (outbox), redirige vers 'merci'
             et si l’utilisateur a coché 'Recevoir une copie', il reçoit un email
             avec le CSV en pièce jointe (aucun téléchargement local).
+            L'envoi SMTP est fait par le worker `send_outbox`.
     """
     if request.method == "POST":
-        ip = _client_ip(request)
-        if not _throttle_ok(ip):
-            messages.error(request, "Trop de tentatives. Réessayez dans une minute.")
-            return redirect("contact")
-
+        ip = client_ip(request)
         form = ContactForm(request.POST)
         if form.is_valid():
-            ok = form.send_email(
+            form.queue_email(
                 requester_ip=ip,
                 user_agent=request.META.get("HTTP_USER_AGENT", ""),
             )
-            if ok:
-                messages.success(request, "Merci ! Votre message a bien été envoyé.")
-                return redirect("contact_thanks")
-            messages.error(
-                request,
-                "Envoi impossible pour le moment. Réessayez dans quelques minutes.",
-            )
-            # retomber sur le form rempli
+            messages.success(request, "Merci ! Votre message a bien été envoyé.")
+            return redirect("contact_thanks")
         else:
             messages.error(request, "Veuillez corriger les champs en rouge.")
     else:
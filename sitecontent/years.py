@@ -0,0 +1,77 @@
+# sitecontent/years.py
+"""
+Années des projets : le champ libre `year` (« 2019 », « 2019–2021 »,
+« 2019-21 ») est converti à la sauvegarde en plage d'entiers
+(year_start / year_end), indexée, pour les filtres exacts ou par plage et
+le tri. Sert aussi à lire le paramètre ?year= des listes (projets, blog).
+"""
+import datetime
+import re
+
+from django.db.models import Q
+
+# Année inconnue : 0 plutôt que NULL (tri stable, pagination par curseur)
+UNKNOWN = 0
+
+_YEAR_RE = re.compile(r"(?<!\d)(\d{4})(?:\s*[-–—/àa]+\s*(\d{4}|\d{2}))?(?!\d)")
+_QUERY_RE = re.compile(r"^\s*([1-9]\d{3})?\s*(-|–|\.\.)?\s*([1-9]\d{3})?\s*$")
+
+
+def parse_years(value: str) -> tuple:
+    """Texte libre -> (début, fin) ; (0, 0) si aucune année."""
+    years = []
+    for first, second in _YEAR_RE.findall(value or ""):
+        years.append(int(first))
+        if len(second) == 2:  # 2019-21
+            years.append(int(first[:2] + second))
+        elif second:
+            years.append(int(second))
+    if not years:
+        return UNKNOWN, UNKNOWN
+    return min(years), max(years)
+
+
+def parse_year_query(value: str):
+    """
+    ?year= -> (min, max) inclus, None pour une borne ouverte :
+    « 2020 », « 2018-2020 », « 2018- », « -2020 ». None si invalide.
+    """
+    match = _QUERY_RE.match(value or "")
+    if not match:
+        return None
+    low, separator, high = match.groups()
+    if not low and not high:
+        return None
+    if not separator:
+        if high:  # « 2018 2020 »
+            return None
+        return int(low), int(low)
+    low, high = (int(low) if low else None), (int(high) if high else None)
+    if low and high and low > high:
+        low, high = high, low
+    return low, high
+
+
+def overlap_q(low, high, start="year_start", end="year_end") -> Q:
+    """Projets dont la plage [start, end] recoupe [low, high]."""
+    condition = Q(**{f"{start}__gt": UNKNOWN})
+    if high is not None:
+        condition &= Q(**{f"{start}__lte": high})
+    if low is not None:
+        condition &= Q(**{f"{end}__gte": low})
+    return condition
+
+
+def date_range_q(field, low, high) -> Q:
+    """Dates de `field` comprises dans les années [low, high]."""
+    condition = Q()
+    if low is not None:
+        condition &= Q(**{f"{field}__gte": datetime.date(low, 1, 1)})
+    if high is not None:
+        condition &= Q(**{f"{field}__lte": datetime.date(high, 12, 31)})
+    return condition
+
+
+def update_years(sender, instance, **kwargs):
+    """pre_save : recalcule la plage d'années avant écriture."""
+    instance.year_start, instance.year_end = parse_years(instance.year)